@@ -1,12 +1,36 @@
-from flask import Flask, request, jsonify, render_template_string, send_file
+from flask import Flask, Response, request, jsonify, render_template_string, send_file
 from flask_cors import CORS
+import click
+import functools
+import html
 import os
-import subprocess
-import tempfile
 import json
 import logging
 import re
-import pdfkit
+import threading
+import time
+import urllib.parse
+
+import banner_scanner
+import batch
+import compressed_dumps
+import dump_formats
+import dump_registry
+import exports
+import jobs
+import pdf_reports
+import plugins
+import process_dossier
+import process_tree
+import result_cache
+import result_diff
+import result_index
+import row_stream
+import search_index
+import symbol_store
+import triage
+import uploads
+import volatility_engine
 
 # Configuration des logs
 logging.basicConfig(level=logging.DEBUG)
@@ -15,10 +39,13 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
-UPLOAD_FOLDER = 'uploads'
+UPLOAD_FOLDER = uploads.UPLOAD_FOLDER
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
+# Index bannière -> ISF du magasin de symboles local, chargé une fois au démarrage
+symbol_store.load_index()
+
 # Dictionnaire de traductions
 translations = {
     'en': {
@@ -98,7 +125,49 @@ translations = {
         'handleraddr': 'Handler Address',
         'handlersymb': 'Handler Symbol',
         'name': 'Name',
-        'download_pdf': 'Download as PDF'
+        'mtu': 'MTU',
+        'qdisc': 'Qdisc',
+        'qlen': 'Queue Length',
+        'flags': 'Flags',
+        'start': 'Start',
+        'end': 'End',
+        'blockaddr': 'Superblock Address',
+        'download_pdf': 'Download as PDF',
+        'download_pdf_summary': 'PDF summary',
+        'pdf_in_progress': 'Generating PDF...',
+        'export': 'Export',
+        'column': 'Column',
+        'distinct': 'Distinct values',
+        'top_values': 'Most frequent values',
+        'truncated': 'Table truncated: {shown} of {total} rows. Use the summary or an export for the full result.',
+        'diff_title': 'Comparison - {command}',
+        'base_dump': 'Baseline dump',
+        'target_dump': 'Compared dump',
+        'added': 'Added',
+        'removed': 'Removed',
+        'changed': 'Changed',
+        'unchanged': 'Unchanged',
+        'changed_fields': 'Changes',
+        'diff_truncated': 'Only the first {limit} rows of each category are listed.',
+        'process_tree': 'Process tree',
+        'process_tree_title': 'Process tree - {command}',
+        'threads': 'Threads',
+        'descendants': 'Descendants',
+        'load_more': 'Load more',
+        'find_pid': 'Go to PID',
+        'processes': 'Processes',
+        'roots': 'Roots',
+        'dossier': 'Process dossier',
+        'dossier_title': 'Process {pid} - dossier',
+        'section_process': 'Process',
+        'section_environment': 'Environment variables',
+        'section_bash_history': 'Bash history',
+        'section_elfs': 'ELF files',
+        'section_libraries': 'Libraries',
+        'missing_results': 'Unavailable results',
+        'pid_not_found': 'This PID appears in no result.',
+        'run_missing': 'Run missing plugins',
+        'plugins_running': 'Running plugins: {done} / {total} finished'
     },
     'fr': {
         'title': 'Résultats de l\'analyse - {command}',
@@ -146,432 +215,961 @@ translations = {
         'file_output': 'Sortie fichier',
         'switch_to_fr': 'Passer en français',
         'switch_to_en': 'Passer en anglais',
-        'download_pdf': 'Télécharger en PDF'
+        'module': 'Module',
+        'codesize': 'Taille du code',
+        'taints': 'Marques (taints)',
+        'arguments': 'Arguments',
+        'fileoutput': 'Sortie fichier',
+        'name': 'Nom',
+        'loadaddress': 'Adresse de chargement',
+        'path': 'Chemin',
+        'mtu': 'MTU',
+        'qdisc': 'Qdisc',
+        'qlen': 'Longueur de file',
+        'flags': 'Drapeaux',
+        'start': 'Début',
+        'end': 'Fin',
+        'blockaddr': 'Adresse Superblock',
+        'mountpoint': 'Point de montage',
+        'inodenum': 'Numéro Inode',
+        'inodeaddr': 'Adresse Inode',
+        'filetype': 'Type de fichier',
+        'inodepages': 'Pages Inode',
+        'cachedpages': 'Pages en cache',
+        'filemode': 'Mode fichier',
+        'accesstime': 'Heure d\'accès',
+        'modificationtime': 'Heure de modification',
+        'changetime': 'Heure de changement',
+        'filepath': 'Chemin du fichier',
+        'inodesize': 'Taille Inode',
+        'recovered': 'Récupéré',
+        'args': 'Arguments',
+        'address': 'Adresse',
+        'handleraddr': 'Adresse du gestionnaire',
+        'handlersymb': 'Symbole du gestionnaire',
+        'download_pdf': 'Télécharger en PDF',
+        'download_pdf_summary': 'Résumé PDF',
+        'pdf_in_progress': 'Génération du PDF...',
+        'export': 'Exporter',
+        'column': 'Colonne',
+        'distinct': 'Valeurs distinctes',
+        'top_values': 'Valeurs les plus fréquentes',
+        'truncated': 'Tableau tronqué : {shown} lignes sur {total}. Utilisez le résumé ou un export pour le résultat complet.',
+        'diff_title': 'Comparaison - {command}',
+        'base_dump': 'Dump de référence',
+        'target_dump': 'Dump comparé',
+        'added': 'Ajoutées',
+        'removed': 'Supprimées',
+        'changed': 'Modifiées',
+        'unchanged': 'Inchangées',
+        'changed_fields': 'Modifications',
+        'diff_truncated': 'Seules les {limit} premières lignes de chaque catégorie sont listées.',
+        'process_tree': 'Arbre des processus',
+        'process_tree_title': 'Arbre des processus - {command}',
+        'threads': 'Threads',
+        'descendants': 'Descendants',
+        'load_more': 'Afficher plus',
+        'find_pid': 'Aller au PID',
+        'processes': 'Processus',
+        'roots': 'Racines',
+        'dossier': 'Dossier du processus',
+        'dossier_title': 'Processus {pid} - dossier',
+        'section_process': 'Processus',
+        'section_environment': "Variables d'environnement",
+        'section_bash_history': 'Historique bash',
+        'section_elfs': 'Fichiers ELF',
+        'section_libraries': 'Bibliothèques',
+        'missing_results': 'Résultats indisponibles',
+        'pid_not_found': "Ce PID n'apparaît dans aucun résultat.",
+        'run_missing': 'Exécuter les plugins manquants',
+        'plugins_running': 'Plugins en cours : {done} / {total} terminés'
     }
 }
 
-def get_profile(dump_path):
+def parse_banner(line):
+    # Extraire la version du noyau
+    kernel_version = line.split('Linux version')[1].split()[0]
+    
+    # Extraire la distribution et sa version
+    if 'Ubuntu' in line:
+        distro = 'Ubuntu'
+        # Chercher le motif #XXX~YY.YY
+        version_match = re.search(r'#\d+~(\d+\.\d+)', line)
+        if version_match:
+            distro_version = version_match.group(1)
+        else:
+            distro_version = 'Unknown'
+    else:
+        distro = 'Unknown'
+        distro_version = 'Unknown'
+    
+    logger.debug(f"Version du noyau trouvée: {kernel_version}")
+    logger.debug(f"Distribution trouvée: {distro} {distro_version}")
+    
+    full_version = line.split('Linux version')[1].strip()
+    return {
+        'kernel_version': kernel_version,
+        'distribution': distro,
+        'distro_version': distro_version,
+        'full_version': full_version,
+        'symbols_available': symbol_store.lookup(f"Linux version {full_version}") is not None
+    }
+
+def get_profile(dump_path, engine=None):
     try:
         logger.debug(f"Analyse du fichier dump: {dump_path}")
         
-        # Exécuter la commande Volatility3 pour récupérer le profil
-        cmd = [
-            'python3', '/opt/volatility3/vol.py',  # Utiliser la commande 'vol' directement
-            '--remote-isf-url', 'https://github.com/Abyss-W4tcher/volatility3-symbols/raw/master/banners/banners.json',
-            '-f', dump_path,
-            'banners.Banners'
-        ]
-        
-        logger.debug(f"Exécution de la commande: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        # Recherche native de la bannière (mmap, en parallèle), sauf si un moteur est imposé
+        if engine is None:
+            found = banner_scanner.find_banner(dump_path)
+            if found:
+                return parse_banner(found[1]), None
+            logger.debug("Aucune bannière trouvée par le scanner natif, repli sur banners.Banners")
         
-        logger.debug(f"Code de retour: {result.returncode}")
-        logger.debug(f"Sortie standard: {result.stdout}")
-        logger.debug(f"Erreur standard: {result.stderr}")
+        # Exécuter le plugin banners.Banners pour récupérer le profil
+        rows, error = volatility_engine.run_plugin(dump_path, 'banners.Banners', mode=engine)
         
-        if result.returncode != 0:
-            return None, f"Erreur lors de l'exécution de Volatility3: {result.stderr}"
+        if error:
+            return None, error
         
-        # Analyser la sortie pour extraire les informations
-        output = result.stdout
-        for line in output.split('\n'):
-            if 'Linux version' in line:
-                # Extraire la version du noyau
-                kernel_version = line.split('Linux version')[1].split()[0]
-                
-                # Extraire la distribution et sa version
-                if 'Ubuntu' in line:
-                    distro = 'Ubuntu'
-                    # Chercher le motif #XXX~YY.YY
-                    version_match = re.search(r'#\d+~(\d+\.\d+)', line)
-                    if version_match:
-                        distro_version = version_match.group(1)
-                    else:
-                        distro_version = 'Unknown'
-                else:
-                    distro = 'Unknown'
-                    distro_version = 'Unknown'
-                
-                logger.debug(f"Version du noyau trouvée: {kernel_version}")
-                logger.debug(f"Distribution trouvée: {distro} {distro_version}")
-                
-                return {
-                    'kernel_version': kernel_version,
-                    'distribution': distro,
-                    'distro_version': distro_version,
-                    'full_version': line.split('Linux version')[1].strip()
-                }, None
+        # Première bannière Linux trouvée par le plugin
+        for row in rows:
+            banner = row.get('Banner') or ''
+            if 'Linux version' in banner:
+                return parse_banner(banner), None
         
         return None, "Version du noyau non trouvée dans la sortie"
     except Exception as e:
         logger.error(f"Erreur lors de l'analyse du dump: {str(e)}")
         return None, f"Erreur: {str(e)}"
 
-def get_process_list(dump_path, command="linux.pslist"):
+def get_process_list(dump_path, command="linux.pslist.PsList", engine=None, on_row=None, layout=None):
     try:
         logger.debug(f"Analyse des processus du dump: {dump_path}")
         
-        # Exécuter la commande Volatility3 pour récupérer la liste des processus
-        cmd = [
-            'python3', '/opt/volatility3/vol.py',
-            '--remote-isf-url', 'https://github.com/Abyss-W4tcher/volatility3-symbols/raw/master/banners/banners.json',
-            '-f', dump_path,
-            command
-        ]
-        
-        logger.debug(f"Exécution de la commande: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        logger.debug(f"Code de retour: {result.returncode}")
-        logger.debug(f"Sortie standard: {result.stdout}")
-        logger.debug(f"Erreur standard: {result.stderr}")
+        entry = plugins.get(command)
+        if entry is None:
+            return None, "Commande non supportée"
         
-        if result.returncode != 0:
-            return None, f"Erreur lors de l'exécution de Volatility3: {result.stderr}"
+        # Exécuter le plugin Volatility3 demandé : lignes typées, colonne -> valeur
+        rows, error = volatility_engine.run_plugin(
+            dump_path, command, mode=engine, on_row=on_row, access=entry['access'], layout=layout
+        )
+        if error:
+            return None, error
+        logger.debug(f"{len(rows)} lignes renvoyées par {command}")
         
-        # Analyser la sortie en fonction de la commande
-        if command == "linux.bash":
-            commands = []
-            for line in result.stdout.split('\n'):
-                if line.strip() and not line.startswith('Volatility'):
-                    parts = line.split()
-                    if len(parts) >= 4:
-                        commands.append({
-                            'pid': parts[0],
-                            'process': parts[1],
-                            'time': ' '.join(parts[2:5]),
-                            'command': ' '.join(parts[5:])
-                        })
-            return commands, None
-        elif command == "linux.envars":
-            envars = []
-            for line in result.stdout.split('\n'):
-                if line.strip() and not line.startswith('Volatility'):
-                    parts = line.split()
-                    if len(parts) >= 5:
-                        envars.append({
-                            'pid': parts[0],
-                            'ppid': parts[1],
-                            'comm': parts[2],
-                            'key': parts[3],
-                            'value': parts[4]
-                        })
-            return envars, None
-        elif command == "linux.boottime.Boottime":
-            boottime = []
-            for line in result.stdout.split('\n'):
-                if line.strip() and not line.startswith('Volatility'):
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        boottime.append({
-                            'time_ns': parts[0],
-                            'boot_time': ' '.join(parts[1:])
-                        })
-            return boottime, None
-        elif command == "linux.pagecache.Files":
-            files = []
-            for line in result.stdout.split('\n'):
-                if line.strip() and not line.startswith('Volatility'):
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        files.append({
-                            'superblock_addr': parts[0],
-                            'mount_point': parts[1],
-                            'device': parts[2],
-                            'inode_num': parts[3],
-                            'inode_addr': parts[4],
-                            'file_type': parts[5],
-                            'inode_pages': parts[6],
-                            'cached_pages': parts[7],
-                            'file_mode': parts[8],
-                            'access_time': parts[9:12],
-                            'modification_time': parts[12:15],
-                            'change_time': parts[15:18],
-                            'file_path': ' '.join(parts[18:])
-                        })
-            return files, None
-        elif command == "linux.pslist.PsList":
-            processes = []
-            for line in result.stdout.split('\n'):
-                if line.strip() and not line.startswith('Volatility'):
-                    parts = line.split()
-                    if len(parts) >= 7:
-                        processes.append({
-                            'offset': parts[0],
-                            'pid': parts[1],
-                            'tid': parts[2],
-                            'ppid': parts[3],
-                            'comm': parts[4],
-                            'creation_time': ' '.join(parts[5:8]),
-                            'file_output': parts[8]
-                        })
-            return processes, None
-        elif command == "linux.ip.Addr":
-            ip_addresses = []
-            for line in result.stdout.split('\n'):
-                if line.strip() and not line.startswith('Volatility'):
-                    parts = line.split()
-                    # Create a base structure with default values
-                    entry = {
-                        'netns': 'N/A',
-                        'index': 'N/A',
-                        'interface': 'N/A',
-                        'mac': 'N/A',
-                        'promiscuous': 'N/A',
-                        'ip': 'N/A',
-                        'prefix': 'N/A',
-                        'scope': 'N/A',
-                        'type': 'N/A',
-                        'state': 'N/A'
-                    }
-                    
-                    # Fill in values from the line if they exist
-                    if len(parts) > 0: entry['netns'] = parts[0]
-                    if len(parts) > 1: entry['index'] = parts[1]
-                    if len(parts) > 2: entry['interface'] = parts[2]
-                    if len(parts) > 3: entry['mac'] = parts[3]
-                    if len(parts) > 4: entry['promiscuous'] = parts[4]
-                    if len(parts) > 5: entry['ip'] = parts[5]
-                    if len(parts) > 6: entry['prefix'] = parts[6]
-                    if len(parts) > 7: entry['scope'] = parts[7]
-                    if len(parts) > 8: entry['type'] = parts[8]
-                    if len(parts) > 9: entry['state'] = parts[9]
-                    
-                    # Only add non-empty lines with at least an interface name
-                    if len(parts) >= 3:
-                        ip_addresses.append(entry)
-            return ip_addresses, None
-        elif command == "linux.check_syscall.Check_syscall":
-            syscalls = []
-            for line in result.stdout.split('\n'):
-                if line.strip() and not line.startswith('Volatility'):
-                    parts = line.split()
-                    if len(parts) >= 5:
-                        syscalls.append({
-                            'address': parts[0],
-                            'name': parts[1],
-                            'index': parts[2],
-                            'handleraddr': parts[3],
-                            'handlersymb': parts[4]
-                        })
-            return syscalls, None
-        elif command == "linux.elfs.Elfs":
-            elfs = []
-            for line in result.stdout.split('\n'):
-                if line.strip() and not line.startswith('Volatility'):
-                    parts = line.split()
-                    if len(parts) >= 6:
-                        elfs.append({
-                            'pid': parts[0],
-                            'process': parts[1],
-                            'start': parts[2],
-                            'end': parts[3],
-                            'filepath': parts[4],
-                            'fileoutput': parts[5]
-                        })
-            return elfs, None
-        elif command == "linux.hidden_modules.Hidden_modules":
-            hidden_modules = []
-            for line in result.stdout.split('\n'):
-                if line.strip() and not line.startswith('Volatility'):
-                    parts = line.split()
-                    if len(parts) >= 6:
-                        hidden_modules.append({
-                            'offset': parts[0],
-                            'module': parts[1],
-                            'codesize': parts[2],
-                            'taints': parts[3],
-                            'arguments': parts[4],
-                            'fileoutput': parts[5]
-                        })
-            return hidden_modules, None
-        elif command == "linux.library_list.LibraryList":
-            libraries = []
-            for line in result.stdout.split('\n'):
-                if line.strip() and not line.startswith('Volatility'):
-                    parts = line.split()
-                    if len(parts) >= 4:
-                        libraries.append({
-                            'name': parts[0],
-                            'pid': parts[1],
-                            'loadaddress': parts[2],
-                            'path': parts[3]
-                        })
-            return libraries, None
-        elif command == "linux.pagecache.RecoverFs":
-            recover_fs = []
-            for line in result.stdout.split('\n'):
-                if line.strip() and not line.startswith('Volatility'):
-                    parts = line.split()
-                    if len(parts) >= 15:
-                        recover_fs.append({
-                            'blockaddr': parts[0],
-                            'mountpoint': parts[1],
-                            'device': parts[2],
-                            'inodenum': parts[3],
-                            'inodeaddr': parts[4],
-                            'filetype': parts[5],
-                            'inodepages': parts[6],
-                            'cachedpages': parts[7],
-                            'filemode': parts[8],
-                            'accesstime': parts[9:12],
-                            'modificationtime': parts[12:15],
-                            'changetime': parts[15:18],
-                            'filepath': parts[18],
-                            'inodesize': parts[19],
-                            'recovered': parts[20]
-                        })
-            return recover_fs, None
-        elif command == "linux.psaux.PsAux":
-            psaux = []
-            for line in result.stdout.split('\n'):
-                if line.strip() and not line.startswith('Volatility'):
-                    parts = line.split()
-                    if len(parts) >= 4:
-                        psaux.append({
-                            'pid': parts[0],
-                            'ppid': parts[1],
-                            'comm': parts[2],
-                            'args': parts[3]
-                        })
-            return psaux, None
-        else:
-            return None, "Commande non supportée"
+        return plugins.parse(command, rows), None
     except Exception as e:
         logger.error(f"Erreur lors de l'analyse des processus: {str(e)}")
         return None, f"Erreur: {str(e)}"
 
+def register_dump_file(dump_path, sha256, source, filename=None):
+    # Profil détecté et dump enregistré : (dump, profil, erreur)
+    # Dump compressé : indexé par blocs une fois, sans copie décompressée ; un upload
+    # appartient à l'application et est transcodé à sa place
+    error = compressed_dumps.prepare(dump_path, in_place=source == 'upload')
+    if error:
+        logger.error(f"Dump compressé refusé: {error}")
+        return None, None, error
+    
+    # Format de l'image (LiME, core ELF ou brut) et plages physiques, lus une seule fois
+    layout = dump_formats.detect(dump_path)
+    logger.info(f"Format du dump: {layout['format']} ({len(layout['segments'])} plages physiques)")
+    
+    # Récupérer les informations du profil
+    profile_info, error = get_profile(dump_path)
+    if error:
+        logger.error(f"Erreur lors de l'analyse: {error}")
+        return None, None, error
+    if not profile_info:
+        logger.error("Informations non trouvées")
+        return None, None, 'Informations non trouvées'
+    
+    # Enregistrer le dump et ses métadonnées sous un identifiant propre
+    dump = dump_registry.create_dump(dump_path, profile_info, sha256, source, filename, layout)
+    logger.info(f"Informations trouvées: {profile_info}")
+    return dump, profile_info, None
+
+def analyze_dump(dump_path, sha256, source, filename=None):
+    dump, profile_info, error = register_dump_file(dump_path, sha256, source, filename)
+    if error:
+        return jsonify({'error': error}), 400
+    return jsonify(dict(profile_info, dump_id=dump['id']))
+
 @app.route('/upload_dump/', methods=['POST'])
 def upload_dump():
     logger.debug("Requête POST reçue sur /upload_dump/")
     
-    if 'file' not in request.files:
-        logger.error("Aucun fichier dans la requête")
-        return jsonify({'error': 'Aucun fichier n\'a été envoyé'}), 400
+    try:
+        # Partie fichier écrite directement dans le dossier d'upload, SHA-256 calculé au passage
+        upload, error = uploads.save_multipart(request.environ)
+        if error:
+            logger.error(error)
+            return jsonify({'error': error}), 400
+        logger.debug(f"Fichier reçu: {upload['filename']}")
+        dump_path = uploads.dump_path(upload['id'])
+        result_cache.remember_hash(dump_path, upload['sha256'])
+        logger.debug(f"Fichier sauvegardé: {dump_path}")
+        
+        return analyze_dump(dump_path, upload['sha256'], 'upload', upload['filename'])
+    except Exception as e:
+        logger.error(f"Erreur lors du traitement du fichier: {str(e)}")
+        return jsonify({
+            'error': f'Erreur lors du traitement du fichier : {str(e)}'
+        }), 500
+
+@app.route('/register_dump', methods=['POST'])
+def register_dump():
+    # Dump déjà présent sur le serveur : analysé sur place, sans copie
+    data = request.get_json(silent=True) or {}
+    try:
+        dump_path = uploads.resolve_local_dump(data.get('path', ''))
+    except uploads.UploadError as e:
+        logger.error(f"Enregistrement refusé pour {data.get('path')}: {str(e)}")
+        return jsonify({'error': str(e)}), 403
+    
+    logger.debug(f"Dump local enregistré: {dump_path}")
+    try:
+        return analyze_dump(dump_path, result_cache.sampled_hash(dump_path), 'local')
+    except Exception as e:
+        logger.error(f"Erreur lors du traitement du fichier: {str(e)}")
+        return jsonify({
+            'error': f'Erreur lors du traitement du fichier : {str(e)}'
+        }), 500
+
+@app.route('/uploads', methods=['POST'])
+def create_upload():
+    data = request.get_json(silent=True) or {}
+    size = data.get('size')
+    if not isinstance(size, int) or size <= 0:
+        return jsonify({'error': 'Taille de fichier invalide'}), 400
     
-    file = request.files['file']
-    if file.filename == '':
-        logger.error("Nom de fichier vide")
-        return jsonify({'error': 'Aucun fichier sélectionné'}), 400
+    upload = uploads.create_upload(data.get('filename', ''), size)
+    return jsonify(upload), 201
+
+@app.route('/uploads/<upload_id>', methods=['GET'])
+def upload_status(upload_id):
+    upload = uploads.get_upload(upload_id)
+    if upload is None:
+        return jsonify({'error': 'Upload introuvable'}), 404
+    return jsonify(upload)
+
+@app.route('/uploads/<upload_id>', methods=['PUT'])
+def upload_chunk(upload_id):
+    # Corps brut (application/octet-stream) écrit au fil de l'eau, sans passer par le multipart
+    try:
+        offset = int(request.args.get('offset', 0))
+        upload = uploads.write_chunk(upload_id, offset, request.stream)
+    except uploads.OffsetMismatchError as e:
+        return jsonify({'error': str(e), 'offset': e.expected}), 409
+    except (uploads.UploadError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
     
-    logger.debug(f"Fichier reçu: {file.filename}")
+    if upload['status'] != 'complete':
+        return jsonify(upload)
     
     try:
-        # Sauvegarder le fichier temporairement
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            file.save(temp_file.name)
-            logger.debug(f"Fichier sauvegardé temporairement: {temp_file.name}")
-            
-            # Récupérer les informations du profil
-            profile_info, error = get_profile(temp_file.name)
-            if error:
-                logger.error(f"Erreur lors de l'analyse: {error}")
-                return jsonify({'error': error}), 400
-            
-            # Sauvegarder le chemin du fichier temporaire pour une utilisation ultérieure
-            with open('last_dump_path.txt', 'w') as f:
-                f.write(temp_file.name)
-            
-            if profile_info:
-                # Sauvegarder les résultats dans last_analysis.json
-                results = {
-                    'os': 'Linux',
-                    'kernel_version': profile_info['kernel_version'],
-                    'distribution': profile_info['distribution'],
-                    'distribution_version': profile_info['distro_version'],
-                    'command': 'banners.Banners',
-                    'output': []
-                }
-                
-                with open('last_analysis.json', 'w') as f:
-                    json.dump(results, f)
-                
-                logger.info(f"Informations trouvées: {profile_info}")
-                return jsonify(profile_info)
-            else:
-                logger.error("Informations non trouvées")
-                return jsonify({
-                    'error': 'Informations non trouvées'
-                }), 400
+        dump_path = uploads.dump_path(upload_id)
+        result_cache.remember_hash(dump_path, upload['sha256'])
+        return analyze_dump(dump_path, upload['sha256'], 'upload', upload['filename'])
     except Exception as e:
         logger.error(f"Erreur lors du traitement du fichier: {str(e)}")
         return jsonify({
             'error': f'Erreur lors du traitement du fichier : {str(e)}'
         }), 500
 
+def dump_layout(dump):
+    # Dumps enregistrés avant la détection de format : détectés à leur première analyse
+    if 'format' not in dump:
+        dump = dump_registry.update_dump(dump['id'], **dump_formats.detect(dump['path'])) or dump
+    return {'format': dump.get('format'), 'segments': dump.get('segments'), 'stack': dump.get('stack')}
+
+def save_stack(dump):
+    # Pile de couches construite par cette analyse : les sessions suivantes la reprennent
+    stack = volatility_engine.stack_config(dump['path'])
+    if stack and not dump.get('stack'):
+        dump_registry.update_dump(dump['id'], stack=stack)
+        logger.info(f"Pile de couches enregistrée pour le dump {dump['id']}")
+
+def run_plugin_analysis(dump_id, plugin_name, engine=None, on_row=None):
+    dump = dump_registry.get_dump(dump_id)
+    if dump is None:
+        return None, False, 'Dump introuvable'
+    
+    # Les résultats sont mis en cache par (contenu du dump, bannière, plugin, arguments)
+    cache_key = result_cache.make_key(
+        result_cache.content_id(dump['path'], dump['sha256']), dump['banner'], plugin_name
+    )
+    # Un moteur explicite ('?engine=') sert à mesurer une exécution : pas de cache
+    output = None if engine else result_cache.get(cache_key)
+    cached = output is not None
+    
+    if not cached:
+        output, error = get_process_list(dump['path'], plugin_name, engine, on_row, dump_layout(dump))
+        if error:
+            return None, cached, error
+        save_stack(dump)
+        result_cache.put(cache_key, output)
+    
+    # Chaque dump garde ses propres résultats, par plugin. Un résultat servi par le cache et
+    # déjà enregistré n'est pas réécrit : sa version, clé des index en mémoire, des PDF et de
+    # l'index de recherche, reste la même
+    if not cached or dump_registry.result_info(dump_id, plugin_name) is None:
+        dump_registry.save_result(
+            dump_id, plugin_name, output, plugins.fields(plugin_name)
+        )
+    
+    return output, cached, None
+
+def run_plugin_job(params):
+    # Exécuté dans un processus du pool de jobs ; les lignes sont diffusées pendant l'exécution
+    spool = row_stream.RowSpool(
+        row_stream.spool_path(jobs.current_job_id()), functools.partial(plugins.parse, params['plugin'])
+    )
+    with spool:
+        output, cached, error = run_plugin_analysis(
+            params['dump_id'], params['plugin'], params.get('engine'), on_row=spool
+        )
+    if error:
+        raise RuntimeError(error)
+    return {'dump_id': params['dump_id'], 'plugin': params['plugin'], 'rows': len(output), 'cached': cached}
+
+jobs.register_handler('plugin', run_plugin_job)
+
+def run_triage_plugin(dump_id, plugin_name):
+    # Exécuté dans un processus fils du triage, issu de fork après préparation de la session ;
+    # les lignes restent dans le résultat enregistré, seul leur nombre est renvoyé
+    start = time.perf_counter()
+    try:
+        output, cached, error = run_plugin_analysis(dump_id, plugin_name)
+    except Exception as e:
+        output, cached, error = None, False, f"Erreur: {str(e)}"
+    return {
+        'plugin': plugin_name,
+        'success': error is None,
+        'cached': cached,
+        'error': error,
+        'rows': len(output) if output is not None else 0,
+        'elapsed': time.perf_counter() - start,
+    }
+
+def run_triage_job(params):
+    # Exécuté dans un processus du pool de jobs, sans autre thread : les fils du triage y sont
+    # créés par fork sans risque de verrou tenu, et un triage n'occupe qu'une place du pool.
+    # Chaque plugin terminé est diffusé comme une ligne du job (/jobs/<id>/stream)
+    dump = dump_registry.get_dump(params['dump_id'])
+    if dump is None:
+        raise RuntimeError('Dump introuvable')
+    start = time.perf_counter()
+    results = []
+    with row_stream.RowSpool(row_stream.spool_path(jobs.current_job_id()), list) as spool:
+        task = functools.partial(run_triage_plugin, dump['id'])
+        for result in triage.run(dump['path'], params['plugins'], task, layout=dump_layout(dump)):
+            results.append(result)
+            spool(result)
+            spool.flush()
+    return {'dump_id': dump['id'], 'results': results, 'elapsed': time.perf_counter() - start}
+
+jobs.register_handler('triage', run_triage_job)
+
+@app.route('/triage', methods=['POST'])
+def run_triage():
+    # Plusieurs plugins en parallèle sur un même contexte, dans un job : une ligne par plugin
+    # terminé sur /jobs/<id>/stream, et toutes dans le résultat du job
+    data = request.get_json(silent=True) or {}
+    dump = dump_registry.get_dump(data.get('dump_id'))
+    if dump is None:
+        return jsonify({'error': 'Dump introuvable'}), 404
+    plugin_names = data.get('plugins') or plugins.triage_commands()
+    if not isinstance(plugin_names, list) or not all(
+        isinstance(name, str) and plugins.get(name) is not None for name in plugin_names
+    ):
+        return jsonify({'error': 'Liste de plugins invalide'}), 400
+    
+    try:
+        job = jobs.submit('triage', {'dump_id': dump['id'], 'plugins': list(dict.fromkeys(plugin_names))})
+    except jobs.QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    return jsonify(job), 202
+
 @app.route('/execute_plugin/<plugin_name>', methods=['GET'])
 def execute_plugin(plugin_name):
     try:
-        # Lire le chemin du dernier dump analysé
-        with open('last_dump_path.txt', 'r') as f:
-            dump_path = f.read().strip()
+        # Exécuter le plugin spécifié ('?engine=subprocess' pour comparer les temps)
+        dump_id = request.args.get('dump_id')
+        if not dump_id:
+            return jsonify({'error': 'Aucun dump spécifié'}), 400
         
-        # Exécuter le plugin spécifié
-        output, error = get_process_list(dump_path, plugin_name)
+        output, cached, error = run_plugin_analysis(dump_id, plugin_name, request.args.get('engine'))
         if error:
             return jsonify({'error': error}), 400
         
-        # Mettre à jour last_analysis.json avec les nouveaux résultats
-        with open('last_analysis.json', 'r') as f:
-            results = json.load(f)
-        
-        results['command'] = plugin_name
-        results['output'] = output
-        
-        with open('last_analysis.json', 'w') as f:
-            json.dump(results, f)
-        
-        return jsonify({'success': True, 'output': output})
+        return jsonify({'success': True, 'cached': cached, 'output': output})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/results', methods=['GET'])
-def show_results():
+@app.route('/plugins', methods=['GET'])
+def list_plugins():
+    return jsonify(plugins.catalog())
+
+@app.route('/dumps', methods=['GET'])
+def list_dumps():
+    return jsonify(dump_registry.list_dumps())
+
+@app.route('/dumps/<dump_id>', methods=['GET'])
+def dump_details(dump_id):
+    dump = dump_registry.get_dump(dump_id)
+    if dump is None:
+        return jsonify({'error': 'Dump introuvable'}), 404
+    return jsonify(dict(dump, results=dump_registry.list_results(dump_id)))
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    data = request.get_json(silent=True) or {}
+    plugin_name = data.get('plugin')
+    if not plugin_name:
+        return jsonify({'error': 'Aucun plugin spécifié'}), 400
+    if dump_registry.get_dump(data.get('dump_id')) is None:
+        return jsonify({'error': 'Dump introuvable'}), 404
+    timeout = data.get('timeout')
+    if timeout is not None and (
+        isinstance(timeout, bool) or not isinstance(timeout, int) or not 0 < timeout <= jobs.MAX_JOB_TIMEOUT
+    ):
+        return jsonify({'error': f"Délai invalide : entier de 1 à {jobs.MAX_JOB_TIMEOUT} secondes attendu"}), 400
+    
     try:
-        with open('last_analysis.json', 'r') as f:
-            results = json.load(f)
-        
-        command = results.get('command', '')
-        output = results.get('output', [])
-        lang = request.args.get('lang', 'en')
-        t = translations[lang]
-        
-        # Générer le HTML en fonction de la commande
-        if command == "linux.bash":
-            html = generate_bash_html(output[1:], t)
-        elif command == "linux.envars":
-            html = generate_envars_html(output[1:], t)
-        elif command == "linux.boottime.Boottime":
-            html = generate_boottime_html(output[1:], t)
-        elif command == "linux.pagecache.Files":
-            html = generate_pagecache_files_html(output[1:], t)
-        elif command == "linux.pslist.PsList":
-            html = generate_pslist_html(output[1:], t)
-        elif command == "linux.ip.Addr":
-            html = generate_ipaddr_html(output[1:], t)
-        elif command == "linux.check_syscall.Check_syscall":
-            html = generate_check_syscall_html(output[1:], t)
-        elif command == "linux.elfs.Elfs":
-            html = generate_elfs_html(output[1:], t)
-        elif command == "linux.hidden_modules.Hidden_modules":
-            html = generate_hidden_modules_html(output[1:], t)
-        elif command == "linux.library_list.LibraryList":
-            html = generate_library_list_html(output[1:], t)
-        elif command == "linux.pagecache.RecoverFs":
-            html = generate_recover_fs_html(output[1:], t)
-        elif command == "linux.psaux.PsAux":
-            html = generate_psaux_html(output[1:], t)
+        job = jobs.submit(
+            'plugin',
+            {'dump_id': data['dump_id'], 'plugin': plugin_name, 'engine': data.get('engine')},
+            timeout=timeout
+        )
+    except jobs.QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    return jsonify(job), 202
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    return jsonify(jobs.list_jobs())
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job introuvable'}), 404
+    return jsonify(job)
+
+def server_sent_event(event, data, event_id=None):
+    # data est déjà du JSON sur une seule ligne
+    prefix = f"id: {event_id}\n" if event_id is not None else ''
+    return f"{prefix}event: {event}\ndata: {data}\n\n"
+
+# Un flux garde un thread du serveur jusqu'à la fin du job : le nombre de flux ouverts est
+# borné pour laisser des threads aux autres requêtes
+_stream_slots = threading.BoundedSemaphore(row_stream.MAX_STREAMS)
+
+@app.route('/jobs/<job_id>/stream', methods=['GET'])
+def stream_job(job_id):
+    # Server-Sent Events : lignes du plugin au fil de l'exécution ('rows'), compteurs ('progress'),
+    # puis l'état final du job ('end'). '?rows=N' limite les lignes envoyées, les compteurs
+    # continuent ; l'identifiant d'événement (Last-Event-ID) permet de reprendre après une coupure
+    if jobs.get(job_id) is None:
+        return jsonify({'error': 'Job introuvable'}), 404
+    try:
+        received = int(request.headers.get('Last-Event-ID') or 0)
+        max_rows = int(request.args['rows']) if 'rows' in request.args else None
+    except ValueError:
+        return jsonify({'error': 'Paramètres invalides'}), 400
+    if not _stream_slots.acquire(blocking=False):
+        # Le client suit alors le job par GET /jobs/<id>, ou rouvre le flux plus tard
+        return jsonify({
+            'error': 'Trop de flux ouverts, réessayez plus tard', 'retry': row_stream.STREAM_RETRY_SECONDS
+        }), 503, {'Retry-After': str(row_stream.STREAM_RETRY_SECONDS)}
+    
+    def progress(job, count):
+        elapsed = time.time() - job['started_at'] if job['started_at'] else 0
+        return json.dumps({'status': job['status'], 'received': count, 'elapsed': round(elapsed, 1)})
+    
+    def generate():
+        count = received
+        finished = lambda: jobs.get(job_id)['status'] in jobs.FINISHED_STATUSES
+        for lines in row_stream.follow(row_stream.spool_path(job_id), finished, received):
+            kept = lines if max_rows is None else lines[:max(max_rows - count, 0)]
+            count += len(lines)
+            if kept:
+                yield server_sent_event('rows', f'{{"rows":[{",".join(kept)}],"received":{count}}}', count)
+            else:
+                yield server_sent_event('progress', progress(jobs.get(job_id), count), count)
+        yield server_sent_event('end', json.dumps(jobs.get(job_id)))
+    
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+    # Place libérée quand le serveur ferme la réponse : fin du job ou client déconnecté
+    response.call_on_close(_stream_slots.release)
+    return response
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    job = jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job introuvable'}), 404
+    return jsonify(job)
+
+@app.cli.command('import-isf')
+@click.argument('source')
+def import_isf(source):
+    # flask import-isf <dossier ou fichier ISF> : ajoute un pack au magasin de symboles
+    try:
+        imported = symbol_store.import_pack(source)
+    except symbol_store.SymbolStoreError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"{imported} ISF importés dans {symbol_store.SYMBOLS_DIR}")
+
+def batch_analyze(plugin_names, dump_path):
+    # Un dump du lot, dans son propre processus : profil et enregistrement (réutilisé à la
+    # reprise d'un lot interrompu), puis chaque plugin, résultats dans le magasin partagé
+    start = time.perf_counter()
+    sha256 = result_cache.sampled_hash(dump_path)
+    dump = dump_registry.find_dump(dump_path, sha256)
+    if dump is None:
+        dump, _, error = register_dump_file(dump_path, sha256, 'batch')
+        if error:
+            raise RuntimeError(error)
+    results = {}
+    for plugin_name in plugin_names:
+        try:
+            output, cached, error = run_plugin_analysis(dump['id'], plugin_name)
+        except Exception as e:
+            output, cached, error = None, False, f"Erreur: {str(e)}"
+        results[plugin_name] = {'error': error} if error else {'rows': len(output), 'cached': cached}
+    return {
+        'dump_id': dump['id'],
+        'kernel_version': dump['kernel_version'],
+        'plugins': results,
+        'elapsed': time.perf_counter() - start,
+    }
+
+@app.cli.command('batch')
+@click.argument('sources', nargs=-1)
+@click.option('--manifest', multiple=True, help='Fichier listant un dump par ligne')
+@click.option('--plugins', 'plugin_list', default='', help='Plugins séparés par des virgules (triage par défaut)')
+@click.option('--workers', default=batch.BATCH_WORKERS, help='Dumps analysés en même temps')
+@click.option('--memory-limit', default=batch.BATCH_MEMORY_LIMIT, help='Mo par processus (0 : sans limite)')
+@click.option('--timeout', default=batch.BATCH_TIMEOUT, help='Secondes au plus par dump')
+@click.option('--journal', default=batch.BATCH_JOURNAL, help='Journal de reprise (JSONL)')
+@click.option('--retry-failed', is_flag=True, help='Réanalyse les dumps en échec dans le journal')
+def batch_command(sources, manifest, plugin_list, workers, memory_limit, timeout, journal, retry_failed):
+    # flask batch <dossiers ou dumps...> [--manifest liste.txt] : analyse d'un lot sans passer par HTTP
+    plugin_names = [name for name in plugin_list.split(',') if name] or plugins.triage_commands()
+    unknown = [name for name in plugin_names if plugins.get(name) is None]
+    if unknown:
+        raise click.BadParameter(f"Plugins inconnus: {', '.join(unknown)}")
+    paths = batch.collect(sources, manifest)
+    if not paths:
+        raise click.UsageError("Aucun dump à analyser")
+    click.echo(f"{len(paths)} dumps, {len(plugin_names)} plugins, {workers} processus, journal {journal}")
+    
+    volatility_engine.preload()
+    start = time.perf_counter()
+    counts = {'done': 0, 'failed': 0, 'skipped': 0}
+    for entry in batch.run(paths, functools.partial(batch_analyze, plugin_names), journal, workers,
+                           memory_limit, timeout, retry_failed, key=sorted(plugin_names)):
+        if entry['skipped']:
+            counts['skipped'] += 1
+            continue
+        counts[entry['status']] += 1
+        hours = (time.perf_counter() - start) / 3600
+        if entry['status'] == 'done':
+            result = entry['result']
+            failed = [name for name, info in result['plugins'].items() if 'error' in info]
+            detail = f"{result['kernel_version']}, {len(plugin_names) - len(failed)}/{len(plugin_names)} plugins"
         else:
-            html = "<p>Format de sortie non supporté</p>"
-        
-        return f"""
+            detail = entry['error']
+        click.echo(
+            f"[{counts['done'] + counts['failed']}/{len(paths) - counts['skipped']}] {entry['status']} "
+            f"{entry['path']} en {entry.get('elapsed', 0):.0f}s ({detail}) - "
+            f"{(counts['done'] + counts['failed']) / max(hours, 1e-9):.1f} dumps/h"
+        )
+    elapsed = time.perf_counter() - start
+    processed = counts['done'] + counts['failed']
+    click.echo(
+        f"{counts['done']} analysés, {counts['failed']} en échec, {counts['skipped']} déjà dans le journal, "
+        f"en {elapsed:.0f}s ({processed / max(elapsed / 3600, 1e-9):.1f} dumps/h)"
+    )
+
+@app.cli.command('reindex-search')
+@click.option('--all', 'reindex_all', is_flag=True, help='Réindexe aussi les résultats à jour')
+def reindex_search(reindex_all):
+    # flask reindex-search : indexe les résultats enregistrés avant l'index, ou modifiés depuis
+    indexed = search_index.indexed_versions()
+    start = time.perf_counter()
+    total = 0
+    for dump in dump_registry.list_dumps():
+        for plugin_name in dump_registry.list_results(dump['id']):
+            version = dump_registry.result_version(dump['id'], plugin_name)
+            if plugins.get(plugin_name) is None or (not reindex_all and indexed.get((dump['id'], plugin_name)) == version):
+                continue
+            fields = plugins.fields(plugin_name)
+            count = search_index.index_result(
+                dump['id'], plugin_name, dump_registry.iter_rows(dump['id'], plugin_name, fields), version
+            )
+            total += count
+            click.echo(f"{dump['id']} {plugin_name}: {count} lignes")
+    click.echo(f"{total} lignes indexées en {time.perf_counter() - start:.1f}s dans {search_index.SEARCH_DB}")
+
+@app.cli.command('bench-banners')
+@click.argument('dump_path')
+def bench_banners(dump_path):
+    # flask bench-banners <dump> : scanner natif (1 cœur / tous les cœurs) contre banners.Banners
+    timings = []
+    start = time.perf_counter()
+    found = banner_scanner.find_banner(dump_path, workers=1)
+    timings.append(('natif, 1 processus', time.perf_counter() - start, found))
+    start = time.perf_counter()
+    found = banner_scanner.find_banner(dump_path)
+    timings.append((f"natif, {banner_scanner.SCAN_WORKERS} processus", time.perf_counter() - start, found))
+    for mode in ('inprocess', 'subprocess'):
+        start = time.perf_counter()
+        rows, error = volatility_engine.run_plugin(dump_path, 'banners.Banners', mode=mode)
+        found = error or next((row['Banner'] for row in rows if 'Linux version' in (row.get('Banner') or '')), None)
+        timings.append((f"banners.Banners ({mode})", time.perf_counter() - start, found))
+    
+    size_mb = compressed_dumps.image_size(dump_path) / (1024 * 1024)
+    for name, elapsed, found in timings:
+        click.echo(f"{name:<35} {elapsed:8.2f}s {size_mb / elapsed:10.1f} Mo/s  {found}")
+
+@app.cli.command('bench-render')
+@click.argument('command')
+@click.option('--rows', default=100000, help='Nombre de lignes synthétiques')
+def bench_render(command, rows):
+    # flask bench-render <plugin> : débit du rendu compilé, le même pour tous les plugins
+    if plugins.get(command) is None:
+        raise click.BadParameter(f"Plugin inconnu: {command}")
+    fields = plugins.fields(command)
+    sample = [{field: f"{field} <{i}>" for field in fields} for i in range(rows)]
+    for lang in translations:
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in table_renderer(command, lang)(sample))
+        elapsed = time.perf_counter() - start
+        click.echo(f"{command} ({lang}): {rows} lignes en {elapsed:.2f}s, {rows / elapsed:,.0f} lignes/s, {size / 1024 ** 2:.1f} Mo")
+
+@app.cli.command('bench-layer')
+@click.argument('dump_path')
+@click.option('--size', default=1024, help='Mo lus au plus')
+@click.option('--reads', default=20000, help='Lectures aléatoires de pages')
+@click.option('--processes', default=1, help='Analyses simultanées de la même image')
+def bench_layer(dump_path, size, reads, processes):
+    # flask bench-layer <dump> : couche fichier de Volatility contre couche projetée en mémoire
+    import dump_layers
+    
+    # Dump compressé : seule la couche à blocs sait le lire
+    modes = ['mmap'] if compressed_dumps.open_reader(dump_path) else list(dump_layers.LAYER_CLASSES)
+    for mode in modes:
+        for run in ('1er passage', '2e passage'):
+            results = dump_layers.benchmark_concurrent(dump_path, mode, size * 1024 * 1024, reads, processes)
+            sequential = sum(result['sequential'] for result in results) / 1024 ** 2
+            scan = sum(result['scan'] for result in results) / 1024 ** 2
+            pages = sum(result['random'] for result in results)
+            click.echo(
+                f"{results[0]['layer']:<20} {run:<11} x{processes}: séquentiel {sequential:9.1f} Mo/s  "
+                f"scan {scan:8.1f} Mo/s  pages aléatoires {pages:10,.0f}/s"
+            )
+
+@app.route('/engine_stats', methods=['GET'])
+def engine_stats():
+    # Temps d'exécution in-process et subprocess côte à côte
+    return jsonify(volatility_engine.get_stats())
+
+@app.route('/api/results', methods=['GET'])
+def query_results():
+    # Page de résultats triée et filtrée côté serveur :
+    # ?dump_id=&plugin=&offset=&limit=&sort=pid,-comm&filter=comm:contains:ssh&filter=pid:range:100..200
+    dump_id = request.args.get('dump_id', '')
+    plugin_name = request.args.get('plugin', '')
+    version = dump_registry.result_version(dump_id, plugin_name)
+    if version is None or plugins.get(plugin_name) is None:
+        return jsonify({'error': 'Résultats introuvables'}), 404
+    
+    fields = plugins.fields(plugin_name)
+    try:
+        filters = result_index.parse_filters(request.args.getlist('filter'))
+        sort = result_index.parse_sort(request.args.get('sort'))
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = max(min(int(request.args.get('limit', 100)), result_index.MAX_PAGE_SIZE), 0)
+    except (result_index.QueryError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not filters and not sort:
+        # Sans filtre ni tri : seule la page demandée est lue dans le fichier en colonnes
+        info = dump_registry.result_info(dump_id, plugin_name)
+        columns = dump_registry.load_columns(dump_id, plugin_name, fields, offset, limit)
+        if info is None or columns is None:
+            return jsonify({'error': 'Résultats introuvables'}), 404
+        size = len(next(iter(columns.values()), []))
+        return jsonify({
+            'fields': fields,
+            'total': info['rows'],
+            'filtered': info['rows'],
+            'offset': offset,
+            'limit': limit,
+            'rows': [{field: columns.get(field, [None] * size)[i] for field in fields} for i in range(size)],
+        })
+    
+    table = result_index.get_table(
+        (dump_id, plugin_name, version), fields,
+        lambda: dump_registry.load_columns(dump_id, plugin_name, fields)
+    )
+    if table is None:
+        return jsonify({'error': 'Résultats introuvables'}), 404
+    
+    try:
+        page = table.query(filters=filters, sort=sort, offset=offset, limit=limit)
+    except result_index.QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(page)
+
+def compare_results(base_id, target_id, plugin_name, limit=result_diff.MAX_DIFF_ROWS):
+    # (diff, erreur) des résultats enregistrés d'un plugin sur deux dumps, joints sur la clé
+    # naturelle déclarée dans le registre des plugins
+    entry = plugins.get(plugin_name)
+    if entry is None:
+        return None, 'Plugin inconnu'
+    columns = []
+    for dump_id in (base_id, target_id):
+        if dump_registry.get_dump(dump_id) is None:
+            return None, 'Dump introuvable'
+        loaded = dump_registry.load_columns(dump_id, plugin_name, entry['fields'])
+        if loaded is None:
+            return None, f"Résultats de {plugin_name} introuvables pour le dump {dump_id}"
+        columns.append(loaded)
+    result = result_diff.diff(
+        columns[0], columns[1], entry['fields'], entry['diff_keys'], entry['diff_ignored'], limit
+    )
+    return dict(result, plugin=plugin_name, base=base_id, target=target_id), None
+
+@app.route('/api/diff', methods=['GET'])
+def diff_results():
+    # Lignes ajoutées, supprimées et modifiées entre deux dumps : ?base=&target=&plugin=&limit=
+    try:
+        limit = max(min(int(request.args.get('limit', result_diff.MAX_DIFF_ROWS)), result_diff.MAX_DIFF_ROWS), 0)
+    except ValueError:
+        return jsonify({'error': 'Limite invalide'}), 400
+    result, error = compare_results(
+        request.args.get('base', ''), request.args.get('target', ''), request.args.get('plugin', ''), limit
+    )
+    if error:
+        return jsonify({'error': error}), 404
+    return jsonify(result)
+
+@app.route('/api/search', methods=['GET'])
+def search_results():
+    # Recherche plein texte (IP, empreinte, chemin, ligne de commande) dans tous les résultats
+    # enregistrés : ?q=&dump_id=&plugin=&offset=&limit=
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = max(min(int(request.args.get('limit', 100)), search_index.MAX_SEARCH_RESULTS), 1)
+        result = search_index.search(
+            request.args.get('q', ''), request.args.get('dump_id'), request.args.get('plugin'), offset, limit
+        )
+    except (search_index.SearchError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    dumps = {}
+    for match in result['matches']:
+        if match['dump_id'] not in dumps:
+            dumps[match['dump_id']] = dump_registry.get_dump(match['dump_id']) or {}
+        match['filename'] = dumps[match['dump_id']].get('filename')
+    return jsonify(result)
+
+def load_process_tree(dump_id, plugin_name):
+    # Arbre des processus d'un résultat pslist/psaux, construit une fois par version du résultat
+    entry = plugins.get(plugin_name)
+    version = dump_registry.result_version(dump_id, plugin_name)
+    if entry is None or not entry['tree'] or version is None:
+        return None
+    return process_tree.get_tree(
+        (dump_id, plugin_name, version), entry['fields'],
+        lambda: dump_registry.load_columns(dump_id, plugin_name, entry['fields'])
+    )
+
+def tree_pid_arg(name='pid'):
+    value = request.args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise process_tree.TreeError(f"PID invalide: {value}")
+
+@app.route('/api/process_tree', methods=['GET'])
+def query_process_tree():
+    # Enfants d'un processus, par page (racines sans pid), avec sa chaîne d'ancêtres et ses
+    # threads : ?dump_id=&plugin=&pid=&offset=&limit=
+    tree = load_process_tree(request.args.get('dump_id', ''), request.args.get('plugin', 'linux.pslist.PsList'))
+    if tree is None:
+        return jsonify({'error': 'Résultats introuvables'}), 404
+    try:
+        pid = tree_pid_arg()
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = max(min(int(request.args.get('limit', 200)), process_tree.MAX_TREE_NODES), 0)
+        children, total = tree.list_children(pid, offset, limit)
+        details = {} if pid is None else {
+            'node': tree.node(pid),
+            'ancestors': tree.ancestors(pid),
+            'thread_ids': tree.list_threads(pid),
+        }
+    except (process_tree.TreeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(dict(
+        details, pid=pid, children=children, total=total, offset=offset, limit=limit, stats=tree.stats()
+    ))
+
+@app.route('/api/process_tree/subtree', methods=['GET'])
+def query_process_subtree():
+    # Sous-arbre d'un processus en ordre préfixe : ?dump_id=&plugin=&pid=&depth=&limit=
+    tree = load_process_tree(request.args.get('dump_id', ''), request.args.get('plugin', 'linux.pslist.PsList'))
+    if tree is None:
+        return jsonify({'error': 'Résultats introuvables'}), 404
+    try:
+        pid = tree_pid_arg()
+        if pid is None:
+            raise process_tree.TreeError('PID manquant')
+        depth = request.args.get('depth')
+        depth = None if depth in (None, '') else max(int(depth), 0)
+        limit = max(min(int(request.args.get('limit', process_tree.MAX_TREE_NODES)), process_tree.MAX_TREE_NODES), 1)
+        nodes, truncated = tree.subtree(pid, depth, limit)
+    except (process_tree.TreeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'pid': pid, 'depth': depth, 'nodes': nodes, 'truncated': truncated})
+
+def load_pid_index(dump_id, plugin_name):
+    # Lignes d'un résultat groupées par pid, construites une fois par version du résultat
+    version = dump_registry.result_version(dump_id, plugin_name)
+    if version is None:
+        return None
+    fields = plugins.fields(plugin_name)
+    return process_dossier.get_index(
+        (dump_id, plugin_name, version), fields,
+        lambda: dump_registry.load_columns(dump_id, plugin_name, fields)
+    )
+
+def active_job(kind, params):
+    # Job de même type et mêmes paramètres encore en file ou en cours, à suivre plutôt qu'à relancer
+    return next((
+        job for job in jobs.list_jobs()
+        if job['kind'] == kind and job['params'] == params and job['status'] not in jobs.FINISHED_STATUSES
+    ), None)
+
+def dossier_job_params(dump_id):
+    # Paramètres des jobs 'plugin' des plugins du dossier encore sans résultat enregistré
+    return [
+        {'dump_id': dump_id, 'plugin': command, 'engine': None}
+        for command in plugins.dossier_commands().values()
+        if dump_registry.result_version(dump_id, command) is None
+    ]
+
+def process_dossier_record(dump_id, pid):
+    # (dossier, erreur) : lignes du processus dans les résultats enregistrés de psaux, envars,
+    # bash, elfs et library_list ; aucun plugin n'est exécuté ici
+    if dump_registry.get_dump(dump_id) is None:
+        return None, 'Dump introuvable'
+    start = time.perf_counter()
+    commands = plugins.dossier_commands()
+    # Section du processus en tête
+    sections = sorted(commands, key=lambda section: section != 'process')
+    record = process_dossier.build(pid, {section: load_pid_index(dump_id, commands[section]) for section in sections})
+    pending = [active_job('plugin', params) for params in dossier_job_params(dump_id)]
+    record.update(
+        dump_id=dump_id, plugins=commands, jobs=[job for job in pending if job],
+        elapsed=time.perf_counter() - start
+    )
+    return record, None
+
+@app.route('/api/dossier', methods=['GET'])
+def query_dossier():
+    # Dossier d'un processus depuis les résultats enregistrés : ?dump_id=&pid=
+    # 'missing' liste les sections sans résultat, 'jobs' ceux déjà en file pour elles
+    try:
+        pid = int(request.args.get('pid', ''))
+    except ValueError:
+        return jsonify({'error': 'PID invalide'}), 400
+    record, error = process_dossier_record(request.args.get('dump_id', ''), pid)
+    if error:
+        return jsonify({'error': error}), 404
+    return jsonify(record)
+
+@app.route('/api/dossier', methods=['POST'])
+def prepare_dossier():
+    # Soumet un job 'plugin' par plugin du dossier sans résultat ({"dump_id": ...}), ou reprend
+    # celui déjà en file ; le client suit les jobs puis relit le dossier
+    data = request.get_json(silent=True) or {}
+    dump_id = data.get('dump_id')
+    if dump_registry.get_dump(dump_id) is None:
+        return jsonify({'error': 'Dump introuvable'}), 404
+    try:
+        submitted = [
+            active_job('plugin', params) or jobs.submit('plugin', params)
+            for params in dossier_job_params(dump_id)
+        ]
+    except jobs.QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    return jsonify({'dump_id': dump_id, 'jobs': submitted}), 202 if submitted else 200
+
+@functools.lru_cache(maxsize=None)
+def table_renderer(command, lang):
+    # Rendu HTML compilé une fois par (plugin, langue) : en-tête figé et gabarit de ligne,
+    # les lignes sont produites une à une
+    t = translations[lang]
+    fields = plugins.fields(command)
+    header = (
+        '<table><thead><tr>'
+        + ''.join(f"<th>{html.escape(t.get(field, field))}</th>" for field in fields)
+        + '</tr></thead><tbody>'
+    )
+    row_template = '<tr>' + '<td>{}</td>' * len(fields) + '</tr>'
+    
+    def render(rows):
+        yield header
+        for row in rows:
+            yield row_template.format(*[
+                'N/A' if value is None else html.escape(str(value)) for value in map(row.get, fields)
+            ])
+        yield '</tbody></table>'
+    
+    return render
+
+RESULTS_PAGE_SIZE = 200
+RESULTS_ROW_HEIGHT = 34
+
+@app.route('/results', methods=['GET'])
+def show_results():
+    # Coquille légère envoyée tout de suite : les lignes sont chargées par page depuis
+    # /api/results et seules les lignes visibles existent dans le DOM
+    dump_id = request.args.get('dump_id', '')
+    command = request.args.get('plugin', '')
+    dump = dump_registry.get_dump(dump_id)
+    info = dump_registry.result_info(dump_id, command)
+    if dump is None or info is None or plugins.get(command) is None:
+        return "Error: Résultats introuvables", 404
+    
+    lang = request.args.get('lang', 'en')
+    t = translations[lang]
+    fields = plugins.fields(command)
+    labels = {field: t.get(field, field) for field in fields}
+    title = html.escape(t['title'].format(command=command))
+    query = f"dump_id={dump_id}&plugin={urllib.parse.quote(command)}"
+    
+    def generate():
+        yield f"""
         <!DOCTYPE html>
         <html>
         <head>
+            <meta charset="utf-8">
             <link rel="preconnect" href="https://fonts.googleapis.com">
             <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
             <link href="https://fonts.googleapis.com/css2?family=Lexend:wght@100..900&display=swap" rel="stylesheet">
-            <title>{t['title'].format(command=command)}</title>
+            <title>{title}</title>
             <style>
                 body {{
                     font-family: 'Lexend', sans-serif;
@@ -615,25 +1213,53 @@ def show_results():
                 .language-switch button:hover {{
                     background-color: #0056b3;
                 }}
-                table {{
-                    width: 100%;
-                    border-collapse: collapse;
-                    margin-top: 20px;
+                .grid-row {{
+                    display: grid;
+                    grid-template-columns: repeat({len(fields)}, minmax(120px, 1fr));
                 }}
-                th, td {{
+                .grid-row > div {{
                     padding: 8px;
-                    text-align: left;
                     border-bottom: 1px solid #ddd;
+                    overflow: hidden;
+                    text-overflow: ellipsis;
+                    white-space: nowrap;
+                    height: {RESULTS_ROW_HEIGHT - 17}px;
                 }}
-                th {{
+                .grid-head > div {{
                     background-color: #f8f9fa;
                     font-weight: bold;
+                    cursor: pointer;
+                    user-select: none;
                 }}
-                tr:hover {{
+                .grid-body .grid-row:hover {{
                     background-color: #f5f5f5;
                 }}
-                .filter-row {{
+                .viewport {{
+                    height: 70vh;
+                    overflow: auto;
+                    position: relative;
+                    margin-top: 20px;
+                }}
+                .grid-head-sticky {{
+                    position: sticky;
+                    top: 0;
+                    z-index: 1;
+                }}
+                .grid-body {{
+                    position: relative;
+                }}
+                .grid-body .grid-row {{
+                    position: absolute;
+                    left: 0;
+                    right: 0;
+                }}
+                .status {{
+                    color: #666;
+                    font-size: 14px;
+                }}
+                .filter-row > div {{
                     background-color: #f8f9fa;
+                    height: auto;
                 }}
                 .filter-row input {{
                     width: 100%;
@@ -654,10 +1280,6 @@ def show_results():
                     background-color: #e9ecef;
                     border-radius: 4px;
                 }}
-                pre {{
-                    white-space: pre-wrap;
-                    word-wrap: break-word;
-                }}
                 .button-container {{
                     margin-top: 20px;
                     text-align: right;
@@ -678,121 +1300,427 @@ def show_results():
                     background-color: #218838;
                 }}
             </style>
-            <script>
-                function filterTable(tableId) {{
-                    const table = document.getElementById(tableId);
-                    const filters = table.getElementsByClassName('filter-input');
-                    const rows = table.getElementsByTagName('tbody')[0].getElementsByTagName('tr');
-
-                    for (let i = 0; i < rows.length; i++) {{
-                        let showRow = true;
-                        for (let j = 0; j < filters.length; j++) {{
-                            const filterValue = filters[j].value.toLowerCase();
-                            const cellValue = rows[i].getElementsByTagName('td')[j].textContent.toLowerCase();
-                            if (!cellValue.includes(filterValue)) {{
-                                showRow = false;
-                                break;
-                            }}
-                        }}
-                        rows[i].style.display = showRow ? '' : 'none';
-                    }}
-                }}
-            </script>
         </head>
         <body>
             <div class="container">
                 <div class="header">
-                    <h1>{t['title'].format(command=command)}</h1>
+                    <h1>{title}</h1>
                     <div class="language-switch">
-                        <a href="?lang={'fr' if lang == 'en' else 'en'}">
+                        <a href="?{query}&lang={'fr' if lang == 'en' else 'en'}">
                             <button>{t['switch_to_fr'] if lang == 'en' else t['switch_to_en']}</button>
                         </a>
                     </div>
                 </div>
                 <div class="button-container">
-                    <a href="/download_pdf?lang={lang}" class="download-button">
+                    <a href="/download_pdf?{query}&lang={lang}&mode=summary" class="download-button pdf-link">
+                        {t['download_pdf_summary']}
+                    </a>
+                    <a href="/download_pdf?{query}&lang={lang}" class="download-button pdf-link">
                         {t.get('download_pdf', 'Download as PDF')}
                     </a>
+                    <a href="/export/csv?{query}&compression=gzip" class="download-button">{t['export']} CSV</a>
+                    <a href="/export/jsonl?{query}&compression=gzip" class="download-button">{t['export']} JSONL</a>
+                    <a href="/export/parquet?{query}" class="download-button">{t['export']} Parquet</a>
+                    {f'<a href="/process_tree?{query}&lang={lang}" class="download-button">{t["process_tree"]}</a>' if plugins.get(command)['tree'] else ''}
                 </div>
                 <div class="info">
-                    <p><strong>{t['os']}:</strong> {results.get('os', 'N/A')}</p>
-                    <p><strong>{t['kernel_version']}:</strong> {results.get('kernel_version', 'N/A')}</p>
-                    <p><strong>{t['distribution']}:</strong> {results.get('distribution', 'N/A')}</p>
-                    <p><strong>{t['distribution_version']}:</strong> {results.get('distribution_version', 'N/A')}</p>
-                    <p><strong>{t['executed_command']}:</strong> {command}</p>
+                    <p><strong>{t['os']}:</strong> {html.escape(str(dump.get('os', 'N/A')))}</p>
+                    <p><strong>{t['kernel_version']}:</strong> {html.escape(str(dump.get('kernel_version', 'N/A')))}</p>
+                    <p><strong>{t['distribution']}:</strong> {html.escape(str(dump.get('distribution', 'N/A')))}</p>
+                    <p><strong>{t['distribution_version']}:</strong> {html.escape(str(dump.get('distribution_version', 'N/A')))}</p>
+                    <p><strong>{t['executed_command']}:</strong> {html.escape(command)}</p>
+                </div>
+                <p class="status" id="status"></p>
+                <div class="viewport" id="viewport">
+                    <div class="grid-head-sticky">
+                        <div class="grid-row grid-head" id="grid-head">
+                            {''.join(f'<div data-field="{field}">{html.escape(labels[field])}</div>' for field in fields)}
+                        </div>
+                        <div class="grid-row filter-row">
+                            {''.join(f'<div><input type="text" class="filter-input" data-field="{field}" placeholder="Filter... (text, /regex/, min..max)"></div>' for field in fields)}
+                        </div>
+                    </div>
+                    <div class="grid-body" id="grid-body"></div>
                 </div>
-                {html}
             </div>
+        """
+        yield f"""
+            <script>
+                const FIELDS = {json.dumps(fields)};
+                const QUERY = {json.dumps(query)};
+                const PAGE_SIZE = {RESULTS_PAGE_SIZE};
+                const ROW_HEIGHT = {RESULTS_ROW_HEIGHT};
+                const viewport = document.getElementById('viewport');
+                const body = document.getElementById('grid-body');
+                const status = document.getElementById('status');
+                let pages = {{}};
+                let filtered = {info['rows']};
+                let total = {info['rows']};
+                let sort = [];
+                let generation = 0;
+
+                function filterParam(field, value) {{
+                    // texte -> contains, /motif/ -> regex, a..b -> range
+                    if (value.length > 1 && value.startsWith('/') && value.endsWith('/')) {{
+                        return `${{field}}:regex:${{value.slice(1, -1)}}`;
+                    }}
+                    if (/^\\s*[-0-9.x]*\\.\\.[-0-9.x]*\\s*$/i.test(value)) {{
+                        return `${{field}}:range:${{value.trim()}}`;
+                    }}
+                    return `${{field}}:contains:${{value}}`;
+                }}
+
+                function queryString(offset) {{
+                    const params = new URLSearchParams(QUERY);
+                    params.set('offset', offset);
+                    params.set('limit', PAGE_SIZE);
+                    if (sort.length) {{
+                        params.set('sort', sort.map(([field, desc]) => (desc ? '-' : '') + field).join(','));
+                    }}
+                    document.querySelectorAll('.filter-input').forEach((input) => {{
+                        if (input.value) {{
+                            params.append('filter', filterParam(input.dataset.field, input.value));
+                        }}
+                    }});
+                    return params.toString();
+                }}
+
+                async function loadPage(index) {{
+                    if (pages[index]) {{
+                        return;
+                    }}
+                    const current = generation;
+                    pages[index] = 'loading';
+                    const response = await fetch(`/api/results?${{queryString(index * PAGE_SIZE)}}`);
+                    const data = await response.json();
+                    if (current !== generation) {{
+                        return;
+                    }}
+                    if (!response.ok) {{
+                        status.textContent = data.error;
+                        delete pages[index];
+                        return;
+                    }}
+                    pages[index] = data.rows;
+                    filtered = data.filtered;
+                    total = data.total;
+                    render();
+                }}
+
+                function render() {{
+                    body.style.height = `${{filtered * ROW_HEIGHT}}px`;
+                    status.textContent = `${{filtered}} / ${{total}}`;
+                    const first = Math.floor(viewport.scrollTop / ROW_HEIGHT);
+                    const last = Math.min(filtered, first + Math.ceil(viewport.clientHeight / ROW_HEIGHT) + 10);
+                    const fragment = document.createDocumentFragment();
+                    for (let i = first; i < last; i++) {{
+                        const page = pages[Math.floor(i / PAGE_SIZE)];
+                        if (!Array.isArray(page)) {{
+                            loadPage(Math.floor(i / PAGE_SIZE));
+                            continue;
+                        }}
+                        const row = page[i % PAGE_SIZE];
+                        if (!row) {{
+                            continue;
+                        }}
+                        const line = document.createElement('div');
+                        line.className = 'grid-row';
+                        line.style.top = `${{i * ROW_HEIGHT}}px`;
+                        for (const field of FIELDS) {{
+                            const cell = document.createElement('div');
+                            const value = row[field] === null || row[field] === undefined ? 'N/A' : String(row[field]);
+                            cell.textContent = value;
+                            cell.title = value;
+                            line.appendChild(cell);
+                        }}
+                        fragment.appendChild(line);
+                    }}
+                    body.replaceChildren(fragment);
+                }}
+
+                function reload() {{
+                    generation += 1;
+                    pages = {{}};
+                    viewport.scrollTop = 0;
+                    loadPage(0);
+                }}
+
+                let filterTimer = null;
+                document.querySelectorAll('.filter-input').forEach((input) => {{
+                    input.addEventListener('input', () => {{
+                        clearTimeout(filterTimer);
+                        filterTimer = setTimeout(reload, 300);
+                    }});
+                }});
+
+                // Clic : tri croissant, puis décroissant, puis retrait ; Maj+clic ajoute une colonne au tri
+                document.querySelectorAll('#grid-head > div').forEach((header) => {{
+                    header.addEventListener('click', (event) => {{
+                        const field = header.dataset.field;
+                        const existing = sort.find(([name]) => name === field);
+                        if (!event.shiftKey) {{
+                            sort = sort.filter(([name]) => name === field);
+                        }}
+                        if (!existing) {{
+                            sort.push([field, false]);
+                        }} else if (!existing[1]) {{
+                            existing[1] = true;
+                        }} else {{
+                            sort = sort.filter(([name]) => name !== field);
+                        }}
+                        document.querySelectorAll('#grid-head > div').forEach((cell) => {{
+                            const entry = sort.find(([name]) => name === cell.dataset.field);
+                            cell.dataset.sort = entry ? (entry[1] ? ' ▼' : ' ▲') : '';
+                            cell.textContent = cell.textContent.replace(/ [▲▼]$/, '') + cell.dataset.sort;
+                        }});
+                        reload();
+                    }});
+                }});
+
+                // Les gros PDF sont générés par un job : on suit son état avant de télécharger
+                document.querySelectorAll('.pdf-link').forEach((link) => {{
+                    link.addEventListener('click', async (event) => {{
+                        event.preventDefault();
+                        let response = await fetch(`${{link.href}}&prepare=1`);
+                        let job = await response.json();
+                        while (response.status === 202 && !['done', 'failed', 'cancelled', 'timeout'].includes(job.status)) {{
+                            status.textContent = {json.dumps(t['pdf_in_progress'])};
+                            await new Promise((resolve) => setTimeout(resolve, 1000));
+                            job = await (await fetch(`/jobs/${{job.id}}`)).json();
+                        }}
+                        if (response.ok && (response.status !== 202 || job.status === 'done')) {{
+                            window.location = link.href;
+                        }} else {{
+                            status.textContent = job.error || job.status;
+                        }}
+                        render();
+                    }});
+                }});
+
+                viewport.addEventListener('scroll', () => window.requestAnimationFrame(render));
+                render();
+            </script>
         </body>
         </html>
         """
-    except Exception as e:
-        return f"Error: {str(e)}"
     
-@app.route('/download_pdf', methods=['GET'])
-def download_pdf():
-    try:
-        with open('last_analysis.json', 'r') as f:
-            results = json.load(f)
-        
-        command = results.get('command', '')
-        output = results.get('output', [])
-        lang = request.args.get('lang', 'en')
-        t = translations[lang]
-        
-        # Générer le HTML spécifique pour PDF (sans les filtres)
-        if command == "linux.bash":
-            html = generate_bash_html_pdf(output[1:], t)
-        elif command == "linux.envars":
-            html = generate_envars_html_pdf(output[1:], t)
-        elif command == "linux.boottime.Boottime":
-            html = generate_boottime_html_pdf(output[1:], t)
-        elif command == "linux.pagecache.Files":
-            html = generate_pagecache_files_html_pdf(output[1:], t)
-        elif command == "linux.pslist.PsList":
-            html = generate_pslist_html_pdf(output[1:], t)
-        elif command == "linux.ip.Addr":
-            html = generate_ipaddr_html_pdf(output[1:], t)
-        elif command == "linux.check_syscall.Check_syscall":
-            html = generate_check_syscall_html_pdf(output[1:], t)
-        elif command == "linux.elfs.Elfs":
-            html = generate_elfs_html_pdf(output[1:], t)
-        elif command == "linux.hidden_modules.Hidden_modules":
-            html = generate_hidden_modules_html_pdf(output[1:], t)
-        elif command == "linux.library_list.LibraryList":
-            html = generate_library_list_html_pdf(output[1:], t)
-        elif command == "linux.pagecache.RecoverFs":
-            html = generate_recover_fs_html_pdf(output[1:], t)
-        elif command == "linux.psaux.PsAux":
-            html = generate_psaux_html_pdf(output[1:], t)
-        else:
-            html = "<p>Format de sortie non supporté</p>"
-        
-        # Créer le HTML complet
-        full_html = f"""
+    return Response(generate(), mimetype='text/html')
+    
+@app.route('/diff', methods=['GET'])
+def show_diff():
+    # Vue de comparaison : résumé puis lignes ajoutées, supprimées et modifiées
+    command = request.args.get('plugin', '')
+    base_id = request.args.get('base', '')
+    target_id = request.args.get('target', '')
+    lang = request.args.get('lang', 'en')
+    if lang not in translations:
+        return "Error: Langue invalide", 400
+    result, error = compare_results(base_id, target_id, command)
+    if error:
+        return f"Error: {html.escape(error)}", 404
+    
+    t = translations[lang]
+    render_table = table_renderer(command, lang)
+    dumps = {dump_id: dump_registry.get_dump(dump_id) for dump_id in (base_id, target_id)}
+    title = html.escape(t['diff_title'].format(command=command))
+    query = f"base={base_id}&target={target_id}&plugin={urllib.parse.quote(command)}"
+    counts = result['counts']
+    
+    def describe(dump):
+        return html.escape(f"{dump['filename']} ({dump.get('kernel_version', 'N/A')}, {time.strftime('%Y-%m-%d %H:%M', time.localtime(dump['created_at']))})")
+    
+    def changes(entry):
+        return '<br>'.join(
+            f"<strong>{html.escape(t.get(field, field))}</strong>: "
+            f"<del>{html.escape(str(entry['before'][field]))}</del> &rarr; <ins>{html.escape(str(entry['after'][field]))}</ins>"
+            for field in entry['fields']
+        )
+    
+    def generate():
+        yield f"""
         <!DOCTYPE html>
         <html>
         <head>
-            <title>{t['title'].format(command=command)}</title>
+            <meta charset="utf-8">
+            <link rel="preconnect" href="https://fonts.googleapis.com">
+            <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+            <link href="https://fonts.googleapis.com/css2?family=Lexend:wght@100..900&display=swap" rel="stylesheet">
+            <title>{title}</title>
             <style>
                 body {{
-                    font-family: Arial, sans-serif;
+                    font-family: 'Lexend', sans-serif;
                     margin: 20px;
+                    background-color: #f5f5f5;
+                }}
+                .container {{
+                    max-width: 1200px;
+                    margin: 0 auto;
+                    background-color: white;
+                    padding: 20px;
+                    border-radius: 5px;
+                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+                }}
+                .header {{
+                    display: flex;
+                    justify-content: space-between;
+                    align-items: center;
+                    margin-bottom: 20px;
+                    border-bottom: 1px solid #eee;
+                    padding-bottom: 10px;
+                }}
+                h1 {{
+                    color: #333;
+                    margin: 0;
+                }}
+                .language-switch button {{
+                    padding: 8px 16px;
+                    background-color: #007bff;
+                    color: white;
+                    border: none;
+                    border-radius: 4px;
+                    cursor: pointer;
+                    font-size: 14px;
+                }}
+                .info {{
+                    margin-bottom: 20px;
+                    padding: 10px;
+                    background-color: #e9ecef;
+                    border-radius: 4px;
+                }}
+                .section {{
+                    max-height: 60vh;
+                    overflow: auto;
+                    margin-bottom: 20px;
                 }}
                 table {{
                     width: 100%;
                     border-collapse: collapse;
-                    margin-top: 20px;
-                    font-size: 10px; /* Réduire la taille de police pour les tableaux */
                 }}
                 th, td {{
-                    padding: 6px;
+                    padding: 8px;
+                    border-bottom: 1px solid #ddd;
                     text-align: left;
-                    border: 1px solid #ddd;
+                    font-size: 14px;
                 }}
                 th {{
                     background-color: #f8f9fa;
-                    font-weight: bold;
+                    position: sticky;
+                    top: 0;
+                }}
+                h2.added {{ color: #28a745; }}
+                h2.removed {{ color: #dc3545; }}
+                h2.changed {{ color: #fd7e14; }}
+                del {{ color: #dc3545; }}
+                ins {{ color: #28a745; text-decoration: none; }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>{title}</h1>
+                    <div class="language-switch">
+                        <a href="?{query}&lang={'fr' if lang == 'en' else 'en'}">
+                            <button>{t['switch_to_fr'] if lang == 'en' else t['switch_to_en']}</button>
+                        </a>
+                    </div>
+                </div>
+                <div class="info">
+                    <p><strong>{t['base_dump']}:</strong> {describe(dumps[base_id])}</p>
+                    <p><strong>{t['target_dump']}:</strong> {describe(dumps[target_id])}</p>
+                    <p>{' &middot; '.join(f"{t[name]}: {counts[name]}" for name in ('added', 'removed', 'changed', 'unchanged'))}</p>
+                    {f"<p>{html.escape(t['diff_truncated'].format(limit=result_diff.MAX_DIFF_ROWS))}</p>" if result['truncated'] else ''}
+                </div>
+        """
+        for name in ('added', 'removed'):
+            yield f'<h2 class="{name}">{t[name]} ({counts[name]})</h2><div class="section">'
+            yield from render_table(result[name])
+            yield '</div>'
+        keys = result['keys']
+        yield (
+            f'<h2 class="changed">{t["changed"]} ({counts["changed"]})</h2><div class="section"><table><thead><tr>'
+            + ''.join(f"<th>{html.escape(t.get(field, field))}</th>" for field in keys)
+            + f"<th>{t['changed_fields']}</th></tr></thead><tbody>"
+        )
+        for entry in result['changed']:
+            yield (
+                '<tr>'
+                + ''.join(f"<td>{html.escape(str(entry['key'][field]))}</td>" for field in keys)
+                + f"<td>{changes(entry)}</td></tr>"
+            )
+        yield """</tbody></table></div>
+            </div>
+        </body>
+        </html>
+        """
+    
+    return Response(generate(), mimetype='text/html')
+    
+TREE_PAGE_SIZE = 200
+
+@app.route('/process_tree', methods=['GET'])
+def show_process_tree():
+    # Arbre repliable : seuls les enfants des nœuds dépliés sont chargés, par page, depuis
+    # /api/process_tree ; aller à un PID déplie sa chaîne d'ancêtres
+    dump_id = request.args.get('dump_id', '')
+    command = request.args.get('plugin', 'linux.pslist.PsList')
+    lang = request.args.get('lang', 'en')
+    if lang not in translations:
+        return "Error: Langue invalide", 400
+    dump = dump_registry.get_dump(dump_id)
+    tree = load_process_tree(dump_id, command)
+    if dump is None or tree is None:
+        return "Error: Résultats introuvables", 404
+    
+    t = translations[lang]
+    stats = tree.stats()
+    title = html.escape(t['process_tree_title'].format(command=command))
+    query = f"dump_id={dump_id}&plugin={urllib.parse.quote(command)}"
+    labels = {name: t[name] for name in ('threads', 'descendants', 'load_more', 'dossier')}
+    
+    def generate():
+        yield f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <link rel="preconnect" href="https://fonts.googleapis.com">
+            <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+            <link href="https://fonts.googleapis.com/css2?family=Lexend:wght@100..900&display=swap" rel="stylesheet">
+            <title>{title}</title>
+            <style>
+                body {{
+                    font-family: 'Lexend', sans-serif;
+                    margin: 20px;
+                    background-color: #f5f5f5;
+                }}
+                .container {{
+                    max-width: 1200px;
+                    margin: 0 auto;
+                    background-color: white;
+                    padding: 20px;
+                    border-radius: 5px;
+                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+                }}
+                .header {{
+                    display: flex;
+                    justify-content: space-between;
+                    align-items: center;
+                    margin-bottom: 20px;
+                    border-bottom: 1px solid #eee;
+                    padding-bottom: 10px;
+                }}
+                h1 {{
+                    color: #333;
+                    margin: 0;
+                }}
+                .language-switch button, .find button, .more {{
+                    padding: 8px 16px;
+                    background-color: #007bff;
+                    color: white;
+                    border: none;
+                    border-radius: 4px;
+                    cursor: pointer;
+                    font-size: 14px;
                 }}
                 .info {{
                     margin-bottom: 20px;
@@ -800,869 +1728,484 @@ def download_pdf():
                     background-color: #e9ecef;
                     border-radius: 4px;
                 }}
+                .find input {{
+                    padding: 8px;
+                    border: 1px solid #ddd;
+                    border-radius: 4px;
+                }}
+                .status {{
+                    color: #666;
+                    font-size: 14px;
+                }}
+                .tree {{
+                    max-height: 70vh;
+                    overflow: auto;
+                    margin-top: 20px;
+                    font-size: 14px;
+                }}
+                .tree ul {{
+                    list-style: none;
+                    padding-left: 20px;
+                    margin: 0;
+                }}
+                .node {{
+                    padding: 3px 0;
+                    white-space: nowrap;
+                }}
+                .toggle {{
+                    display: inline-block;
+                    width: 16px;
+                    cursor: pointer;
+                    user-select: none;
+                }}
+                .meta {{
+                    color: #666;
+                }}
+                .selected {{
+                    background-color: #fff3cd;
+                }}
+                .more {{
+                    padding: 4px 10px;
+                    margin: 4px 0;
+                }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>{title}</h1>
+                    <div class="language-switch">
+                        <a href="?{query}&lang={'fr' if lang == 'en' else 'en'}">
+                            <button>{t['switch_to_fr'] if lang == 'en' else t['switch_to_en']}</button>
+                        </a>
+                    </div>
+                </div>
+                <div class="info">
+                    <p><strong>{t['kernel_version']}:</strong> {html.escape(str(dump.get('kernel_version', 'N/A')))}</p>
+                    <p>{' &middot; '.join(f"{t[name]}: {stats[name]}" for name in ('processes', 'threads', 'roots'))}</p>
+                </div>
+                <form class="find" id="find">
+                    <input type="number" id="find-pid" placeholder="PID">
+                    <button type="submit">{t['find_pid']}</button>
+                </form>
+                <p class="status" id="status"></p>
+                <div class="tree"><ul id="roots"></ul></div>
+            </div>
+            <script>
+                const QUERY = {json.dumps(query)};
+                const PAGE_SIZE = {TREE_PAGE_SIZE};
+                const LABELS = {json.dumps(labels)};
+                const DUMP_ID = {json.dumps(dump_id)};
+                const LANG = {json.dumps(lang)};
+                const status = document.getElementById('status');
+
+                async function fetchTree(params) {{
+                    const query = new URLSearchParams(QUERY);
+                    for (const [name, value] of Object.entries(params)) {{
+                        query.set(name, value);
+                    }}
+                    const response = await fetch(`/api/process_tree?${{query.toString()}}`);
+                    const data = await response.json();
+                    if (!response.ok) {{
+                        status.textContent = data.error;
+                        return null;
+                    }}
+                    status.textContent = '';
+                    return data;
+                }}
+
+                function renderNode(node) {{
+                    const item = document.createElement('li');
+                    const line = document.createElement('div');
+                    line.className = 'node';
+                    const toggle = document.createElement('span');
+                    toggle.className = 'toggle';
+                    toggle.textContent = node.children ? '\u25b8' : '';
+                    const row = node.row;
+                    const name = document.createElement('a');
+                    name.href = `/dossier?dump_id=${{DUMP_ID}}&pid=${{node.pid}}&lang=${{LANG}}`;
+                    name.title = LABELS.dossier;
+                    name.textContent = `${{row.comm ?? 'N/A'}} [${{node.pid}}]` + (row.args ? ` ${{row.args}}` : '');
+                    const meta = document.createElement('span');
+                    meta.className = 'meta';
+                    meta.textContent = ` \u2014 ${{LABELS.threads}}: ${{node.threads}}, ${{LABELS.descendants}}: ${{node.descendants}}`;
+                    line.append(toggle, name, meta);
+                    const children = document.createElement('ul');
+                    item.append(line, children);
+                    item.dataset.pid = node.pid;
+                    if (node.children) {{
+                        toggle.addEventListener('click', () => {{
+                            if (item.dataset.open) {{
+                                collapse(item);
+                            }} else {{
+                                expand(item);
+                            }}
+                        }});
+                    }}
+                    return item;
+                }}
+
+                function collapse(item) {{
+                    delete item.dataset.open;
+                    item.querySelector('.toggle').textContent = '\u25b8';
+                    item.lastChild.replaceChildren();
+                }}
+
+                async function loadPage(list, pid, offset) {{
+                    const params = {{offset, limit: PAGE_SIZE}};
+                    if (pid !== null) {{
+                        params.pid = pid;
+                    }}
+                    const data = await fetchTree(params);
+                    if (!data) {{
+                        return;
+                    }}
+                    for (const node of data.children) {{
+                        list.append(renderNode(node));
+                    }}
+                    const next = offset + data.children.length;
+                    if (next < data.total) {{
+                        const more = document.createElement('button');
+                        more.className = 'more';
+                        more.textContent = `${{LABELS.load_more}} (${{next}} / ${{data.total}})`;
+                        more.addEventListener('click', () => {{
+                            more.remove();
+                            loadPage(list, pid, next);
+                        }});
+                        list.append(more);
+                    }}
+                }}
+
+                async function expand(item) {{
+                    item.dataset.open = '1';
+                    item.querySelector('.toggle').textContent = '\u25be';
+                    item.lastChild.replaceChildren();
+                    await loadPage(item.lastChild, Number(item.dataset.pid), 0);
+                }}
+
+                async function findPid(pid) {{
+                    // Chaîne racine -> processus seule, sans les frères des ancêtres : un clic sur
+                    // un ancêtre le replie, un second recharge tous ses enfants
+                    const data = await fetchTree({{pid, limit: 0}});
+                    if (!data) {{
+                        return;
+                    }}
+                    document.querySelectorAll('.selected').forEach((line) => line.classList.remove('selected'));
+                    let list = document.getElementById('roots');
+                    list.replaceChildren();
+                    for (const ancestor of data.ancestors) {{
+                        const item = renderNode(ancestor);
+                        item.dataset.open = '1';
+                        item.querySelector('.toggle').textContent = '\u25be';
+                        list.append(item);
+                        list = item.lastChild;
+                    }}
+                    const item = renderNode(data.node);
+                    item.firstChild.classList.add('selected');
+                    list.append(item);
+                    if (data.node.children) {{
+                        await expand(item);
+                    }}
+                    item.scrollIntoView({{block: 'center'}});
+                }}
+
+                document.getElementById('find').addEventListener('submit', (event) => {{
+                    event.preventDefault();
+                    const pid = document.getElementById('find-pid').value;
+                    if (pid !== '') {{
+                        findPid(pid);
+                    }}
+                }});
+
+                loadPage(document.getElementById('roots'), null, 0);
+            </script>
+        </body>
+        </html>
+        """
+    
+    return Response(generate(), mimetype='text/html')
+    
+@app.route('/dossier', methods=['GET'])
+def show_dossier():
+    # Vue d'un processus : une table par plugin du dossier, limitée à ses lignes
+    dump_id = request.args.get('dump_id', '')
+    try:
+        pid = int(request.args.get('pid', ''))
+    except ValueError:
+        return "Error: PID invalide", 400
+    lang = request.args.get('lang', 'en')
+    if lang not in translations:
+        return "Error: Langue invalide", 400
+    record, error = process_dossier_record(dump_id, pid)
+    if error:
+        return f"Error: {html.escape(error)}", 404
+    
+    t = translations[lang]
+    dump = dump_registry.get_dump(dump_id)
+    title = html.escape(t['dossier_title'].format(pid=pid))
+    query = f"dump_id={dump_id}&pid={pid}"
+    process = record['process'] or {}
+    
+    def generate():
+        yield f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <link rel="preconnect" href="https://fonts.googleapis.com">
+            <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+            <link href="https://fonts.googleapis.com/css2?family=Lexend:wght@100..900&display=swap" rel="stylesheet">
+            <title>{title}</title>
+            <style>
+                body {{
+                    font-family: 'Lexend', sans-serif;
+                    margin: 20px;
+                    background-color: #f5f5f5;
+                }}
+                .container {{
+                    max-width: 1200px;
+                    margin: 0 auto;
+                    background-color: white;
+                    padding: 20px;
+                    border-radius: 5px;
+                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+                }}
+                .header {{
+                    display: flex;
+                    justify-content: space-between;
+                    align-items: center;
+                    margin-bottom: 20px;
+                    border-bottom: 1px solid #eee;
+                    padding-bottom: 10px;
+                }}
                 h1 {{
-                    font-size: 18px;
-                    margin-bottom: 15px;
+                    color: #333;
+                    margin: 0;
+                }}
+                .language-switch button {{
+                    padding: 8px 16px;
+                    background-color: #007bff;
+                    color: white;
+                    border: none;
+                    border-radius: 4px;
+                    cursor: pointer;
+                    font-size: 14px;
+                }}
+                .info {{
+                    margin-bottom: 20px;
+                    padding: 10px;
+                    background-color: #e9ecef;
+                    border-radius: 4px;
+                }}
+                .section {{
+                    max-height: 50vh;
+                    overflow: auto;
+                    margin-bottom: 20px;
+                }}
+                table {{
+                    width: 100%;
+                    border-collapse: collapse;
+                }}
+                th, td {{
+                    padding: 8px;
+                    border-bottom: 1px solid #ddd;
+                    text-align: left;
+                    font-size: 14px;
+                }}
+                th {{
+                    background-color: #f8f9fa;
+                    position: sticky;
+                    top: 0;
+                }}
+                .status {{
+                    color: #666;
+                    font-size: 14px;
+                }}
+                .run {{
+                    padding: 8px 16px;
+                    background-color: #007bff;
+                    color: white;
+                    border: none;
+                    border-radius: 4px;
+                    cursor: pointer;
+                    font-size: 14px;
+                }}
+                .run:disabled {{
+                    opacity: 0.5;
+                    cursor: default;
                 }}
             </style>
         </head>
         <body>
-            <div>
-                <h1>{t['title'].format(command=command)}</h1>
+            <div class="container">
+                <div class="header">
+                    <h1>{title}</h1>
+                    <div class="language-switch">
+                        <a href="?{query}&lang={'fr' if lang == 'en' else 'en'}">
+                            <button>{t['switch_to_fr'] if lang == 'en' else t['switch_to_en']}</button>
+                        </a>
+                    </div>
+                </div>
                 <div class="info">
-                    <p><strong>{t['os']}:</strong> {results.get('os', 'N/A')}</p>
-                    <p><strong>{t['kernel_version']}:</strong> {results.get('kernel_version', 'N/A')}</p>
-                    <p><strong>{t['distribution']}:</strong> {results.get('distribution', 'N/A')}</p>
-                    <p><strong>{t['distribution_version']}:</strong> {results.get('distribution_version', 'N/A')}</p>
-                    <p><strong>{t['executed_command']}:</strong> {command}</p>
+                    <p><strong>{t['kernel_version']}:</strong> {html.escape(str(dump.get('kernel_version', 'N/A')))}</p>
+                    <p><strong>{t['pid']}:</strong> {pid} &middot; <strong>{t['ppid']}:</strong> {html.escape(str(process.get('ppid', 'N/A')))} &middot; <strong>{t['comm']}:</strong> {html.escape(str(process.get('comm', 'N/A')))}</p>
+                    {f"<p>{html.escape(str(process['args']))}</p>" if process.get('args') else ''}
+                    {'' if record['found'] else f"<p>{t['pid_not_found']}</p>"}
                 </div>
-                {html}
+        """
+        for section, rows in record['sections'].items():
+            yield f"<h2>{t['section_' + section]} ({len(rows)})</h2><div class=\"section\">"
+            yield from table_renderer(record['plugins'][section], lang)(rows)
+            yield '</div>'
+        if record['missing']:
+            yield f"""
+                <p><strong>{t['missing_results']}:</strong> {', '.join(t['section_' + section] for section in record['missing'])}</p>
+                <button class="run" id="run-missing">{t['run_missing']}</button>
+                <p class="status" id="status"></p>
+            """
+        yield f"""
             </div>
+            <script>
+                // Plugins manquants : exécutés comme des jobs du pool, suivis puis dossier rechargé
+                const DUMP_ID = {json.dumps(dump_id)};
+                const RUNNING = {json.dumps(t['plugins_running'])};
+                const FINISHED = ['done', 'failed', 'cancelled', 'timeout'];
+                const button = document.getElementById('run-missing');
+                const status = document.getElementById('status');
+
+                async function follow(pending) {{
+                    button.disabled = true;
+                    let current = pending;
+                    while (current.some((job) => !FINISHED.includes(job.status))) {{
+                        const done = current.filter((job) => FINISHED.includes(job.status)).length;
+                        status.textContent = RUNNING.replace('{{done}}', done).replace('{{total}}', current.length);
+                        await new Promise((resolve) => setTimeout(resolve, 2000));
+                        current = await Promise.all(current.map(async (job) => (
+                            FINISHED.includes(job.status) ? job : (await fetch(`/jobs/${{job.id}}`)).json()
+                        )));
+                    }}
+                    const failed = current.filter((job) => job.status !== 'done');
+                    if (!failed.length) {{
+                        window.location.reload();
+                        return;
+                    }}
+                    status.textContent = failed.map((job) => `${{job.params.plugin}}: ${{job.error || job.status}}`).join(' \u2014 ');
+                    button.disabled = false;
+                }}
+
+                if (button) {{
+                    button.addEventListener('click', async () => {{
+                        const response = await fetch('/api/dossier', {{
+                            method: 'POST',
+                            headers: {{'Content-Type': 'application/json'}},
+                            body: JSON.stringify({{dump_id: DUMP_ID}}),
+                        }});
+                        const data = await response.json();
+                        if (!response.ok) {{
+                            status.textContent = data.error;
+                            return;
+                        }}
+                        follow(data.jobs);
+                    }});
+                    const pending = {json.dumps(record['jobs'])};
+                    if (pending.length) {{
+                        follow(pending);
+                    }}
+                }}
+            </script>
         </body>
         </html>
         """
+    
+    return Response(generate(), mimetype='text/html')
+    
+def build_pdf_report(dump_id, plugin_name, lang, mode):
+    # Chemin du PDF du résultat, généré seulement s'il n'est pas déjà en cache
+    dump = dump_registry.get_dump(dump_id)
+    info = dump_registry.result_info(dump_id, plugin_name)
+    version = dump_registry.result_version(dump_id, plugin_name)
+    if dump is None or info is None or version is None or plugins.get(plugin_name) is None:
+        return None
+    path = pdf_reports.report_path(dump_id, plugin_name, lang, version, mode)
+    if os.path.exists(path):
+        return path
+    
+    t = translations[lang]
+    fields = plugins.fields(plugin_name)
+    labels = {key: t.get(key, key) for key in fields + ['column', 'distinct', 'top_values', 'truncated']}
+    info_lines = [
+        f"{t['os']}: {dump.get('os', 'N/A')}",
+        f"{t['kernel_version']}: {dump.get('kernel_version', 'N/A')}",
+        f"{t['distribution']}: {dump.get('distribution', 'N/A')} {dump.get('distribution_version', '')}",
+        f"{t['executed_command']}: {plugin_name}",
+    ]
+    return pdf_reports.build_report(
+        path, t['title'].format(command=plugin_name), info_lines, fields, labels,
+        dump_registry.iter_rows(dump_id, plugin_name, fields), info['rows'], mode
+    )
+
+def run_pdf_job(params):
+    # Exécuté dans un processus du pool de jobs
+    path = build_pdf_report(params['dump_id'], params['plugin'], params['lang'], params['mode'])
+    if path is None:
+        raise RuntimeError('Résultats introuvables')
+    return {'dump_id': params['dump_id'], 'plugin': params['plugin'], 'lang': params['lang'], 'mode': params['mode']}
+
+jobs.register_handler('pdf', run_pdf_job)
+
+@app.route('/download_pdf', methods=['GET'])
+def download_pdf():
+    # ?dump_id=&plugin=&lang=&mode=table|summary ; '&prepare=1' répond en JSON sans envoyer le fichier
+    dump_id = request.args.get('dump_id', '')
+    command = request.args.get('plugin', '')
+    lang = request.args.get('lang', 'en')
+    mode = request.args.get('mode', 'table')
+    if lang not in translations or mode not in pdf_reports.PDF_MODES:
+        return jsonify({'error': 'Langue ou mode invalide'}), 400
+    
+    info = dump_registry.result_info(dump_id, command)
+    version = dump_registry.result_version(dump_id, command)
+    if info is None or version is None or plugins.get(command) is None:
+        return jsonify({'error': 'Résultats introuvables'}), 404
+    
+    try:
+        path = pdf_reports.report_path(dump_id, command, lang, version, mode)
+        if not os.path.exists(path):
+            if info['rows'] > pdf_reports.PDF_SYNC_MAX_ROWS:
+                # Gros tableau : généré en arrière-plan, le client suit le job puis revient
+                params = {'dump_id': dump_id, 'plugin': command, 'lang': lang, 'mode': mode}
+                job = active_job('pdf', params) or jobs.submit('pdf', params)
+                return jsonify(job), 202
+            path = build_pdf_report(dump_id, command, lang, mode)
         
-        # Créer un fichier temporaire pour le PDF
-        temp_file = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
-        pdf_path = temp_file.name
-        temp_file.close()
-        
-        # Générer le PDF à partir du HTML
-        pdfkit_options = {
-            'page-size': 'A4',
-            'margin-top': '0.75in',
-            'margin-right': '0.5in',
-            'margin-bottom': '0.75in',
-            'margin-left': '0.5in',
-            'encoding': 'UTF-8',
-            'no-outline': None,
-            'orientation': 'Landscape'  # Format paysage pour inclure plus de colonnes
-        }
-        
-        # Utiliser une configuration explicite pour spécifier le chemin de wkhtmltopdf
-        config = pdfkit.configuration(wkhtmltopdf='/usr/bin/wkhtmltopdf')
-        
-        pdfkit.from_string(full_html, pdf_path, options=pdfkit_options, configuration=config)
-        
-        # Envoyer le fichier PDF
+        if request.args.get('prepare'):
+            return jsonify({'ready': True})
         filename = f"volinux_analysis_{command.replace('.', '_')}.pdf"
-        return send_file(pdf_path, as_attachment=True, download_name=filename, mimetype='application/pdf')
-    
+        return send_file(os.path.abspath(path), as_attachment=True, download_name=filename, mimetype='application/pdf')
+    except jobs.QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
+        logger.error(f"Erreur lors de la génération du PDF: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-def generate_bash_html(commands, t):
-    return f"""
-    <table id="bash-table">
-        <thead>
-            <tr>
-                <th>{t['pid']}</th>
-                <th>{t['process']}</th>
-                <th>{t['time']}</th>
-                <th>{t['command']}</th>
-            </tr>
-            <tr class="filter-row">
-                <th><input type="text" class="filter-input" onkeyup="filterTable('bash-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('bash-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('bash-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('bash-table')" placeholder="Filter..."></th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{c['pid']}</td>
-                <td>{c['process']}</td>
-                <td>{c['time']}</td>
-                <td>{c['command']}</td>
-            </tr>
-            ''' for c in commands)}
-        </tbody>
-    </table>
-    """
-
-def generate_envars_html(envars, t):
-    return f"""
-    <table id="envars-table">
-        <thead>
-            <tr>
-                <th>{t['pid']}</th>
-                <th>{t['ppid']}</th>
-                <th>{t['comm']}</th>
-                <th>{t['key']}</th>
-                <th>{t['value']}</th>
-            </tr>
-            <tr class="filter-row">
-                <th><input type="text" class="filter-input" onkeyup="filterTable('envars-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('envars-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('envars-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('envars-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('envars-table')" placeholder="Filter..."></th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{e['pid']}</td>
-                <td>{e['ppid']}</td>
-                <td>{e['comm']}</td>
-                <td>{e['key']}</td>
-                <td>{e['value']}</td>
-            </tr>
-            ''' for e in envars)}
-        </tbody>
-    </table>
-    """
-
-def generate_ipaddr_html(ip_addresses, t):
-    return f"""
-    <table id="ipaddr-table">
-        <thead>
-            <tr>
-                <th>{t['netns']}</th>
-                <th>{t['index']}</th>
-                <th>{t['interface']}</th>
-                <th>{t['mac']}</th>
-                <th>{t['promiscuous']}</th>
-                <th>{t['ip']}</th>
-                <th>{t['prefix']}</th>
-                <th>{t['scope']}</th>
-                <th>{t['type']}</th>
-                <th>{t['state']}</th>
-            </tr>
-            <tr class="filter-row">
-                <th><input type="text" class="filter-input" onkeyup="filterTable('ipaddr-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('ipaddr-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('ipaddr-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('ipaddr-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('ipaddr-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('ipaddr-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('ipaddr-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('ipaddr-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('ipaddr-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('ipaddr-table')" placeholder="Filter..."></th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{i['netns']}</td>
-                <td>{i['index']}</td>
-                <td>{i['interface']}</td>
-                <td>{i['mac']}</td>
-                <td>{i['promiscuous']}</td>
-                <td>{i['ip']}</td>
-                <td>{i['prefix']}</td>
-                <td>{i['scope']}</td>
-                <td>{i['type']}</td>
-                <td>{i['state']}</td>
-            </tr>
-            ''' for i in ip_addresses)}
-        </tbody>
-    </table>
-    """
-
-def generate_boottime_html(boottime, t):
-    return f"""
-    <table id="boottime-table">
-        <thead>
-            <tr>
-                <th>{t['time_ns']}</th>
-                <th>{t['boot_time']}</th>
-            </tr>
-            <tr class="filter-row">
-                <th><input type="text" class="filter-input" onkeyup="filterTable('boottime-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('boottime-table')" placeholder="Filter..."></th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{b['time_ns']}</td>
-                <td>{b['boot_time']}</td>
-            </tr>
-            ''' for b in boottime)}
-        </tbody>
-    </table>
-    """
-
-def generate_pagecache_files_html(files, t):
-    return f"""
-    <table id="pagecache-table">
-        <thead>
-            <tr>
-                <th>{t['superblock_addr']}</th>
-                <th>{t['mount_point']}</th>
-                <th>{t['device']}</th>
-                <th>{t['inode_num']}</th>
-                <th>{t['inode_addr']}</th>
-                <th>{t['file_type']}</th>
-                <th>{t['inode_pages']}</th>
-                <th>{t['cached_pages']}</th>
-                <th>{t['file_mode']}</th>
-                <th>{t['access_time']}</th>
-                <th>{t['modification_time']}</th>
-                <th>{t['change_time']}</th>
-                <th>{t['file_path']}</th>
-            </tr>
-            <tr class="filter-row">
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pagecache-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pagecache-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pagecache-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pagecache-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pagecache-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pagecache-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pagecache-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pagecache-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pagecache-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pagecache-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pagecache-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pagecache-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pagecache-table')" placeholder="Filter..."></th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{f['superblock_addr']}</td>
-                <td>{f['mount_point']}</td>
-                <td>{f['device']}</td>
-                <td>{f['inode_num']}</td>
-                <td>{f['inode_addr']}</td>
-                <td>{f['file_type']}</td>
-                <td>{f['inode_pages']}</td>
-                <td>{f['cached_pages']}</td>
-                <td>{f['file_mode']}</td>
-                <td>{' '.join(f['access_time'])}</td>
-                <td>{' '.join(f['modification_time'])}</td>
-                <td>{' '.join(f['change_time'])}</td>
-                <td>{f['file_path']}</td>
-            </tr>
-            ''' for f in files)}
-        </tbody>
-    </table>
-    """
-
-def generate_pslist_html(processes, t):
-    return f"""
-    <table id="pslist-table">
-        <thead>
-            <tr>
-                <th>{t['offset']}</th>
-                <th>{t['pid']}</th>
-                <th>{t['tid']}</th>
-                <th>{t['ppid']}</th>
-                <th>{t['comm']}</th>
-                <th>{t['creation_time']}</th>
-                <th>{t['file_output']}</th>
-            </tr>
-            <tr class="filter-row">
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pslist-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pslist-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pslist-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pslist-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pslist-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pslist-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('pslist-table')" placeholder="Filter..."></th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{p['offset']}</td>
-                <td>{p['pid']}</td>
-                <td>{p['tid']}</td>
-                <td>{p['ppid']}</td>
-                <td>{p['comm']}</td>
-                <td>{p['creation_time']}</td>
-                <td>{p['file_output']}</td>
-            </tr>
-            ''' for p in processes)}
-        </tbody>
-    </table>
-    """
-
-def generate_check_syscall_html(syscall, t):
-    return f"""
-    <table id="syscall-table">
-        <thead>
-            <tr>
-                <th>{t['address']}</th>
-                <th>{t['name']}</th>
-                <th>{t['index']}</th>
-                <th>{t['handleraddr']}</th>
-                <th>{t['handlersymb']}</th>
-            </tr>
-            <tr class="filter-row">
-                <th><input type="text" class="filter-input" onkeyup="filterTable('syscall-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('syscall-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('syscall-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('syscall-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('syscall-table')" placeholder="Filter..."></th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{p['address']}</td>
-                <td>{p['name']}</td>
-                <td>{p['index']}</td>
-                <td>{p['handleraddr']}</td>
-                <td>{p['handlersymb']}</td>
-            </tr>
-            ''' for p in syscall)}
-        </tbody>
-    </table>
-    """
-
-def generate_elfs_html(elfs, t):
-    return f"""
-    <table id="elfs-table">
-        <thead>
-            <tr>
-                <th>{t['pid']}</th>
-                <th>{t['process']}</th>
-                <th>{t['start']}</th>
-                <th>{t['end']}</th>
-                <th>{t['filepath']}</th>
-                <th>{t['fileoutput']}</th>
-            </tr>
-            <tr class="filter-row">
-                <th><input type="text" class="filter-input" onkeyup="filterTable('elfs-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('elfs-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('elfs-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('elfs-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('elfs-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('elfs-table')" placeholder="Filter..."></th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{p['pid']}</td>
-                <td>{p['process']}</td>
-                <td>{p['start']}</td>
-                <td>{p['end']}</td>
-                <td>{p['filepath']}</td>
-                <td>{p['fileoutput']}</td>
-            </tr>
-            ''' for p in elfs)}
-        </tbody>
-    </table>
-    """
-
-def generate_hidden_modules_html(hiddenmodules, t):
-    return f"""
-    <table id="hiddenmodules-table">
-        <thead>
-            <tr>
-                <th>{t['offset']}</th>
-                <th>{t['module']}</th>
-                <th>{t['codesize']}</th>
-                <th>{t['taints']}</th>
-                <th>{t['arguments']}</th>
-                <th>{t['fileoutput']}</th>
-            </tr>
-            <tr class="filter-row">
-                <th><input type="text" class="filter-input" onkeyup="filterTable('hiddenmodules-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('hiddenmodules-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('hiddenmodules-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('hiddenmodules-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('hiddenmodules-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('hiddenmodules-table')" placeholder="Filter..."></th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{p['offset']}</td>
-                <td>{p['module']}</td>
-                <td>{p['codesize']}</td>
-                <td>{p['taints']}</td>
-                <td>{p['arguments']}</td>
-                <td>{p['fileoutput']}</td>
-            </tr>
-            ''' for p in hiddenmodules)}
-        </tbody>
-    </table>
-    """
-
-def generate_library_list_html(library, t):
-    return f"""
-    <table id="library-table">
-        <thead>
-            <tr>
-                <th>{t['name']}</th>
-                <th>{t['pid']}</th>
-                <th>{t['loadaddress']}</th>
-                <th>{t['path']}</th>
-            </tr>
-            <tr class="filter-row">
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{p['name']}</td>
-                <td>{p['pid']}</td>
-                <td>{p['loadaddress']}</td>
-                <td>{p['path']}</td>
-            </tr>
-            ''' for p in library)}
-        </tbody>
-    </table>
-    """
-
-def generate_recover_fs_html(library, t):
-    return f"""
-    <table id="library-table">
-        <thead>
-            <tr>
-                <th>{t['blockaddr']}</th>
-                <th>{t['mountpoint']}</th>
-                <th>{t['device']}</th>
-                <th>{t['inodenum']}</th>
-                <th>{t['inodeaddr']}</th>
-                <th>{t['filetype']}</th>
-                <th>{t['inodepages']}</th>
-                <th>{t['cachedpages']}</th>
-                <th>{t['filemode']}</th>
-                <th>{t['accesstime']}</th>
-                <th>{t['modificationtime']}</th>
-                <th>{t['changetime']}</th>
-                <th>{t['filepath']}</th>
-                <th>{t['inodesize']}</th>
-                <th>{t['recovered']}</th>
-            </tr>
-            <tr class="filter-row">
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('library-table')" placeholder="Filter..."></th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{p['blockaddr']}</td>
-                <td>{p['mountpoint']}</td>
-                <td>{p['device']}</td>
-                <td>{p['inodenum']}</td>
-                <td>{p['inodeaddr']}</td>
-                <td>{p['filetype']}</td>
-                <td>{p['inodepages']}</td>
-                <td>{p['cachedpages']}</td>
-                <td>{p['filemode']}</td>
-                <td>{' '.join(p['accesstime'])}</td>
-                <td>{' '.join(p['modificationtime'])}</td>
-                <td>{' '.join(p['changetime'])}</td>
-                <td>{p['filepath']}</td>
-                <td>{p['inodesize']}</td>
-                <td>{p['recovered']}</td>
-            </tr>
-            ''' for p in library)}
-        </tbody>
-    </table>
-    """
-
-def generate_psaux_html(psaux, t):
-    return f"""
-    <table id="psaux-table">
-        <thead>
-            <tr>
-                <th>{t['pid']}</th>
-                <th>{t['ppid']}</th>
-                <th>{t['comm']}</th>
-                <th>{t['args']}</th>
-            </tr>
-            <tr class="filter-row">
-                <th><input type="text" class="filter-input" onkeyup="filterTable('psaux-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('psaux-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('psaux-table')" placeholder="Filter..."></th>
-                <th><input type="text" class="filter-input" onkeyup="filterTable('psaux-table')" placeholder="Filter..."></th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{p['pid']}</td>
-                <td>{p['ppid']}</td>
-                <td>{p['comm']}</td>
-                <td>{p['args']}</td>
-            </tr>
-            ''' for p in psaux)}
-        </tbody>
-    </table>
-    """
-
-def generate_ipaddr_html_pdf(ip_addresses, t):
-    return f"""
-    <table>
-        <thead>
-            <tr>
-                <th>{t['netns']}</th>
-                <th>{t['index']}</th>
-                <th>{t['interface']}</th>
-                <th>{t['mac']}</th>
-                <th>{t['promiscuous']}</th>
-                <th>{t['ip']}</th>
-                <th>{t['prefix']}</th>
-                <th>{t['scope']}</th>
-                <th>{t['type']}</th>
-                <th>{t['state']}</th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{i['netns']}</td>
-                <td>{i['index']}</td>
-                <td>{i['interface']}</td>
-                <td>{i['mac']}</td>
-                <td>{i['promiscuous']}</td>
-                <td>{i['ip']}</td>
-                <td>{i['prefix']}</td>
-                <td>{i['scope']}</td>
-                <td>{i['type']}</td>
-                <td>{i['state']}</td>
-            </tr>
-            ''' for i in ip_addresses)}
-        </tbody>
-    </table>
-    """
-
-def generate_bash_html_pdf(commands, t):
-    return f"""
-    <table>
-        <thead>
-            <tr>
-                <th>{t['pid']}</th>
-                <th>{t['process']}</th>
-                <th>{t['time']}</th>
-                <th>{t['command']}</th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{c['pid']}</td>
-                <td>{c['process']}</td>
-                <td>{c['time']}</td>
-                <td>{c['command']}</td>
-            </tr>
-            ''' for c in commands)}
-        </tbody>
-    </table>
-    """
-
-def generate_envars_html_pdf(envars, t):
-    return f"""
-    <table>
-        <thead>
-            <tr>
-                <th>{t['pid']}</th>
-                <th>{t['ppid']}</th>
-                <th>{t['comm']}</th>
-                <th>{t['key']}</th>
-                <th>{t['value']}</th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{e['pid']}</td>
-                <td>{e['ppid']}</td>
-                <td>{e['comm']}</td>
-                <td>{e['key']}</td>
-                <td>{e['value']}</td>
-            </tr>
-            ''' for e in envars)}
-        </tbody>
-    </table>
-    """
-
-def generate_boottime_html_pdf(boottime, t):
-    return f"""
-    <table>
-        <thead>
-            <tr>
-                <th>{t['time_ns']}</th>
-                <th>{t['boot_time']}</th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{b['time_ns']}</td>
-                <td>{b['boot_time']}</td>
-            </tr>
-            ''' for b in boottime)}
-        </tbody>
-    </table>
-    """
-
-def generate_pagecache_files_html_pdf(files, t):
-    return f"""
-    <table>
-        <thead>
-            <tr>
-                <th>{t['superblock_addr']}</th>
-                <th>{t['mount_point']}</th>
-                <th>{t['device']}</th>
-                <th>{t['inode_num']}</th>
-                <th>{t['inode_addr']}</th>
-                <th>{t['file_type']}</th>
-                <th>{t['inode_pages']}</th>
-                <th>{t['cached_pages']}</th>
-                <th>{t['file_mode']}</th>
-                <th>{t['access_time']}</th>
-                <th>{t['modification_time']}</th>
-                <th>{t['change_time']}</th>
-                <th>{t['file_path']}</th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{f['superblock_addr']}</td>
-                <td>{f['mount_point']}</td>
-                <td>{f['device']}</td>
-                <td>{f['inode_num']}</td>
-                <td>{f['inode_addr']}</td>
-                <td>{f['file_type']}</td>
-                <td>{f['inode_pages']}</td>
-                <td>{f['cached_pages']}</td>
-                <td>{f['file_mode']}</td>
-                <td>{' '.join(f['access_time'])}</td>
-                <td>{' '.join(f['modification_time'])}</td>
-                <td>{' '.join(f['change_time'])}</td>
-                <td>{f['file_path']}</td>
-            </tr>
-            ''' for f in files)}
-        </tbody>
-    </table>
-    """
-
-def generate_pslist_html_pdf(processes, t):
-    return f"""
-    <table>
-        <thead>
-            <tr>
-                <th>{t['offset']}</th>
-                <th>{t['pid']}</th>
-                <th>{t['tid']}</th>
-                <th>{t['ppid']}</th>
-                <th>{t['comm']}</th>
-                <th>{t['creation_time']}</th>
-                <th>{t['file_output']}</th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{p['offset']}</td>
-                <td>{p['pid']}</td>
-                <td>{p['tid']}</td>
-                <td>{p['ppid']}</td>
-                <td>{p['comm']}</td>
-                <td>{p['creation_time']}</td>
-                <td>{p['file_output']}</td>
-            </tr>
-            ''' for p in processes)}
-        </tbody>
-    </table>
-    """
-
-def generate_check_syscall_html_pdf(syscall, t):
-    return f"""
-    <table>
-        <thead>
-            <tr>
-                <th>{t['address']}</th>
-                <th>{t['name']}</th>
-                <th>{t['index']}</th>
-                <th>{t['handleraddr']}</th>
-                <th>{t['handlersymb']}</th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{p['address']}</td>
-                <td>{p['name']}</td>
-                <td>{p['index']}</td>
-                <td>{p['handleraddr']}</td>
-                <td>{p['handlersymb']}</td>
-            </tr>
-            ''' for p in syscall)}
-        </tbody>
-    </table>
-    """
-
-def generate_elfs_html_pdf(elfs, t):
-    return f"""
-    <table>
-        <thead>
-            <tr>
-                <th>{t['pid']}</th>
-                <th>{t['process']}</th>
-                <th>{t['start']}</th>
-                <th>{t['end']}</th>
-                <th>{t['filepath']}</th>
-                <th>{t['fileoutput']}</th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{p['pid']}</td>
-                <td>{p['process']}</td>
-                <td>{p['start']}</td>
-                <td>{p['end']}</td>
-                <td>{p['filepath']}</td>
-                <td>{p['fileoutput']}</td>
-            </tr>
-            ''' for p in elfs)}
-        </tbody>
-    </table>
-    """
-
-def generate_hidden_modules_html_pdf(hiddenmodules, t):
-    return f"""
-    <table>
-        <thead>
-            <tr>
-                <th>{t['offset']}</th>
-                <th>{t['module']}</th>
-                <th>{t['codesize']}</th>
-                <th>{t['taints']}</th>
-                <th>{t['arguments']}</th>
-                <th>{t['fileoutput']}</th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{p['offset']}</td>
-                <td>{p['module']}</td>
-                <td>{p['codesize']}</td>
-                <td>{p['taints']}</td>
-                <td>{p['arguments']}</td>
-                <td>{p['fileoutput']}</td>
-            </tr>
-            ''' for p in hiddenmodules)}
-        </tbody>
-    </table>
-    """
-
-def generate_library_list_html_pdf(library, t):
-    return f"""
-    <table>
-        <thead>
-            <tr>
-                <th>{t['name']}</th>
-                <th>{t['pid']}</th>
-                <th>{t['loadaddress']}</th>
-                <th>{t['path']}</th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{p['name']}</td>
-                <td>{p['pid']}</td>
-                <td>{p['loadaddress']}</td>
-                <td>{p['path']}</td>
-            </tr>
-            ''' for p in library)}
-        </tbody>
-    </table>
-    """
-
-def generate_recover_fs_html_pdf(library, t):
-    return f"""
-    <table>
-        <thead>
-            <tr>
-                <th>{t['blockaddr']}</th>
-                <th>{t['mountpoint']}</th>
-                <th>{t['device']}</th>
-                <th>{t['inodenum']}</th>
-                <th>{t['inodeaddr']}</th>
-                <th>{t['filetype']}</th>
-                <th>{t['inodepages']}</th>
-                <th>{t['cachedpages']}</th>
-                <th>{t['filemode']}</th>
-                <th>{t['accesstime']}</th>
-                <th>{t['modificationtime']}</th>
-                <th>{t['changetime']}</th>
-                <th>{t['filepath']}</th>
-                <th>{t['inodesize']}</th>
-                <th>{t['recovered']}</th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{p['blockaddr']}</td>
-                <td>{p['mountpoint']}</td>
-                <td>{p['device']}</td>
-                <td>{p['inodenum']}</td>
-                <td>{p['inodeaddr']}</td>
-                <td>{p['filetype']}</td>
-                <td>{p['inodepages']}</td>
-                <td>{p['cachedpages']}</td>
-                <td>{p['filemode']}</td>
-                <td>{' '.join(p['accesstime'])}</td>
-                <td>{' '.join(p['modificationtime'])}</td>
-                <td>{' '.join(p['changetime'])}</td>
-                <td>{p['filepath']}</td>
-                <td>{p['inodesize']}</td>
-                <td>{p['recovered']}</td>
-            </tr>
-            ''' for p in library)}
-        </tbody>
-    </table>
-    """
-
-def generate_psaux_html_pdf(psaux, t):
-    return f"""
-    <table>
-        <thead>
-            <tr>
-                <th>{t['pid']}</th>
-                <th>{t['ppid']}</th>
-                <th>{t['comm']}</th>
-                <th>{t['args']}</th>
-            </tr>
-        </thead>
-        <tbody>
-            {''.join(f'''
-            <tr>
-                <td>{p['pid']}</td>
-                <td>{p['ppid']}</td>
-                <td>{p['comm']}</td>
-                <td>{p['args']}</td>
-            </tr>
-            ''' for p in psaux)}
-        </tbody>
-    </table>
-    """
-
-if __name__ == '__main__':
-    app.run(port=8000, debug=True)
\ No newline at end of file
+@app.route('/export/<fmt>', methods=['GET'])
+def export_result(fmt):
+    # ?dump_id=&plugin=&compression=gzip|zstd : le résultat complet, envoyé batch par batch
+    dump_id = request.args.get('dump_id', '')
+    command = request.args.get('plugin', '')
+    if plugins.get(command) is None or dump_registry.result_info(dump_id, command) is None:
+        return jsonify({'error': 'Résultats introuvables'}), 404
+    
+    fields = plugins.fields(command)
+    try:
+        chunks, mimetype, extension = exports.export_stream(
+            dump_registry.iter_batches(dump_id, command, fields), fields, fmt,
+            request.args.get('compression') or None
+        )
+    except exports.ExportError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    filename = f"volinux_{dump_id}_{command.replace('.', '_')}.{extension}"
+    return Response(chunks, mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+    })
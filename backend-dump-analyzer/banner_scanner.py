@@ -0,0 +1,78 @@
+import logging
+import mmap
+import multiprocessing
+import os
+import re
+
+import compressed_dumps
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SIZE = int(os.environ.get('VOLINUX_BANNER_WINDOW', 64 * 1024 * 1024))
+SCAN_WORKERS = int(os.environ.get('VOLINUX_BANNER_WORKERS', os.cpu_count() or 1))
+# Longueur max d'une bannière : c'est aussi le recouvrement entre deux fenêtres
+MAX_BANNER_LEN = 512
+
+BANNER_START_RE = re.compile(rb'Linux version \d')
+# Bannière complète : version, compilateur entre parenthèses, numéro de build
+VALID_BANNER_RE = re.compile(rb'^Linux version \d+\.\d+\S* \(.+\) #\S+')
+
+_mp_context = multiprocessing.get_context('forkserver')
+
+
+def _search(buffer, start, end, base=0):
+    # La fenêtre déborde de MAX_BANNER_LEN pour les bannières à cheval sur deux fenêtres ;
+    # base est l'offset dans le dump du début du buffer
+    endpos = min(end + MAX_BANNER_LEN, len(buffer))
+    position = start
+    while True:
+        match = BANNER_START_RE.search(buffer, position, endpos)
+        if match is None or match.start() >= end:
+            return None
+        raw = buffer[match.start():min(match.start() + MAX_BANNER_LEN, len(buffer))]
+        banner = re.split(rb'[\x00\n]', raw, maxsplit=1)[0]
+        if VALID_BANNER_RE.match(banner):
+            return base + match.start(), banner.decode('utf-8', errors='replace')
+        position = match.start() + 1
+
+
+def _scan_window(args):
+    path, start, end = args
+    reader = compressed_dumps.open_reader(path)
+    if reader is not None:
+        # Dump compressé : seuls les blocs de la fenêtre sont décompressés
+        data = reader.read(start, min(end + MAX_BANNER_LEN, reader.size) - start)
+        return _search(data, 0, end - start, start)
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _search(mm, start, end)
+
+
+def _windows(path, size):
+    return [(path, start, min(start + WINDOW_SIZE, size)) for start in range(0, size, WINDOW_SIZE)]
+
+
+def find_banner(path, workers=None):
+    # Première bannière valide (plus petit offset), ou None
+    size = compressed_dumps.image_size(path)
+    if size == 0:
+        return None
+    windows = _windows(path, size)
+    workers = min(workers or SCAN_WORKERS, len(windows))
+
+    # Un processus daemon (pool de jobs) ne peut pas créer de pool : scan séquentiel
+    if workers <= 1 or multiprocessing.current_process().daemon:
+        for window in windows:
+            found = _scan_window(window)
+            if found:
+                return found
+        return None
+
+    with _mp_context.Pool(workers) as pool:
+        # Fenêtres traitées par vagues ordonnées : on s'arrête à la première vague qui trouve
+        for wave_start in range(0, len(windows), workers):
+            wave = windows[wave_start:wave_start + workers]
+            for found in pool.map(_scan_window, wave):
+                if found:
+                    logger.debug(f"Bannière trouvée à l'offset {found[0]:#x}")
+                    return found
+    return None
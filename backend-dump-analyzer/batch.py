@@ -0,0 +1,158 @@
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import time
+import traceback
+from multiprocessing import connection
+
+logger = logging.getLogger(__name__)
+
+BATCH_WORKERS = int(os.environ.get('VOLINUX_BATCH_WORKERS', os.cpu_count() or 1))
+# Mémoire (Mo) d'un processus d'analyse : tas et projections privées (RLIMIT_DATA).
+# Le dump, projeté en lecture seule, n'est pas compté : la limite ne dépend pas de sa taille
+BATCH_MEMORY_LIMIT = int(os.environ.get('VOLINUX_BATCH_MEMORY_LIMIT', 4096))
+BATCH_TIMEOUT = int(os.environ.get('VOLINUX_BATCH_TIMEOUT', 4 * 3600))
+BATCH_JOURNAL = os.environ.get('VOLINUX_BATCH_JOURNAL', 'batch-journal.jsonl')
+
+# fork : le processus d'un dump hérite de ce que le parent a déjà chargé (flask batch précharge
+# le framework Volatility), et n'analyse que ce dump
+_mp_context = multiprocessing.get_context('fork')
+
+
+def collect(sources, manifests=()):
+    # Dumps des dossiers (parcourus récursivement, fichiers cachés exclus), fichiers donnés
+    # directement et manifestes (un chemin par ligne, '#' pour un commentaire)
+    paths = []
+    for manifest in manifests:
+        base = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    paths.append(os.path.join(base, line))
+    for source in sources:
+        if not os.path.isdir(source):
+            paths.append(source)
+            continue
+        for root, dirs, files in os.walk(source):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            paths.extend(os.path.join(root, name) for name in sorted(files) if not name.startswith('.'))
+    return list(dict.fromkeys(os.path.realpath(path) for path in paths))
+
+
+def _identity(path, key):
+    # Un dump remplacé ou modifié depuis son passage dans le journal, ou un lot dont la clé
+    # (plugins demandés) a changé, est réanalysé
+    st = os.stat(path)
+    return [path, st.st_size, st.st_mtime_ns, key]
+
+
+def load_journal(path):
+    # Dernière entrée par dump ; une ligne tronquée (arrêt brutal pendant l'écriture) est ignorée
+    entries = {}
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries[entry['path']] = entry
+    except OSError:
+        pass
+    return entries
+
+
+def _append(journal, entry):
+    journal.write(json.dumps(entry) + '\n')
+    journal.flush()
+    os.fsync(journal.fileno())
+
+
+def _child_main(conn, task, path, memory_limit):
+    if memory_limit:
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+    try:
+        conn.send((task(path), None))
+    except MemoryError:
+        conn.send((None, f"Limite mémoire de {memory_limit} Mo atteinte"))
+    except Exception as e:
+        logger.error(f"Erreur lors de l'analyse de {path}: {traceback.format_exc()}")
+        conn.send((None, str(e)))
+    finally:
+        conn.close()
+
+
+def _start(task, path, memory_limit):
+    parent_conn, child_conn = _mp_context.Pipe(duplex=False)
+    process = _mp_context.Process(target=_child_main, args=(child_conn, task, path, memory_limit))
+    process.start()
+    child_conn.close()
+    return parent_conn, process
+
+
+def run(paths, task, journal_path=BATCH_JOURNAL, workers=None, memory_limit=BATCH_MEMORY_LIMIT,
+        timeout=BATCH_TIMEOUT, retry_failed=False, key=None):
+    # Exécute task(chemin) pour chaque dump, un processus neuf par dump (la mémoire d'une
+    # analyse est rendue à sa fin) et au plus workers à la fois. Chaque fin est écrite dans
+    # le journal avant d'être rendue : une reprise saute les dumps déjà traités.
+    workers = max(workers or BATCH_WORKERS, 1)
+    journal = load_journal(journal_path)
+    pending = []
+    for path in paths:
+        try:
+            identity = _identity(path, key)
+        except OSError as e:
+            yield {'path': path, 'status': 'failed', 'error': str(e), 'skipped': False}
+            continue
+        previous = journal.get(path)
+        if previous and previous.get('identity') == identity and (
+            previous['status'] == 'done' or not retry_failed
+        ):
+            yield dict(previous, skipped=True)
+            continue
+        pending.append(identity)
+    pending.reverse()
+
+    running = {}
+    with open(journal_path, 'a') as journal_file:
+        while pending or running:
+            while pending and len(running) < workers:
+                identity = pending.pop()
+                conn, process = _start(task, identity[0], memory_limit)
+                running[conn] = {'process': process, 'identity': identity, 'started': time.time()}
+                logger.info(f"Analyse de {identity[0]} (processus {process.pid})")
+
+            finished = []
+            for conn in connection.wait(list(running), timeout=1):
+                try:
+                    result, error = conn.recv()
+                except (EOFError, OSError):
+                    # Processus arrêté sans réponse (signal, tué par le noyau)
+                    running[conn]['process'].join()
+                    result, error = None, f"Processus arrêté (code {running[conn]['process'].exitcode})"
+                finished.append((conn, result, error))
+            now = time.time()
+            for conn, state in running.items():
+                if now - state['started'] > timeout and all(conn is not done[0] for done in finished):
+                    state['process'].kill()
+                    finished.append((conn, None, f"Analyse interrompue après {timeout}s"))
+
+            for conn, result, error in finished:
+                state = running.pop(conn)
+                state['process'].join()
+                conn.close()
+                entry = {
+                    'path': state['identity'][0],
+                    'identity': state['identity'],
+                    'status': 'failed' if error else 'done',
+                    'result': result,
+                    'error': error,
+                    'elapsed': now - state['started'],
+                    'finished_at': now,
+                }
+                _append(journal_file, entry)
+                yield dict(entry, skipped=False)
@@ -0,0 +1,270 @@
+import bisect
+import bz2
+import collections
+import gzip
+import hashlib
+import logging
+import lzma
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+import zlib
+
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+# Dumps compressés indexés hors de leur dossier (dumps locaux en lecture seule)
+BLOCKS_FOLDER = os.environ.get('VOLINUX_BLOCKS_FOLDER', 'blocks')
+# Taille décompressée d'un bloc : une lecture aléatoire décompresse au plus un bloc
+BLOCK_SIZE = int(os.environ.get('VOLINUX_DUMP_BLOCK_SIZE', 1024 * 1024))
+# Blocs décompressés gardés en mémoire, par dump et par processus
+BLOCK_CACHE_BYTES = int(os.environ.get('VOLINUX_BLOCK_CACHE_BYTES', 256 * 1024 * 1024))
+COMPRESSION_LEVEL = 3
+
+# Format 'seekable' de zstd : trames indépendantes suivies d'une table des trames dans une
+# trame ignorable ; le fichier reste lisible par 'zstd -d'
+SKIPPABLE_FRAME_MAGIC = 0x184D2A5E
+SEEKABLE_MAGIC = 0x8F92EAB1
+SEEK_TABLE_FOOTER = struct.Struct('<IBI')
+
+MAGIC_NUMBERS = (
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+    (b'\x1f\x8b', 'gzip'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'BZh', 'bz2'),
+    (b'7z\xbc\xaf\x27\x1c', '7z'),
+)
+
+_readers = {}
+_lock = threading.Lock()
+
+
+class CompressedDumpError(Exception):
+    pass
+
+
+def detect(path):
+    with open(path, 'rb') as f:
+        head = f.read(8)
+    return next((kind for magic, kind in MAGIC_NUMBERS if head.startswith(magic)), None)
+
+
+def read_seek_table(path):
+    # Index (trames compressées, tailles décompressées) d'un zstd 'seekable', ou None
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < SEEK_TABLE_FOOTER.size + 8:
+            return None
+        f.seek(size - SEEK_TABLE_FOOTER.size)
+        frames, descriptor, magic = SEEK_TABLE_FOOTER.unpack(f.read(SEEK_TABLE_FOOTER.size))
+        if magic != SEEKABLE_MAGIC:
+            return None
+        # Bit 7 du descripteur : une somme de contrôle suit chaque entrée
+        entry_size = 12 if descriptor & 0x80 else 8
+        f.seek(size - SEEK_TABLE_FOOTER.size - frames * entry_size)
+        table = f.read(frames * entry_size)
+
+    offsets, compressed_sizes, starts, sizes = [], [], [], []
+    offset = start = 0
+    for i in range(frames):
+        compressed_size, raw_size = struct.unpack_from('<II', table, i * entry_size)
+        offsets.append(offset)
+        compressed_sizes.append(compressed_size)
+        starts.append(start)
+        sizes.append(raw_size)
+        offset += compressed_size
+        start += raw_size
+    return {'offsets': offsets, 'compressed_sizes': compressed_sizes, 'starts': starts, 'sizes': sizes, 'size': start}
+
+
+def _block_path(path):
+    digest = hashlib.sha1(os.path.realpath(path).encode()).hexdigest()
+    return os.path.join(BLOCKS_FOLDER, f"{digest}.zst")
+
+
+def _seekable_path(path):
+    # Fichier à blocs d'un dump : le dump lui-même, ou sa copie transcodée si elle est à jour
+    if read_seek_table(path):
+        return path
+    block_path = _block_path(path)
+    try:
+        if os.path.getmtime(block_path) >= os.path.getmtime(path):
+            return block_path
+    except OSError:
+        pass
+    return None
+
+
+def _open_stream(path, kind):
+    # Flux décompressé, lu une seule fois du début à la fin
+    if kind == 'zstd':
+        return pa.input_stream(path, compression='zstd')
+    if kind == 'gzip':
+        return gzip.open(path, 'rb')
+    if kind == 'xz':
+        return lzma.open(path, 'rb')
+    if kind == 'bz2':
+        return bz2.open(path, 'rb')
+    executable = shutil.which('7zz') or shutil.which('7z') or shutil.which('7za')
+    if executable is None:
+        raise CompressedDumpError("Archive 7z : exécutable 7z introuvable sur le serveur")
+    return _ProcessStream([executable, 'e', '-so', path])
+
+
+class _ProcessStream:
+    # Sortie standard d'un extracteur externe ; un code de retour non nul rejette le dump
+    def __init__(self, cmd):
+        self.process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def read(self, size):
+        return self.process.stdout.read(size)
+
+    def close(self):
+        self.process.stdout.close()
+        stderr = self.process.stderr.read().decode(errors='replace')
+        if self.process.wait() != 0:
+            raise CompressedDumpError(f"Extraction 7z impossible: {stderr.strip()}")
+
+
+def _blocks(stream):
+    while True:
+        block = stream.read(BLOCK_SIZE)
+        if not block:
+            return
+        # Un flux peut rendre moins que demandé : les blocs restent de taille fixe
+        while len(block) < BLOCK_SIZE:
+            more = stream.read(BLOCK_SIZE - len(block))
+            if not more:
+                break
+            block += more
+        yield block
+
+
+def transcode(source, kind, target):
+    # Décompresse le flux une fois et l'écrit en trames zstd indépendantes de BLOCK_SIZE octets
+    codec = pa.Codec('zstd', compression_level=COMPRESSION_LEVEL)
+    entries = []
+    directory = os.path.dirname(os.path.abspath(target))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            stream = _open_stream(source, kind)
+            try:
+                for block in _blocks(stream):
+                    frame = codec.compress(block, asbytes=True)
+                    f.write(frame)
+                    entries.append((len(frame), len(block)))
+            finally:
+                stream.close()
+            table = b''.join(struct.pack('<II', *entry) for entry in entries)
+            footer = SEEK_TABLE_FOOTER.pack(len(entries), 0, SEEKABLE_MAGIC)
+            f.write(struct.pack('<II', SKIPPABLE_FRAME_MAGIC, len(table) + len(footer)) + table + footer)
+        os.replace(temp_path, target)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return sum(raw for _, raw in entries)
+
+
+def prepare(path, in_place=False):
+    # Rend une erreur, ou None. Un dump compressé sans index est transcodé une fois :
+    # à sa place s'il appartient à l'application (upload), sinon dans BLOCKS_FOLDER
+    kind = None
+    try:
+        kind = detect(path)
+        if kind is None or _seekable_path(path):
+            return None
+        start = time.perf_counter()
+        compressed_size = os.path.getsize(path)
+        target = path if in_place else _block_path(path)
+        size = transcode(path, kind, target)
+    except CompressedDumpError as e:
+        return str(e)
+    except (OSError, EOFError, zlib.error, lzma.LZMAError, pa.ArrowException) as e:
+        # Signature de compression par hasard en tête d'une image brute : lue telle quelle
+        logger.warning(f"{path} n'a pas pu être décompressé ({kind}), traité comme image brute: {str(e)}")
+        return None
+    stored = os.path.getsize(target)
+    logger.info(
+        f"Dump {kind} indexé par blocs en {time.perf_counter() - start:.1f}s: {path} "
+        f"({size} octets, {compressed_size} compressés, {stored} stockés, ratio {size / max(stored, 1):.1f}x)"
+    )
+    return None
+
+
+class BlockReader:
+    # Lecture aléatoire dans un zstd 'seekable' : seuls les blocs touchés sont décompressés,
+    # et les derniers utilisés restent en mémoire (LRU)
+    def __init__(self, path, index):
+        self.path = path
+        self.index = index
+        self.size = index['size']
+        self._fd = os.open(path, os.O_RDONLY)
+        self._codec = pa.Codec('zstd')
+        self._cache = collections.OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def _block(self, i):
+        with self._lock:
+            if i in self._cache:
+                self._cache.move_to_end(i)
+                return self._cache[i]
+        # pread : pas de position de fichier partagée entre threads ni après un fork
+        frame = os.pread(self._fd, self.index['compressed_sizes'][i], self.index['offsets'][i])
+        block = self._codec.decompress(frame, decompressed_size=self.index['sizes'][i], asbytes=True)
+        with self._lock:
+            if i not in self._cache:
+                self._cache[i] = block
+                self._cached_bytes += len(block)
+                while self._cached_bytes > BLOCK_CACHE_BYTES and len(self._cache) > 1:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cached_bytes -= len(evicted)
+        return block
+
+    def read(self, offset, length):
+        starts = self.index['starts']
+        parts = []
+        i = bisect.bisect_right(starts, offset) - 1
+        while length > 0 and 0 <= i < len(starts):
+            block = self._block(i)
+            part = block[offset - starts[i]:offset - starts[i] + length]
+            parts.append(part)
+            offset += len(part)
+            length -= len(part)
+            i += 1
+        return b''.join(parts)
+
+    def close(self):
+        os.close(self._fd)
+
+
+def open_reader(path):
+    # Lecteur partagé du dump (par processus), ou None pour une image non compressée
+    if not path:
+        return None
+    try:
+        key = (path, os.path.getmtime(path))
+        with _lock:
+            if key in _readers:
+                return _readers[key]
+        seekable_path = _seekable_path(path)
+    except OSError:
+        return None
+    if seekable_path is None:
+        return None
+    reader = BlockReader(seekable_path, read_seek_table(seekable_path))
+    with _lock:
+        return _readers.setdefault(key, reader)
+
+
+def image_size(path):
+    # Taille de l'image mémoire, décompressée si besoin
+    reader = open_reader(path)
+    return reader.size if reader else os.path.getsize(path)
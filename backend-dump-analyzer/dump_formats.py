@@ -0,0 +1,84 @@
+import logging
+import os
+import struct
+
+import compressed_dumps
+
+logger = logging.getLogger(__name__)
+
+# En-tête d'une plage LiME : magic, version, début, fin (incluse), réservé
+LIME_HEADER = struct.Struct('<IIQQQ')
+LIME_MAGIC = 0x4C694D45
+LIME_VERSION = 1
+
+# ELF64 little-endian : e_phoff, puis e_phentsize et e_phnum ; en-tête de programme
+ELF_MAGIC = b'\x7fELF'
+ELF_CLASS64 = 2
+ELF_DATA_LSB = 1
+ET_CORE = 4
+PT_LOAD = 1
+ELF_PROGRAM_HEADER = struct.Struct('<IIQQQQQQ')
+
+
+class DumpFormatError(Exception):
+    pass
+
+
+def _read_function(path):
+    # (lecture(offset, taille), taille de l'image), sur l'image décompressée si besoin
+    reader = compressed_dumps.open_reader(path)
+    if reader is not None:
+        return reader.read, reader.size
+
+    def read(offset, length):
+        with open(path, 'rb') as f:
+            return os.pread(f.fileno(), length, offset)
+
+    return read, os.path.getsize(path)
+
+
+def _lime_segments(read, size):
+    segments = []
+    offset = 0
+    while offset + LIME_HEADER.size <= size:
+        magic, version, start, end, _ = LIME_HEADER.unpack(read(offset, LIME_HEADER.size))
+        if magic != LIME_MAGIC or version != LIME_VERSION or end < start:
+            raise DumpFormatError(f"En-tête LiME invalide à l'offset {offset:#x}")
+        if segments and start <= segments[-1][0] + segments[-1][2] - 1:
+            raise DumpFormatError(f"Plages LiME non ordonnées à l'offset {offset:#x}")
+        segments.append([start, offset + LIME_HEADER.size, end - start + 1])
+        offset += LIME_HEADER.size + end - start + 1
+    return segments
+
+
+def _elf_core_segments(read):
+    header = read(0, 64)
+    if header[4] != ELF_CLASS64 or header[5] != ELF_DATA_LSB:
+        raise DumpFormatError("Seuls les cores ELF64 little-endian sont pris en charge")
+    phoff, = struct.unpack_from('<Q', header, 32)
+    phentsize, phnum = struct.unpack_from('<HH', header, 54)
+    table = read(phoff, phentsize * phnum)
+    segments = []
+    for i in range(phnum):
+        p_type, _, p_offset, _, p_paddr, p_filesz, p_memsz, _ = ELF_PROGRAM_HEADER.unpack_from(table, i * phentsize)
+        # Mêmes plages que la couche ELF de Volatility : PT_LOAD entièrement présents dans le fichier
+        if p_type == PT_LOAD and p_filesz == p_memsz and p_filesz > 0:
+            segments.append([p_paddr, p_offset, p_filesz])
+    if not segments:
+        raise DumpFormatError("Core ELF sans segment PT_LOAD")
+    return sorted(segments)
+
+
+def detect(path):
+    # {'format': 'lime' | 'elf' | 'raw', 'segments': [[adresse physique, offset dans l'image, taille], ...]}
+    read, size = _read_function(path)
+    head = read(0, 64)
+    try:
+        if len(head) >= LIME_HEADER.size and LIME_HEADER.unpack_from(head)[0] == LIME_MAGIC:
+            return {'format': 'lime', 'segments': _lime_segments(read, size)}
+        if head.startswith(ELF_MAGIC) and len(head) == 64 and struct.unpack_from('<H', head, 16)[0] == ET_CORE:
+            return {'format': 'elf', 'segments': _elf_core_segments(read)}
+    except (DumpFormatError, struct.error) as e:
+        # Laissé aux stackers de Volatility, qui pourront le rejeter ou le comprendre
+        logger.warning(f"Format de {path} non reconnu, traité comme image brute: {str(e)}")
+    return {'format': 'raw', 'segments': [[0, 0, size]]}
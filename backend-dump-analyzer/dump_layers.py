@@ -0,0 +1,254 @@
+import json
+import logging
+import mmap
+import multiprocessing
+import os
+import random
+import time
+import urllib.parse
+import urllib.request
+
+from volatility3.framework import contexts, interfaces
+from volatility3.framework.configuration import requirements
+from volatility3.framework.layers import physical, scanners, segmented
+
+import compressed_dumps
+
+logger = logging.getLogger(__name__)
+
+# 'mmap' : le dump est projeté en mémoire ; 'file' : couche fichier de Volatility (lectures bufferisées)
+LAYER_MODE = os.environ.get('VOLINUX_DUMP_LAYER', 'mmap')
+# Fenêtre demandée au noyau en avance (MADV_WILLNEED) pendant une lecture séquentielle
+READAHEAD_BYTES = int(os.environ.get('VOLINUX_LAYER_READAHEAD', 4 * 1024 * 1024))
+
+ACCESS_ADVICE = {
+    'normal': getattr(mmap, 'MADV_NORMAL', None),
+    'sequential': getattr(mmap, 'MADV_SEQUENTIAL', None),
+    'random': getattr(mmap, 'MADV_RANDOM', None),
+}
+
+# Couche d'origine, gardée pour les mesures une fois la couche projetée installée
+FileLayer = physical.FileLayer
+
+
+def _local_path(location):
+    parsed = urllib.parse.urlparse(location)
+    if parsed.scheme != 'file':
+        return None
+    return urllib.request.url2pathname(parsed.path)
+
+
+class MmapFileLayer(physical.FileLayer):
+    # Dump projeté en lecture seule et partagé : les processus qui analysent la même image
+    # lisent les mêmes pages du cache du système, sans copie dans un tampon par processus.
+    # Les emplacements qui ne sont pas des fichiers locaux restent lus comme par FileLayer.
+    def __new__(cls, *args, **kwargs):
+        # Dump compressé par blocs : la couche créée par le LayerStacker lit les blocs décompressés
+        if cls is MmapFileLayer and len(args) >= 2:
+            context, config_path = args[:2]
+            location = context.config.get(interfaces.configuration.path_join(config_path, 'location'))
+            if compressed_dumps.open_reader(_local_path(location or '')) is not None:
+                cls = BlockCompressedLayer
+        return super().__new__(cls)
+
+    def __init__(self, context, config_path, name, metadata=None):
+        self._mmap_ = None
+        self._mappable = LAYER_MODE == 'mmap'
+        # Séquentiel tant que la couche sert à la détection (recherche de la bannière)
+        self._access = 'sequential'
+        self._readahead_end = 0
+        super().__init__(context, config_path, name, metadata)
+
+    @property
+    def _mmap(self):
+        if self._mmap_ is None and self._mappable:
+            path = _local_path(self._location)
+            try:
+                with open(path, 'rb') as f:
+                    self._mmap_ = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (TypeError, OSError, ValueError):
+                # Pas un fichier local, ou fichier vide
+                self._mappable = False
+                return None
+            self._advise()
+        return self._mmap_
+
+    def _advise(self):
+        advice = ACCESS_ADVICE.get(self._access)
+        if advice is not None and hasattr(self._mmap_, 'madvise'):
+            self._mmap_.madvise(advice)
+
+    def set_access(self, access):
+        # 'sequential' pour les scanners, 'random' pour les parcours de tables de pages
+        if access not in ACCESS_ADVICE or access == self._access:
+            return
+        self._access = access
+        self._readahead_end = 0
+        if self._mmap_ is not None:
+            self._advise()
+
+    @property
+    def maximum_address(self):
+        mm = self._mmap
+        if mm is None:
+            return super().maximum_address
+        return len(mm) - 1
+
+    def _read_ahead(self, end, mm):
+        # Demande la fenêtre suivante, alignée sur les pages, avant que la lecture ne l'atteigne
+        if end + READAHEAD_BYTES // 2 < self._readahead_end or not hasattr(mm, 'madvise'):
+            return
+        start = max(end, self._readahead_end) & ~(mmap.PAGESIZE - 1)
+        length = min(READAHEAD_BYTES, len(mm) - start)
+        if length > 0:
+            mm.madvise(mmap.MADV_WILLNEED, start, length)
+            self._readahead_end = start + length
+
+    def read(self, offset, length, pad=False):
+        mm = self._mmap
+        if mm is None or not self.is_valid(offset, length):
+            # Lecture classique, ou exception d'adresse invalide de FileLayer
+            return super().read(offset, length, pad)
+        if self._access == 'sequential':
+            self._read_ahead(offset + length, mm)
+        return mm[offset:offset + length]
+
+    def __getstate__(self):
+        # Copie de contexte (clone) : la projection est refaite à la demande
+        state = dict(super().__getstate__())
+        state['_mmap_'] = None
+        return state
+
+    def destroy(self):
+        if self._mmap_ is not None:
+            self._mmap_.close()
+            self._mmap_ = None
+        super().destroy()
+
+
+class BlockCompressedLayer(MmapFileLayer):
+    # Image compressée en trames zstd indépendantes : une lecture ne décompresse que les
+    # blocs qu'elle touche, gardés dans le LRU du lecteur partagé par le processus
+    @property
+    def _reader(self):
+        if self.__dict__.get('_reader_') is None:
+            self._reader_ = compressed_dumps.open_reader(_local_path(self._location))
+        return self._reader_
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state['_reader_'] = None
+        return state
+
+    @property
+    def _mmap(self):
+        return None
+
+    @property
+    def maximum_address(self):
+        return self._reader.size - 1
+
+    def read(self, offset, length, pad=False):
+        if not self.is_valid(offset, length):
+            return super().read(offset, length, pad)
+        return self._reader.read(offset, length)
+
+
+class PrebuiltSegmentLayer(segmented.SegmentedLayer):
+    # Image LiME ou core ELF dont la table des plages physiques a été lue à l'enregistrement
+    # (dump_formats) : aucun en-tête n'est relu, les lectures vont droit à la couche du dump
+    def _load_segments(self):
+        segments = json.loads(self.config['segments'])
+        self._segments = [(start, offset, length, length) for start, offset, length in segments]
+
+    @classmethod
+    def get_requirements(cls):
+        return super().get_requirements() + [
+            requirements.StringRequirement(name='segments', description='Plages physiques (JSON)', optional=False)
+        ]
+
+
+# Couches dont la table des plages est remplacée par celle des métadonnées du dump
+SEGMENTED_LAYER_CLASSES = (
+    'volatility3.framework.layers.lime.LimeLayer',
+    'volatility3.framework.layers.elf.Elf64Layer',
+)
+
+
+def prebuilt_stack(config, segments):
+    # Configuration (clés à plat) d'un module noyau construit, réutilisable par une session
+    # neuve sans LayerStacker ; la couche LiME/ELF devient une PrebuiltSegmentLayer
+    stack = dict(config.items())
+    for key, value in list(stack.items()):
+        if key.endswith('.class') and value in SEGMENTED_LAYER_CLASSES and segments:
+            stack[key] = f"{__name__}.{PrebuiltSegmentLayer.__name__}"
+            stack[interfaces.configuration.path_join(key[:-len('.class')], 'segments')] = json.dumps(segments)
+    return stack
+
+
+def install():
+    # Les couches fichier construites par Volatility (LayerStacker) deviennent projetées,
+    # ou lues par blocs pour un dump compressé ; en mode 'file' une image brute reste lue
+    # par les lectures bufferisées de FileLayer
+    if physical.FileLayer is not MmapFileLayer:
+        physical.FileLayer = MmapFileLayer
+        logger.info(f"Couche de dump {LAYER_MODE} (lecture anticipée: {READAHEAD_BYTES} octets)")
+
+
+def set_access(context, access):
+    for layer_name in list(context.layers):
+        layer = context.layers[layer_name]
+        if isinstance(layer, MmapFileLayer):
+            layer.set_access(access)
+
+
+LAYER_CLASSES = {'file': FileLayer, 'mmap': MmapFileLayer}
+
+
+def open_layer(path, layer_class):
+    context = contexts.Context()
+    config_path = f"bench.{layer_class.__name__}"
+    context.config[f"{config_path}.location"] = 'file://' + urllib.request.pathname2url(os.path.abspath(path))
+    layer = layer_class(context, config_path, 'base_layer')
+    context.add_layer(layer)
+    return context, layer
+
+
+def benchmark(path, mode, total_bytes, reads, chunk_size=1024 * 1024):
+    # Débits d'une couche : lecture séquentielle, lectures aléatoires de pages, scan Volatility
+    context, layer = open_layer(path, LAYER_CLASSES[mode])
+    size = min(layer.maximum_address + 1, total_bytes)
+    results = {'layer': type(layer).__name__}
+
+    if isinstance(layer, MmapFileLayer):
+        layer.set_access('sequential')
+    start = time.perf_counter()
+    for offset in range(0, size, chunk_size):
+        layer.read(offset, min(chunk_size, size - offset))
+    results['sequential'] = size / (time.perf_counter() - start)
+
+    if isinstance(layer, MmapFileLayer):
+        layer.set_access('random')
+    pages = max(size // mmap.PAGESIZE, 1)
+    offsets = [random.randrange(pages) * mmap.PAGESIZE for _ in range(reads)]
+    start = time.perf_counter()
+    for offset in offsets:
+        layer.read(offset, mmap.PAGESIZE, pad=True)
+    results['random'] = reads / (time.perf_counter() - start)
+
+    if isinstance(layer, MmapFileLayer):
+        layer.set_access('sequential')
+    start = time.perf_counter()
+    hits = sum(1 for _ in layer.scan(context, scanners.BytesScanner(b'Linux version '), sections=[(0, size)]))
+    results['scan'] = size / (time.perf_counter() - start)
+    results['scan_hits'] = hits
+    layer.destroy()
+    return results
+
+
+def benchmark_concurrent(path, mode, total_bytes, reads, processes):
+    # Plusieurs analyses simultanées de la même image, comme plusieurs jobs ou utilisateurs
+    if processes <= 1:
+        return [benchmark(path, mode, total_bytes, reads)]
+    with multiprocessing.get_context('fork').Pool(processes) as pool:
+        return pool.starmap(benchmark, [(path, mode, total_bytes, reads)] * processes)
@@ -0,0 +1,270 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import time
+import uuid
+
+import pyarrow as pa
+
+import compressed_dumps
+import search_index
+
+logger = logging.getLogger(__name__)
+
+DUMPS_FOLDER = os.environ.get('VOLINUX_DUMPS_FOLDER', 'dumps')
+# Lignes par record batch : une page n'ouvre que les batches qui la recouvrent
+RESULT_BATCH_ROWS = int(os.environ.get('VOLINUX_RESULT_BATCH_ROWS', 65536))
+
+_dump_id_re = re.compile(r'^[0-9a-f]{32}$')
+_plugin_re = re.compile(r'^[A-Za-z0-9_.]+$')
+
+
+def _atomic_write_json(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+
+
+def _dump_folder(dump_id):
+    if not _dump_id_re.match(dump_id or ''):
+        raise KeyError(dump_id)
+    return os.path.join(DUMPS_FOLDER, dump_id)
+
+
+def _result_path(dump_id, plugin_name, extension='arrow'):
+    if not _plugin_re.match(plugin_name or ''):
+        raise KeyError(plugin_name)
+    return os.path.join(_dump_folder(dump_id), 'results', f"{plugin_name}.{extension}")
+
+
+def create_dump(path, profile_info, sha256, source, filename=None, layout=None):
+    # layout : format de l'image et table des plages physiques (dump_formats.detect)
+    layout = layout or {}
+    dump = {
+        'id': uuid.uuid4().hex,
+        'path': path,
+        'filename': filename or os.path.basename(path),
+        'source': source,
+        'size': os.path.getsize(path),
+        'image_size': compressed_dumps.image_size(path),
+        'sha256': sha256,
+        'os': 'Linux',
+        'kernel_version': profile_info['kernel_version'],
+        'distribution': profile_info['distribution'],
+        'distribution_version': profile_info['distro_version'],
+        'banner': profile_info['full_version'],
+        'format': layout.get('format'),
+        'segments': layout.get('segments'),
+        'created_at': time.time(),
+    }
+    _atomic_write_json(os.path.join(_dump_folder(dump['id']), 'meta.json'), dump)
+    logger.info(f"Dump enregistré: {dump['id']} ({path})")
+    return dump
+
+
+def get_dump(dump_id):
+    try:
+        with open(os.path.join(_dump_folder(dump_id), 'meta.json'), 'r') as f:
+            return json.load(f)
+    except (KeyError, OSError, ValueError):
+        return None
+
+
+def update_dump(dump_id, **fields):
+    # Complète les métadonnées d'un dump existant ; rend le dump mis à jour, ou None
+    dump = get_dump(dump_id)
+    if dump is None:
+        return None
+    dump.update(fields)
+    _atomic_write_json(os.path.join(_dump_folder(dump_id), 'meta.json'), dump)
+    return dump
+
+
+def find_dump(path, sha256):
+    # Dump déjà enregistré pour ce fichier et ce contenu (reprise d'un lot), ou None
+    return next((dump for dump in list_dumps() if dump['path'] == path and dump['sha256'] == sha256), None)
+
+
+def list_dumps():
+    try:
+        dump_ids = os.listdir(DUMPS_FOLDER)
+    except OSError:
+        return []
+    dumps = [get_dump(dump_id) for dump_id in dump_ids]
+    return sorted((dump for dump in dumps if dump), key=lambda dump: dump['created_at'])
+
+
+def _column_array(values):
+    # Type déduit sur toute la colonne ; une colonne hétérogène est stockée en texte
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        return pa.array([None if value is None else str(value) for value in values], pa.string())
+
+
+def save_result(dump_id, plugin_name, output, fields=None):
+    # Résultat en colonnes (Arrow IPC), par record batches, relu ensuite par mmap
+    fields = fields or (list(output[0]) if output else [])
+    created_at = time.time()
+    table = pa.table(
+        {field: _column_array([row.get(field) for row in output]) for field in fields}
+    ).replace_schema_metadata({
+        'command': plugin_name,
+        'created_at': str(created_at),
+        'rows': str(len(output)),
+        'batch_rows': str(RESULT_BATCH_ROWS),
+    })
+
+    path = _result_path(dump_id, plugin_name)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        options = pa.ipc.IpcWriteOptions(compression='zstd')
+        with os.fdopen(fd, 'wb') as f, pa.ipc.new_file(f, table.schema, options=options) as writer:
+            writer.write_table(table, max_chunksize=RESULT_BATCH_ROWS)
+        os.replace(temp_path, path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+    # Index plein texte mis à jour à chaque enregistrement ; un échec ne perd pas le résultat
+    try:
+        search_index.index_result(
+            dump_id, plugin_name, [{field: row.get(field) for field in fields} for row in output],
+            result_version(dump_id, plugin_name)
+        )
+    except sqlite3.Error as e:
+        logger.warning(f"Indexation de {plugin_name} ({dump_id}) impossible: {str(e)}")
+    return {'command': plugin_name, 'rows': table.num_rows, 'created_at': created_at}
+
+
+def _map_result(dump_id, plugin_name):
+    return pa.memory_map(_result_path(dump_id, plugin_name), 'r')
+
+
+def _load_json_result(dump_id, plugin_name):
+    # Résultats enregistrés avant le stockage en colonnes
+    try:
+        with open(_result_path(dump_id, plugin_name, 'json'), 'r') as f:
+            return json.load(f)
+    except (KeyError, OSError, ValueError):
+        return None
+
+
+def result_info(dump_id, plugin_name):
+    try:
+        source = _map_result(dump_id, plugin_name)
+    except (KeyError, OSError):
+        result = _load_json_result(dump_id, plugin_name)
+        if result is None:
+            return None
+        fields = list(result['output'][0]) if result['output'] else []
+        return {'command': result['command'], 'fields': fields, 'rows': len(result['output'])}
+    with source:
+        reader = pa.ipc.open_file(source)
+        metadata = reader.schema.metadata or {}
+        return {
+            'command': metadata.get(b'command', plugin_name.encode()).decode(),
+            'fields': reader.schema.names,
+            'rows': int(metadata.get(b'rows', 0)),
+        }
+
+
+def _read_columns(reader, fields, offset, limit):
+    fields = [field for field in (fields or reader.schema.names) if field in reader.schema.names]
+    end = None if limit is None else offset + limit
+    # Batches de taille fixe : on saute directement au premier batch utile, sans lire les autres
+    batch_rows = int((reader.schema.metadata or {}).get(b'batch_rows', 0))
+    first = min(offset // batch_rows, reader.num_record_batches) if batch_rows else 0
+    batches = []
+    position = first * batch_rows
+    for i in range(first, reader.num_record_batches):
+        batch = reader.get_batch(i)
+        batch_start, position = position, position + batch.num_rows
+        if position <= offset:
+            continue
+        if end is not None and batch_start >= end:
+            break
+        start = max(offset - batch_start, 0)
+        stop = batch.num_rows if end is None else min(end - batch_start, batch.num_rows)
+        batches.append(batch.select(fields).slice(start, stop - start))
+    if not batches:
+        return {field: [] for field in fields}
+    return pa.Table.from_batches(batches).to_pydict()
+
+
+def load_columns(dump_id, plugin_name, fields=None, offset=0, limit=None):
+    # Colonnes demandées sur [offset, offset + limit[ : seuls les batches concernés sont lus
+    try:
+        source = _map_result(dump_id, plugin_name)
+    except (KeyError, OSError):
+        result = _load_json_result(dump_id, plugin_name)
+        if result is None:
+            return None
+        rows = result['output'][offset:None if limit is None else offset + limit]
+        fields = fields or (list(rows[0]) if rows else [])
+        return {field: [row.get(field) for row in rows] for field in fields}
+    with source:
+        return _read_columns(pa.ipc.open_file(source), fields, offset, limit)
+
+
+def iter_batches(dump_id, plugin_name, fields=None):
+    # RecordBatch par RecordBatch, pour parcourir un résultat complet en mémoire constante
+    try:
+        source = _map_result(dump_id, plugin_name)
+    except (KeyError, OSError):
+        result = _load_json_result(dump_id, plugin_name)
+        if result is None:
+            return
+        output = result['output']
+        for start in range(0, len(output), RESULT_BATCH_ROWS):
+            rows = output[start:start + RESULT_BATCH_ROWS]
+            names = fields or list(rows[0])
+            yield pa.RecordBatch.from_pydict(
+                {field: _column_array([row.get(field) for row in rows]) for field in names}
+            )
+        return
+    with source:
+        reader = pa.ipc.open_file(source)
+        names = [field for field in (fields or reader.schema.names) if field in reader.schema.names]
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i).select(names)
+
+
+def iter_rows(dump_id, plugin_name, fields, limit=None):
+    # Lignes lues batch par batch, sans charger tout le résultat
+    count = 0
+    for batch in iter_batches(dump_id, plugin_name, fields):
+        for row in batch.to_pylist():
+            if limit is not None and count >= limit:
+                return
+            yield row
+            count += 1
+
+
+def result_version(dump_id, plugin_name):
+    # Change à chaque nouvelle sauvegarde du résultat (clé des index en mémoire)
+    for extension in ('arrow', 'json'):
+        try:
+            return os.stat(_result_path(dump_id, plugin_name, extension)).st_mtime_ns
+        except (KeyError, OSError):
+            continue
+    return None
+
+
+def list_results(dump_id):
+    try:
+        names = os.listdir(os.path.join(_dump_folder(dump_id), 'results'))
+    except (KeyError, OSError):
+        return []
+    return sorted({os.path.splitext(name)[0] for name in names if name.endswith(('.arrow', '.json'))})
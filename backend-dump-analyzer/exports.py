@@ -0,0 +1,120 @@
+import io
+import json
+import logging
+import zlib
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+COMPRESSIONS = {
+    'gzip': ('application/gzip', 'gz'),
+    'zstd': ('application/zstd', 'zst'),
+}
+# Parquet compresse ses colonnes lui-même : la compression demandée devient son codec
+PARQUET_DEFAULT_CODEC = 'zstd'
+
+
+class ExportError(Exception):
+    pass
+
+
+def _conform(batch, fields):
+    # Colonnes dans l'ordre du registre ; une colonne absente du résultat est vide
+    columns = [
+        batch.column(field) if field in batch.schema.names else pa.nulls(batch.num_rows)
+        for field in fields
+    ]
+    return pa.RecordBatch.from_arrays(columns, names=fields)
+
+
+def _csv_chunks(batches, fields):
+    header = True
+    for batch in batches:
+        sink = io.BytesIO()
+        pa_csv.write_csv(batch, sink, pa_csv.WriteOptions(include_header=header))
+        header = False
+        yield sink.getvalue()
+    if header:
+        # Résultat vide : l'en-tête seul
+        yield (','.join(f'"{field}"' for field in fields) + '\n').encode()
+
+
+def _jsonl_chunks(batches, fields):
+    for batch in batches:
+        yield ''.join(json.dumps(row, default=str) + '\n' for row in batch.to_pylist()).encode()
+
+
+class _Drain(io.RawIOBase):
+    # Fichier en écriture seule dont on récupère le contenu au fur et à mesure
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+def _parquet_chunks(batches, fields, codec):
+    sink = _Drain()
+    writer = None
+    for batch in batches:
+        if writer is None:
+            writer = pq.ParquetWriter(sink, batch.schema, compression=codec)
+        # Un row group par batch : le fichier part pendant qu'il s'écrit
+        writer.write_batch(batch)
+        yield sink.take()
+    if writer is None:
+        writer = pq.ParquetWriter(sink, pa.schema([(field, pa.null()) for field in fields]), compression=codec)
+    writer.close()
+    yield sink.take()
+
+
+def _compress(chunks, compression):
+    if compression == 'gzip':
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    elif compression == 'zstd':
+        # Une trame zstd par bloc : des trames concaténées forment un flux zstd valide
+        codec = pa.Codec('zstd')
+        for chunk in chunks:
+            if chunk:
+                yield codec.compress(chunk, asbytes=True)
+    else:
+        yield from chunks
+
+
+def export_stream(batches, fields, fmt, compression=None):
+    # batches : itérateur de RecordBatch ; rend (générateur d'octets, type MIME, extension)
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Format d'export inconnu: {fmt}")
+    if compression and compression not in COMPRESSIONS:
+        raise ExportError(f"Compression inconnue: {compression}")
+    batches = (_conform(batch, fields) for batch in batches)
+    mimetype, extension = EXPORT_FORMATS[fmt]
+
+    if fmt == 'parquet':
+        return _parquet_chunks(batches, fields, compression or PARQUET_DEFAULT_CODEC), mimetype, extension
+    chunks = _csv_chunks(batches, fields) if fmt == 'csv' else _jsonl_chunks(batches, fields)
+    if compression:
+        mimetype, suffix = COMPRESSIONS[compression]
+        extension = f"{extension}.{suffix}"
+    return _compress(chunks, compression), mimetype, extension
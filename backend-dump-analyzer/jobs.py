@@ -0,0 +1,248 @@
+import collections
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from multiprocessing import connection
+
+logger = logging.getLogger(__name__)
+
+JOBS_FOLDER = os.environ.get('VOLINUX_JOBS_FOLDER', 'jobs')
+MAX_WORKERS = int(os.environ.get('VOLINUX_MAX_WORKERS', 2))
+MAX_QUEUED_JOBS = int(os.environ.get('VOLINUX_MAX_QUEUED_JOBS', 100))
+JOB_TIMEOUT = int(os.environ.get('VOLINUX_JOB_TIMEOUT', 3600))
+# Délai maximal qu'un client peut demander pour un job
+MAX_JOB_TIMEOUT = int(os.environ.get('VOLINUX_MAX_JOB_TIMEOUT', 24 * 3600))
+
+FINISHED_STATUSES = ('done', 'failed', 'cancelled', 'timeout')
+
+# Type de job -> 'module:fonction' exécutée dans un processus du pool
+_handlers = {}
+_jobs = {}
+_queue = collections.deque()
+_workers = []
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_dispatcher = None
+_mp_context = multiprocessing.get_context('forkserver')
+# Dans un processus du pool : identifiant du job en cours d'exécution
+_current_job_id = None
+
+
+class QueueFullError(Exception):
+    pass
+
+
+def register_handler(kind, func):
+    _handlers[kind] = f"{func.__module__}:{func.__qualname__}"
+
+
+def _save(job):
+    os.makedirs(JOBS_FOLDER, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=JOBS_FOLDER, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(job, f)
+    os.replace(temp_path, os.path.join(JOBS_FOLDER, f"{job['id']}.json"))
+
+
+def _worker_main(conn):
+    # Boucle d'un processus du pool : les sessions Volatility restent chaudes entre les jobs
+    global _current_job_id
+    # Groupe de processus propre : un job arrêté l'est avec les processus qu'il a créés (triage).
+    # Daemon pour le serveur (arrêté avec lui), mais autorisé ici à créer ces processus
+    os.setpgrp()
+    multiprocessing.current_process().daemon = False
+    while True:
+        try:
+            job_id, handler, params = conn.recv()
+        except EOFError:
+            return
+        _current_job_id = job_id
+        try:
+            module_name, func_name = handler.split(':')
+            func = getattr(importlib.import_module(module_name), func_name)
+            conn.send((job_id, func(params), None))
+        except Exception as e:
+            logger.error(f"Erreur dans le job {job_id}: {traceback.format_exc()}")
+            conn.send((job_id, None, str(e)))
+
+
+def _spawn_worker():
+    parent_conn, child_conn = _mp_context.Pipe()
+    process = _mp_context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+    process.start()
+    child_conn.close()
+    return {'process': process, 'conn': parent_conn, 'job_id': None, 'deadline': None}
+
+
+def _replace_worker(worker):
+    try:
+        os.killpg(worker['process'].pid, signal.SIGTERM)
+    except OSError:
+        worker['process'].terminate()
+    worker['process'].join(5)
+    worker['conn'].close()
+    _workers[_workers.index(worker)] = _spawn_worker()
+
+
+def _finish(job, status, result=None, error=None):
+    job['status'] = status
+    job['result'] = result
+    job['error'] = error
+    job['finished_at'] = time.time()
+    _save(job)
+    logger.info(f"Job {job['id']} terminé: {status}")
+
+
+def _start_job(worker, job, now):
+    job['status'] = 'running'
+    job['started_at'] = now
+    _save(job)
+    worker['job_id'] = job['id']
+    worker['deadline'] = now + job['timeout']
+    worker['conn'].send((job['id'], _handlers[job['kind']], job['params']))
+
+
+def _dispatch_once():
+    with _lock:
+        now = time.time()
+        for worker in list(_workers):
+            job = _jobs.get(worker['job_id'])
+            if job is None:
+                continue
+            if job['status'] == 'cancelling':
+                _replace_worker(worker)
+                _finish(job, 'cancelled')
+            elif now > worker['deadline']:
+                _replace_worker(worker)
+                _finish(job, 'timeout', error=f"Job interrompu après {job['timeout']}s")
+            elif not worker['process'].is_alive():
+                _replace_worker(worker)
+                _finish(job, 'failed', error="Le processus du job s'est arrêté")
+
+        for worker in list(_workers):
+            if worker['job_id'] is not None or not _queue:
+                continue
+            job = _jobs[_queue.popleft()]
+            try:
+                _start_job(worker, job, now)
+            except Exception as e:
+                # Un job impossible à lancer échoue seul ; le processus du pool est remplacé
+                # s'il avait déjà reçu une partie du job
+                logger.error(f"Impossible de lancer le job {job['id']}: {traceback.format_exc()}")
+                if worker['job_id'] is not None:
+                    _replace_worker(worker)
+                _finish(job, 'failed', error=f"Impossible de lancer le job: {str(e)}")
+
+        busy = [worker['conn'] for worker in _workers if worker['job_id'] is not None]
+
+    for conn in connection.wait(busy, timeout=0.5) if busy else ():
+        try:
+            job_id, result, error = conn.recv()
+        except (EOFError, OSError):
+            continue
+        with _lock:
+            worker = next((w for w in _workers if w['conn'] is conn), None)
+            if worker is None:
+                continue
+            worker['job_id'] = None
+            job = _jobs[job_id]
+            if job['status'] not in FINISHED_STATUSES:
+                _finish(job, 'failed' if error else 'done', result, error)
+
+    if not busy:
+        _wakeup.wait(0.5)
+        _wakeup.clear()
+
+
+def _dispatch():
+    while True:
+        try:
+            _dispatch_once()
+        except Exception:
+            # Le dispatcher ne doit jamais s'arrêter : les jobs suivants resteraient en file
+            logger.error(f"Erreur du dispatcher de jobs: {traceback.format_exc()}")
+            time.sleep(0.5)
+
+
+def _ensure_started():
+    global _dispatcher
+    if not _workers:
+        for _ in range(MAX_WORKERS):
+            _workers.append(_spawn_worker())
+    if _dispatcher is None or not _dispatcher.is_alive():
+        _dispatcher = threading.Thread(target=_dispatch, name='volinux-jobs', daemon=True)
+        _dispatcher.start()
+
+
+def submit(kind, params, timeout=None):
+    if kind not in _handlers:
+        raise ValueError(f"Type de job inconnu: {kind}")
+    # Entier de 1 s à MAX_JOB_TIMEOUT ; ValueError si la valeur n'est pas un nombre
+    timeout = min(max(int(timeout), 1), MAX_JOB_TIMEOUT) if timeout is not None else JOB_TIMEOUT
+    with _lock:
+        if len(_queue) >= MAX_QUEUED_JOBS:
+            raise QueueFullError("File d'attente des jobs pleine")
+        _ensure_started()
+        job = {
+            'id': uuid.uuid4().hex,
+            'kind': kind,
+            'params': params,
+            'status': 'queued',
+            'timeout': timeout,
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None,
+        }
+        _jobs[job['id']] = job
+        _queue.append(job['id'])
+        _save(job)
+    _wakeup.set()
+    logger.info(f"Job {job['id']} soumis: {kind} {params}")
+    return dict(job)
+
+
+def current_job_id():
+    return _current_job_id
+
+
+def get(job_id):
+    with _lock:
+        if job_id in _jobs:
+            return dict(_jobs[job_id])
+    # Jobs d'un précédent démarrage : seul l'état persisté est disponible
+    try:
+        with open(os.path.join(JOBS_FOLDER, f"{os.path.basename(job_id)}.json"), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def list_jobs():
+    with _lock:
+        return sorted((dict(job) for job in _jobs.values()), key=lambda job: job['submitted_at'])
+
+
+def cancel(job_id):
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None or job['status'] in FINISHED_STATUSES:
+            return job and dict(job)
+        if job['status'] == 'queued':
+            _queue.remove(job_id)
+            _finish(job, 'cancelled')
+        else:
+            # Le dispatcher arrête le processus qui exécute le job
+            job['status'] = 'cancelling'
+            _save(job)
+    _wakeup.set()
+    return dict(job)
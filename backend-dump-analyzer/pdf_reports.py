@@ -0,0 +1,151 @@
+import collections
+import logging
+import os
+import tempfile
+
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+logger = logging.getLogger(__name__)
+
+REPORTS_FOLDER = os.environ.get('VOLINUX_REPORTS_FOLDER', 'reports')
+# Au-delà, le tableau est tronqué (mode 'table') ; le mode 'summary' résume chaque colonne
+PDF_MAX_ROWS = int(os.environ.get('VOLINUX_PDF_MAX_ROWS', 50000))
+# Au-delà de ce nombre de lignes, le PDF est généré par un job en arrière-plan
+PDF_SYNC_MAX_ROWS = int(os.environ.get('VOLINUX_PDF_SYNC_MAX_ROWS', 5000))
+PDF_MODES = ('table', 'summary')
+SUMMARY_TOP_VALUES = 5
+
+PAGE_SIZE = landscape(A4)
+MARGIN = 36
+FONT = 'Helvetica'
+FONT_BOLD = 'Helvetica-Bold'
+FONT_SIZE = 7
+ROW_HEIGHT = 10
+CELL_PADDING = 2
+
+
+def report_path(dump_id, plugin_name, lang, version, mode):
+    # Un PDF par (résultat, version du résultat, langue, mode) : une nouvelle exécution l'invalide
+    return os.path.join(REPORTS_FOLDER, dump_id, plugin_name, f"{version}.{lang}.{mode}.pdf")
+
+
+def _remove_stale(path):
+    # Les PDF des versions précédentes du même résultat ne servent plus
+    directory = os.path.dirname(path)
+    version = os.path.basename(path).split('.', 1)[0]
+    for name in os.listdir(directory):
+        if name.endswith('.pdf') and not name.startswith(f"{version}."):
+            try:
+                os.unlink(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def _fit(text, width, font=FONT):
+    # Coupe le texte à la largeur de la cellule
+    if stringWidth(text, font, FONT_SIZE) <= width:
+        return text
+    while text and stringWidth(text + '…', font, FONT_SIZE) > width:
+        text = text[:max(len(text) - max(len(text) // 8, 1), 0)]
+    return text + '…'
+
+
+class _Writer:
+    # Tableau dessiné page par page : une ligne est écrite dès qu'elle est lue
+    def __init__(self, pdf, title, info_lines, headers):
+        self.pdf = pdf
+        self.title = title
+        self.headers = headers
+        self.width, self.height = PAGE_SIZE
+        self.column_width = (self.width - 2 * MARGIN) / max(len(headers), 1)
+        self.page = 0
+        self._new_page(info_lines)
+
+    def _new_page(self, info_lines=()):
+        if self.page:
+            self.pdf.showPage()
+        self.page += 1
+        self.y = self.height - MARGIN
+        self.pdf.setFont(FONT_BOLD, 12)
+        self.pdf.drawString(MARGIN, self.y, self.title)
+        self.pdf.setFont(FONT, 8)
+        self.pdf.drawRightString(self.width - MARGIN, self.y, str(self.page))
+        self.y -= 18
+        for line in info_lines:
+            self.pdf.drawString(MARGIN, self.y, line)
+            self.y -= 11
+        if info_lines:
+            self.y -= 6
+        self._row(self.headers, FONT_BOLD)
+        self.pdf.line(MARGIN, self.y + ROW_HEIGHT - 2, self.width - MARGIN, self.y + ROW_HEIGHT - 2)
+
+    def _row(self, values, font=FONT):
+        self.pdf.setFont(font, FONT_SIZE)
+        for i, value in enumerate(values):
+            x = MARGIN + i * self.column_width
+            self.pdf.drawString(x + CELL_PADDING, self.y, _fit(value, self.column_width - 2 * CELL_PADDING, font))
+        self.y -= ROW_HEIGHT
+
+    def row(self, values):
+        if self.y < MARGIN:
+            self._new_page()
+        self._row(values)
+
+    def note(self, text):
+        if self.y < MARGIN + ROW_HEIGHT:
+            self._new_page()
+        self.y -= ROW_HEIGHT / 2
+        self.pdf.setFont(FONT_BOLD, 8)
+        self.pdf.drawString(MARGIN, self.y, text)
+        self.y -= ROW_HEIGHT
+
+
+def _cell(value):
+    return 'N/A' if value is None else str(value)
+
+
+def _summary_rows(rows, fields, labels):
+    # Par colonne : nombre de valeurs distinctes et valeurs les plus fréquentes
+    counters = {field: collections.Counter() for field in fields}
+    for row in rows:
+        for field in fields:
+            counters[field][_cell(row.get(field))] += 1
+    for field in fields:
+        top = ', '.join(f"{value} ({count})" for value, count in counters[field].most_common(SUMMARY_TOP_VALUES))
+        yield [labels[field], str(len(counters[field])), top]
+
+
+def build_report(path, title, info_lines, fields, labels, rows, total_rows, mode='table', max_rows=None):
+    # rows : itérateur de dict ; le PDF est écrit dans un fichier temporaire puis renommé
+    max_rows = PDF_MAX_ROWS if max_rows is None else max_rows
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        pdf = canvas.Canvas(temp_path, pagesize=PAGE_SIZE, pageCompression=1)
+        pdf.setTitle(title)
+        if mode == 'summary':
+            writer = _Writer(pdf, title, info_lines, [labels['column'], labels['distinct'], labels['top_values']])
+            for values in _summary_rows(rows, fields, labels):
+                writer.row(values)
+        else:
+            writer = _Writer(pdf, title, info_lines, [labels[field] for field in fields])
+            written = 0
+            for row in rows:
+                if written >= max_rows:
+                    break
+                writer.row([_cell(row.get(field)) for field in fields])
+                written += 1
+            if total_rows > written:
+                writer.note(labels['truncated'].format(shown=written, total=total_rows))
+        pdf.save()
+        os.replace(temp_path, path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+    _remove_stale(path)
+    logger.info(f"Rapport PDF généré: {path} ({total_rows} lignes, mode {mode})")
+    return path
@@ -0,0 +1,275 @@
+import re
+
+# Registre des plugins : commande, nom affiché, colonnes et analyseur, déclarés une seule fois.
+# Une colonne est (champ, colonnes Volatility candidates, format) ; le champ est aussi la clé
+# de traduction de son libellé. Les noms de colonnes Volatility sont comparés normalisés,
+# pour suivre leurs variantes entre versions. access indique comment le plugin lit le dump :
+# 'sequential' pour ceux qui scannent des plages de mémoire, 'random' pour les parcours de structures.
+# diff_keys est la clé naturelle d'une ligne pour comparer deux dumps (toute la ligne par défaut) ;
+# les champs de diff_ignored (adresses, fichiers extraits) changent à chaque capture et sont ignorés.
+# tree signale un résultat (pid, ppid) dont l'arbre des processus peut être construit.
+# dossier nomme la section du plugin dans le dossier d'un processus (lignes jointes par pid).
+
+
+def normalize_column(name):
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+def format_value(value, kind):
+    if kind == 'hex' and isinstance(value, int) and not isinstance(value, bool):
+        return hex(value)
+    return value
+
+
+def apply_schema(rows, columns):
+    # Colonnes Volatility -> champs de l'application ; une colonne absente donne None
+    if not rows:
+        return []
+    available = {normalize_column(name): name for name in rows[0]}
+    mapping = []
+    for field, candidates, kind in columns:
+        source = next(
+            (available[normalize_column(c)] for c in candidates if normalize_column(c) in available), None
+        )
+        mapping.append((field, source, kind))
+    return [
+        {field: format_value(row.get(source), kind) for field, source, kind in mapping}
+        for row in rows
+    ]
+
+
+def plugin(command, name, columns, parser=apply_schema, triage=False, access='random',
+           diff_keys=(), diff_ignored=(), tree=False, dossier=None):
+    return {
+        'command': command,
+        'name': name,
+        'columns': columns,
+        'fields': [field for field, _, _ in columns],
+        'parser': parser,
+        'triage': triage,
+        'access': access,
+        'diff_keys': list(diff_keys),
+        'diff_ignored': list(diff_ignored),
+        'tree': tree,
+        'dossier': dossier,
+    }
+
+
+PLUGINS = {entry['command']: entry for entry in [
+    plugin(
+        'linux.bash', 'Bash History',
+        [
+            ('pid', ('PID',), None),
+            ('process', ('Process',), None),
+            ('time', ('CommandTime',), None),
+            ('command', ('Command',), None),
+        ],
+        triage=True,
+        access='sequential',
+        diff_keys=('pid', 'time', 'command'),
+        dossier='bash_history',
+    ),
+    plugin(
+        'linux.envars', 'Environment Variables',
+        [
+            ('pid', ('PID',), None),
+            ('ppid', ('PPID',), None),
+            ('comm', ('COMM',), None),
+            ('key', ('KEY',), None),
+            ('value', ('VALUE',), None),
+        ],
+        triage=True,
+        diff_keys=('pid', 'comm', 'key'),
+        dossier='environment',
+    ),
+    plugin(
+        'linux.ip.Addr', 'IP Addresses',
+        [
+            ('netns', ('NetNS',), None),
+            ('index', ('Index',), None),
+            ('interface', ('Interface',), None),
+            ('mac', ('MAC',), None),
+            ('promiscuous', ('Promiscuous',), None),
+            ('ip', ('IP',), None),
+            ('prefix', ('Prefix',), None),
+            ('scope', ('Scope Type', 'Scope'), None),
+            ('type', ('Type',), None),
+            ('state', ('State',), None),
+        ],
+        triage=True,
+        diff_keys=('interface', 'ip'),
+    ),
+    plugin(
+        'linux.ip.Link', 'Networks Infos',
+        [
+            ('netns', ('NS', 'NetNS'), None),
+            ('interface', ('Interface',), None),
+            ('mac', ('MAC',), None),
+            ('state', ('State',), None),
+            ('mtu', ('MTU',), None),
+            ('qdisc', ('Qdisc',), None),
+            ('qlen', ('Qlen',), None),
+            ('flags', ('Flags',), None),
+        ],
+        diff_keys=('netns', 'interface'),
+    ),
+    plugin(
+        'linux.boottime.Boottime', 'Boottime Infos',
+        [
+            ('time_ns', ('TIME NS',), None),
+            ('boot_time', ('Boot Time',), None),
+        ],
+    ),
+    plugin(
+        'linux.pagecache.Files', 'List File in Memory',
+        [
+            ('superblock_addr', ('SuperblockAddr',), 'hex'),
+            ('mount_point', ('MountPoint',), None),
+            ('device', ('Device',), None),
+            ('inode_num', ('InodeNum',), None),
+            ('inode_addr', ('InodeAddr',), 'hex'),
+            ('file_type', ('FileType',), None),
+            ('inode_pages', ('InodePages',), None),
+            ('cached_pages', ('CachedPages',), None),
+            ('file_mode', ('FileMode',), None),
+            ('access_time', ('AccessTime',), None),
+            ('modification_time', ('ModificationTime',), None),
+            ('change_time', ('ChangeTime',), None),
+            ('file_path', ('FilePath',), None),
+        ],
+        diff_keys=('file_path',),
+        diff_ignored=('superblock_addr', 'inode_addr'),
+    ),
+    plugin(
+        'linux.pslist.PsList', 'Process List',
+        [
+            ('offset', ('OFFSET (V)', 'OFFSET (P)', 'OFFSET'), 'hex'),
+            ('pid', ('PID',), None),
+            ('tid', ('TID',), None),
+            ('ppid', ('PPID',), None),
+            ('comm', ('COMM',), None),
+            ('creation_time', ('CREATION TIME',), None),
+            ('file_output', ('File output',), None),
+        ],
+        triage=True,
+        diff_keys=('pid', 'comm', 'creation_time'),
+        diff_ignored=('offset', 'file_output'),
+        tree=True,
+    ),
+    plugin(
+        'linux.psaux.PsAux', 'Process List (Aux)',
+        [
+            ('pid', ('PID',), None),
+            ('ppid', ('PPID',), None),
+            ('comm', ('COMM',), None),
+            ('args', ('ARGS',), None),
+        ],
+        triage=True,
+        diff_keys=('pid', 'comm'),
+        tree=True,
+        dossier='process',
+    ),
+    plugin(
+        'linux.check_syscall.Check_syscall', 'Process List (Syscall)',
+        [
+            ('address', ('Table Address',), 'hex'),
+            ('name', ('Table Name',), None),
+            ('index', ('Index',), None),
+            ('handleraddr', ('Handler Address',), 'hex'),
+            ('handlersymb', ('Handler Symbol',), None),
+        ],
+        triage=True,
+        diff_keys=('name', 'index'),
+    ),
+    plugin(
+        'linux.elfs.Elfs', 'List of ELF files',
+        [
+            ('pid', ('PID',), None),
+            ('process', ('Process',), None),
+            ('start', ('Start',), 'hex'),
+            ('end', ('End',), 'hex'),
+            ('filepath', ('File Path',), None),
+            ('fileoutput', ('File Output',), None),
+        ],
+        diff_keys=('pid', 'process', 'filepath'),
+        diff_ignored=('fileoutput',),
+        dossier='elfs',
+    ),
+    plugin(
+        'linux.library_list.LibraryList', 'List of Libraries',
+        [
+            ('name', ('Name',), None),
+            ('pid', ('Pid',), None),
+            ('loadaddress', ('LoadAddress',), 'hex'),
+            ('path', ('Path',), None),
+        ],
+        diff_keys=('pid', 'name', 'path'),
+        dossier='libraries',
+    ),
+    plugin(
+        'linux.hidden_modules.Hidden_modules', 'Hidden Modules',
+        [
+            ('offset', ('Offset',), 'hex'),
+            ('module', ('Module Name', 'Name'), None),
+            ('codesize', ('Code Size',), 'hex'),
+            ('taints', ('Taints',), None),
+            ('arguments', ('Load Arguments', 'Arguments'), None),
+            ('fileoutput', ('File Output',), None),
+        ],
+        triage=True,
+        access='sequential',
+        diff_keys=('module',),
+        diff_ignored=('offset', 'fileoutput'),
+    ),
+    plugin(
+        'linux.pagecache.RecoverFs', 'Recover Filesystem',
+        [
+            ('blockaddr', ('SuperblockAddr',), 'hex'),
+            ('mountpoint', ('MountPoint',), None),
+            ('device', ('Device',), None),
+            ('inodenum', ('InodeNum',), None),
+            ('inodeaddr', ('InodeAddr',), 'hex'),
+            ('filetype', ('FileType',), None),
+            ('inodepages', ('InodePages',), None),
+            ('cachedpages', ('CachedPages',), None),
+            ('filemode', ('FileMode',), None),
+            ('accesstime', ('AccessTime',), None),
+            ('modificationtime', ('ModificationTime',), None),
+            ('changetime', ('ChangeTime',), None),
+            ('filepath', ('FilePath',), None),
+            ('inodesize', ('InodeSize',), None),
+            ('recovered', ('Recovered FileSize', 'Recovered'), None),
+        ],
+        diff_keys=('filepath',),
+        diff_ignored=('blockaddr', 'inodeaddr'),
+    ),
+]}
+
+
+def get(command):
+    return PLUGINS.get(command)
+
+
+def fields(command):
+    return PLUGINS[command]['fields']
+
+
+def parse(command, rows):
+    entry = PLUGINS[command]
+    return entry['parser'](rows, entry['columns'])
+
+
+def triage_commands():
+    return [command for command, entry in PLUGINS.items() if entry['triage']]
+
+
+def dossier_commands():
+    return {entry['dossier']: command for command, entry in PLUGINS.items() if entry['dossier']}
+
+
+def catalog():
+    # Liste publique (frontend) : sans l'analyseur
+    return [
+        {key: entry[key] for key in ('command', 'name', 'fields', 'triage', 'diff_keys')}
+        for entry in PLUGINS.values()
+    ]
@@ -0,0 +1,56 @@
+import os
+
+import result_index
+
+# Index pid -> lignes gardés en mémoire (LRU), un par version de résultat
+PID_INDEX_CACHE_SIZE = int(os.environ.get('VOLINUX_PID_INDEX_CACHE', 32))
+
+
+class PidIndex:
+    # Positions des lignes d'un résultat par pid, dans l'ordre du résultat
+    def __init__(self, fields, columns):
+        self.fields = [field for field in fields if field in columns]
+        self.columns = columns
+        self.positions = {}
+        for position, pid in enumerate(columns.get('pid') or []):
+            pid = result_index.parse_pid(pid)
+            if pid is not None:
+                self.positions.setdefault(pid, []).append(position)
+
+    def rows(self, pid):
+        return [
+            {field: self.columns[field][position] for field in self.fields}
+            for position in self.positions.get(pid, ())
+        ]
+
+    def __len__(self):
+        return len(self.positions)
+
+
+_indexes = result_index.VersionedCache('Index par pid', PID_INDEX_CACHE_SIZE, PidIndex)
+
+
+def get_index(key, fields, load_columns):
+    # key identifie une version d'un résultat, comme pour result_index.get_table
+    return _indexes.get(key, fields, load_columns)
+
+
+def build(pid, indexes):
+    # Dossier d'un processus : ses lignes dans chaque résultat (section -> index, None si le
+    # résultat manque). Le processus lui-même est la première ligne de la section 'process'.
+    sections = {}
+    missing = []
+    for section, index in indexes.items():
+        if index is None:
+            missing.append(section)
+            continue
+        sections[section] = index.rows(pid)
+    process = sections.get('process') or []
+    return {
+        'pid': pid,
+        'process': process[0] if process else None,
+        'found': any(sections.values()),
+        'sections': sections,
+        'counts': {section: len(rows) for section, rows in sections.items()},
+        'missing': missing,
+    }
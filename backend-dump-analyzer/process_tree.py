@@ -0,0 +1,149 @@
+import os
+
+import result_index
+
+# Arbres de processus gardés en mémoire (LRU), un par version de résultat
+TREE_CACHE_SIZE = int(os.environ.get('VOLINUX_PROCESS_TREE_CACHE', 8))
+# Nœuds rendus au plus par requête : enfants d'un nœud, ou sous-arbre
+MAX_TREE_NODES = 1000
+
+
+class TreeError(Exception):
+    pass
+
+
+class ProcessTree:
+    # Index d'un résultat pslist/psaux : pid -> parent, pid -> enfants triés, pid -> threads
+    # (tâches de même pid et de tid différent), et nombre de descendants de chaque processus
+    def __init__(self, fields, columns):
+        self.fields = fields
+        self.columns = columns
+        size = max((len(values) for values in columns.values()), default=0)
+        pids = columns.get('pid') or [None] * size
+        ppids = columns.get('ppid') or [None] * size
+        tids = columns.get('tid') or [None] * size
+
+        self.rows = {}
+        self.parent = {}
+        self.threads = {}
+        for position, (pid, ppid, tid) in enumerate(zip(pids, ppids, tids)):
+            pid, tid = result_index.parse_pid(pid), result_index.parse_pid(tid)
+            if pid is None:
+                continue
+            leader = tid is None or tid == pid
+            if not leader:
+                self.threads.setdefault(pid, []).append(tid)
+            # La ligne du processus est celle du thread principal, ou à défaut la première vue
+            if leader or pid not in self.rows:
+                self.rows[pid] = position
+                self.parent[pid] = result_index.parse_pid(ppid)
+
+        self.children = {}
+        roots = []
+        for pid in sorted(self.rows):
+            ppid = self.parent[pid]
+            if ppid is None or ppid == pid or ppid not in self.rows:
+                roots.append(pid)
+            else:
+                self.children.setdefault(ppid, []).append(pid)
+
+        # Parcours depuis les racines ; un cycle de parents (mémoire incohérente) n'est atteint
+        # par aucune racine : son plus petit pid devient une racine
+        order = []
+        visited = set()
+        self._walk(roots, visited, order)
+        for pid in sorted(self.rows):
+            if pid not in visited:
+                # Retiré des enfants de son parent : sinon le cycle se listerait sans fin
+                roots.append(pid)
+                self.children[self.parent[pid]].remove(pid)
+                self._walk([pid], visited, order)
+        self.roots = sorted(roots)
+        self.root_set = set(roots)
+        self.descendants = dict.fromkeys(self.rows, 0)
+        for pid in reversed(order):
+            if pid not in self.root_set:
+                self.descendants[self.parent[pid]] += self.descendants[pid] + 1
+
+    def _walk(self, pending, visited, order):
+        pending = list(pending)
+        while pending:
+            current = pending.pop()
+            if current in visited:
+                continue
+            visited.add(current)
+            order.append(current)
+            pending.extend(self.children.get(current, ()))
+
+    def _check_pid(self, pid):
+        if pid not in self.rows:
+            raise TreeError(f"Processus introuvable: {pid}")
+
+    def node(self, pid):
+        position = self.rows[pid]
+        return {
+            'pid': pid,
+            'ppid': self.parent[pid],
+            'row': {field: self.columns[field][position] for field in self.fields if field in self.columns},
+            'threads': len(self.threads.get(pid, ())),
+            'children': len(self.children.get(pid, ())),
+            'descendants': self.descendants[pid],
+        }
+
+    def list_children(self, pid=None, offset=0, limit=MAX_TREE_NODES):
+        # Enfants directs (racines si pid est None), par page : une racine de conteneurs peut
+        # avoir des dizaines de milliers d'enfants
+        if pid is not None:
+            self._check_pid(pid)
+        children = self.roots if pid is None else self.children.get(pid, [])
+        return [self.node(child) for child in children[offset:offset + limit]], len(children)
+
+    def ancestors(self, pid):
+        # Chaîne des parents, de la racine jusqu'au parent direct
+        self._check_pid(pid)
+        chain = []
+        seen = {pid}
+        current = self.parent[pid]
+        while pid not in self.root_set and current in self.rows and current not in seen:
+            chain.append(current)
+            if current in self.root_set:
+                break
+            seen.add(current)
+            current = self.parent[current]
+        return [self.node(ancestor) for ancestor in reversed(chain)]
+
+    def list_threads(self, pid):
+        self._check_pid(pid)
+        return sorted(self.threads.get(pid, []))
+
+    def subtree(self, pid, depth=None, limit=MAX_TREE_NODES):
+        # Sous-arbre en ordre préfixe, chaque nœud avec sa profondeur relative ; tronqué à
+        # limit nœuds ou à depth niveaux
+        self._check_pid(pid)
+        nodes = []
+        pending = [(pid, 0)]
+        visited = set()
+        while pending and len(nodes) < limit:
+            current, level = pending.pop()
+            if current in visited:
+                continue
+            visited.add(current)
+            nodes.append(dict(self.node(current), depth=level))
+            if depth is None or level < depth:
+                pending.extend((child, level + 1) for child in reversed(self.children.get(current, ())))
+        return nodes, bool(pending)
+
+    def stats(self):
+        return {
+            'processes': len(self.rows),
+            'threads': sum(len(tids) for tids in self.threads.values()),
+            'roots': len(self.roots),
+        }
+
+
+_trees = result_index.VersionedCache('Arbre de processus', TREE_CACHE_SIZE, ProcessTree)
+
+
+def get_tree(key, fields, load_columns):
+    # key identifie une version d'un résultat, comme pour result_index.get_table
+    return _trees.get(key, fields, load_columns)
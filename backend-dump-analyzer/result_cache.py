@@ -0,0 +1,192 @@
+import collections
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+CACHE_FOLDER = os.environ.get('VOLINUX_CACHE_FOLDER', 'cache')
+CACHE_MAX_BYTES = int(os.environ.get('VOLINUX_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+MEMORY_CACHE_MAX_BYTES = int(os.environ.get('VOLINUX_MEMORY_CACHE_MAX_BYTES', 256 * 1024 ** 2))
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+# Format des résultats stockés : à incrémenter quand la forme des lignes change
+FORMAT_VERSION = 2
+
+RESULTS_FOLDER = os.path.join(CACHE_FOLDER, 'results')
+HASHES_FILE = os.path.join(CACHE_FOLDER, 'hashes.json')
+
+# LRU en mémoire devant le cache disque : clé -> (taille sérialisée, résultat)
+_memory = collections.OrderedDict()
+_memory_bytes = 0
+_lock = threading.Lock()
+
+
+def _atomic_write(path, data):
+    # Écriture dans un fichier temporaire puis renommage, pour les workers concurrents
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+
+
+def _load_hashes():
+    try:
+        with open(HASHES_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _hash_id(path):
+    stat = os.stat(path)
+    return f"{os.path.realpath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def remember_hash(path, sha256):
+    with _lock:
+        hashes = _load_hashes()
+        hashes[_hash_id(path)] = sha256
+        _atomic_write(HASHES_FILE, json.dumps(hashes).encode())
+
+
+def dump_hash(path):
+    # SHA-256 du contenu, mémorisé par (chemin, taille, mtime) pour ne hacher qu'une fois
+    hash_id = _hash_id(path)
+    known = _load_hashes().get(hash_id)
+    if known:
+        return known
+
+    logger.debug(f"Calcul du SHA-256 de {path}")
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            sha256.update(block)
+    digest = sha256.hexdigest()
+    remember_hash(path, digest)
+    return digest
+
+
+def sampled_hash(path, samples=64, sample_size=1024 * 1024):
+    # Empreinte sans relire tout le fichier (dumps montés en local ou NFS) :
+    # taille + blocs répartis régulièrement, dont le début et la fin
+    hash_id = _hash_id(path)
+    known = _load_hashes().get(hash_id)
+    if known:
+        return known
+
+    size = os.path.getsize(path)
+    sha256 = hashlib.sha256(str(size).encode())
+    with open(path, 'rb') as f:
+        step = max((size - sample_size) // max(samples - 1, 1), 1)
+        for offset in sorted({min(i * step, max(size - sample_size, 0)) for i in range(samples)}):
+            f.seek(offset)
+            sha256.update(f.read(sample_size))
+    digest = f"sampled:{sha256.hexdigest()}"
+    remember_hash(path, digest)
+    return digest
+
+
+def content_id(path, image_hash):
+    # Identité du contenu pour make_key. Un hachage échantillonné peut être le même pour deux
+    # images de même taille différant hors des échantillons : il ne vaut que pour ce fichier
+    # (chemin, taille, mtime), sauf si le SHA-256 complet est déjà connu
+    if not image_hash:
+        return dump_hash(path)
+    if not image_hash.startswith('sampled:'):
+        return image_hash
+    hash_id = _hash_id(path)
+    known = _load_hashes().get(hash_id)
+    if known and not known.startswith('sampled:'):
+        return known
+    return f"{image_hash}@{hash_id}"
+
+
+def make_key(image_hash, banner, plugin_name, plugin_args=None):
+    payload = json.dumps(
+        [FORMAT_VERSION, image_hash, banner or '', plugin_name, plugin_args or {}], sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _result_path(key):
+    return os.path.join(RESULTS_FOLDER, f"{key}.json")
+
+
+def _remember(key, size, output):
+    global _memory_bytes
+    if size > MEMORY_CACHE_MAX_BYTES:
+        return
+    if key in _memory:
+        _memory_bytes -= _memory.pop(key)[0]
+    _memory[key] = (size, output)
+    _memory_bytes += size
+    while _memory_bytes > MEMORY_CACHE_MAX_BYTES:
+        _, (evicted_size, _) = _memory.popitem(last=False)
+        _memory_bytes -= evicted_size
+
+
+def get(key):
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key][1]
+
+    path = _result_path(key)
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        # La date d'accès sert d'ordre LRU pour l'éviction sur disque
+        os.utime(path)
+    except OSError:
+        return None
+
+    output = json.loads(data)
+    with _lock:
+        _remember(key, len(data), output)
+    logger.debug(f"Résultat trouvé dans le cache: {key}")
+    return output
+
+
+def put(key, output):
+    data = json.dumps(output).encode()
+    _atomic_write(_result_path(key), data)
+    with _lock:
+        _remember(key, len(data), output)
+    _evict()
+
+
+def _evict():
+    try:
+        entries = [entry for entry in os.scandir(RESULTS_FOLDER) if entry.name.endswith('.json')]
+    except OSError:
+        return
+
+    files = []
+    total = 0
+    for entry in entries:
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+        total += stat.st_size
+
+    # Les résultats les moins récemment utilisés partent en premier
+    for _, size, path in sorted(files):
+        if total <= CACHE_MAX_BYTES:
+            break
+        try:
+            os.unlink(path)
+            total -= size
+            logger.debug(f"Résultat évincé du cache: {path}")
+        except OSError:
+            pass
@@ -0,0 +1,94 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Lignes rendues par catégorie (ajoutées, supprimées, modifiées) ; les totaux restent exacts
+MAX_DIFF_ROWS = 1000
+
+
+def _index(columns, keys, size):
+    # Table de hachage clé naturelle -> position de la ligne
+    key_list = list(zip(*(columns[field] for field in keys))) if keys else [()] * size
+    index = dict(zip(key_list, range(size)))
+    return key_list, index
+
+
+def _numbered(key_list):
+    # Clés répétées : numérotées par occurrence, pour apparier les lignes dans l'ordre des résultats
+    seen = {}
+    numbered = []
+    for key in key_list:
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        numbered.append(key + (occurrence,))
+    return numbered, dict(zip(numbered, range(len(numbered))))
+
+
+def _row(columns, fields, i):
+    return {field: columns[field][i] for field in fields}
+
+
+def diff(base, target, fields, keys, ignored=(), limit=MAX_DIFF_ROWS):
+    # Jointure par hachage de deux résultats en colonnes (champ -> valeurs) sur leur clé
+    # naturelle. Sans clé, la ligne entière (hors ignored) sert de clé : ajouts et suppressions seuls.
+    # Deux lignes de même clé sont comparées sur les champs hors clé et hors 'ignored'
+    # (adresses virtuelles, fichiers extraits), qui changent d'une capture à l'autre.
+    start = time.perf_counter()
+    keys = [field for field in (keys or [f for f in fields if f not in ignored]) if field in fields]
+    compared = [field for field in fields if field not in keys and field not in ignored]
+    sizes = [max((len(columns.get(field, [])) for field in fields), default=0) for columns in (base, target)]
+    base, target = [
+        {field: columns.get(field) or [None] * size for field in fields}
+        for columns, size in zip((base, target), sizes)
+    ]
+    base_values = list(zip(*(base[field] for field in compared))) if compared else [()] * sizes[0]
+    target_values = list(zip(*(target[field] for field in compared))) if compared else [()] * sizes[1]
+
+    base_keys, base_index = _index(base, keys, sizes[0])
+    target_keys, target_index = _index(target, keys, sizes[1])
+    if len(base_index) < sizes[0] or len(target_index) < sizes[1]:
+        base_keys, base_index = _numbered(base_keys)
+        target_keys, target_index = _numbered(target_keys)
+
+    # Un seul passage sur la base (ordre des positions) ; les ajouts par différence d'ensembles
+    removed_positions, changed_pairs = [], []
+    lookup = target_index.get
+    for key, i in base_index.items():
+        j = lookup(key)
+        if j is None:
+            removed_positions.append(i)
+        elif base_values[i] != target_values[j]:
+            changed_pairs.append((i, j))
+    added_positions = sorted(target_index[key] for key in target_index.keys() - base_index.keys())
+    counts = {
+        'added': len(added_positions),
+        'removed': len(removed_positions),
+        'changed': len(changed_pairs),
+        'unchanged': sizes[0] - len(removed_positions) - len(changed_pairs),
+    }
+    added = [_row(target, fields, j) for j in added_positions[:limit]]
+    removed = [_row(base, fields, i) for i in removed_positions[:limit]]
+    changed = [
+        {
+            'key': dict(zip(keys, base_keys[i])),
+            'fields': [field for field, a, b in zip(compared, base_values[i], target_values[j]) if a != b],
+            'before': _row(base, fields, i),
+            'after': _row(target, fields, j),
+        }
+        for i, j in changed_pairs[:limit]
+    ]
+
+    elapsed = time.perf_counter() - start
+    logger.debug(f"Diff de {sizes[0]} et {sizes[1]} lignes en {elapsed:.3f}s: {counts}")
+    return {
+        'fields': fields,
+        'keys': keys,
+        'compared': compared,
+        'counts': counts,
+        'truncated': any(counts[name] > limit for name in ('added', 'removed', 'changed')),
+        'added': added,
+        'removed': removed,
+        'changed': changed,
+        'elapsed': elapsed,
+    }
@@ -0,0 +1,252 @@
+import bisect
+import collections
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Nombre de résultats indexés gardés en mémoire (LRU)
+INDEX_CACHE_SIZE = int(os.environ.get('VOLINUX_RESULT_INDEX_SIZE', 8))
+MAX_PAGE_SIZE = 1000
+# Sélections (filtres) et ordres calculés gardés par table
+MAX_MEMO_ENTRIES = 32
+
+FILTER_OPERATORS = ('contains', 'regex', 'range', 'eq')
+
+
+
+class QueryError(Exception):
+    pass
+
+
+class VersionedCache:
+    # Objets construits depuis les colonnes d'un résultat (table indexée, arbre des processus,
+    # index par pid), gardés en LRU. La clé identifie une version du résultat (dump, plugin,
+    # version) : une nouvelle exécution donne une nouvelle clé, l'ancienne sort du LRU.
+    def __init__(self, name, size, build):
+        self.name = name
+        self.size = size
+        self.build = build
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, fields, load_columns):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        columns = load_columns()
+        if columns is None:
+            return None
+        start = time.perf_counter()
+        value = self.build(fields, columns)
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        logger.debug(f"{self.name} construit: {key} en {time.perf_counter() - start:.3f}s")
+        return value
+
+
+def parse_pid(value):
+    # PID d'une ligne de résultat (entier, ou texte selon le moteur), None s'il n'y en a pas
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _number(value):
+    # Entiers, flottants et adresses '0x...' sont comparés comme des nombres
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value, 16) if value.lower().startswith('0x') else float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _sort_key(value):
+    if value is None:
+        return (0, 0, '')
+    number = _number(value)
+    if number is not None:
+        return (1, number, '')
+    return (2, 0, str(value).lower())
+
+
+class ResultTable:
+    # Colonnes d'un résultat, avec index construits à la demande : valeurs en minuscules
+    # pour les sous-chaînes, permutation triée pour les tris et les intervalles numériques
+    def __init__(self, fields, columns):
+        self.fields = fields
+        self.columns = {field: columns.get(field, []) for field in fields}
+        self.size = max((len(values) for values in self.columns.values()), default=0)
+        for field, values in self.columns.items():
+            if len(values) < self.size:
+                self.columns[field] = values + [None] * (self.size - len(values))
+        self._lowered = {}
+        self._sort_keys = {}
+        self._orders = {}
+        self._numeric = {}
+        self._memo = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_field(self, field):
+        if field not in self.columns:
+            raise QueryError(f"Colonne inconnue: {field}")
+
+    def _lowered_column(self, field):
+        if field not in self._lowered:
+            self._lowered[field] = [
+                '' if value is None else str(value).lower() for value in self.columns[field]
+            ]
+        return self._lowered[field]
+
+    def _keys(self, field):
+        # Clé de tri par ligne : nombre pour une colonne numérique, texte en minuscules
+        # pour une colonne de texte, tuple (type, nombre, texte) pour une colonne mixte
+        if field not in self._sort_keys:
+            values = self.columns[field]
+            numbers = [_number(value) for value in values]
+            if all(number is not None or value is None for number, value in zip(numbers, values)):
+                keys = [float('-inf') if number is None else number for number in numbers]
+            elif all(value is None or isinstance(value, str) for value in values):
+                keys = self._lowered_column(field)
+            else:
+                keys = [_sort_key(value) for value in values]
+            self._sort_keys[field] = keys
+        return self._sort_keys[field]
+
+    def _order(self, field):
+        if field not in self._orders:
+            keys = self._keys(field)
+            self._orders[field] = sorted(range(self.size), key=keys.__getitem__)
+        return self._orders[field]
+
+    def _numeric_index(self, field):
+        # (valeurs numériques triées, identifiants de lignes dans le même ordre)
+        if field not in self._numeric:
+            numbers = [_number(value) for value in self.columns[field]]
+            row_ids = sorted(
+                (i for i, number in enumerate(numbers) if number is not None), key=numbers.__getitem__
+            )
+            self._numeric[field] = ([numbers[i] for i in row_ids], row_ids)
+        return self._numeric[field]
+
+    def _memoize(self, key, compute):
+        if key in self._memo:
+            self._memo.move_to_end(key)
+            return self._memo[key]
+        value = compute()
+        self._memo[key] = value
+        while len(self._memo) > MAX_MEMO_ENTRIES:
+            self._memo.popitem(last=False)
+        return value
+
+    def _select(self, field, operator, value):
+        self._check_field(field)
+        if operator == 'contains':
+            needle = value.lower()
+            return {i for i, text in enumerate(self._lowered_column(field)) if needle in text}
+        if operator == 'eq':
+            needle = value.lower()
+            return {i for i, text in enumerate(self._lowered_column(field)) if text == needle}
+        if operator == 'regex':
+            try:
+                pattern = re.compile(value, re.IGNORECASE)
+            except re.error as e:
+                raise QueryError(f"Expression régulière invalide: {str(e)}")
+            return {i for i, text in enumerate(self._lowered_column(field)) if pattern.search(text)}
+        if operator == 'range':
+            low, _, high = value.partition('..')
+            low, high = _number(low) if low else None, _number(high) if high else None
+            numbers, row_ids = self._numeric_index(field)
+            start = bisect.bisect_left(numbers, low) if low is not None else 0
+            end = bisect.bisect_right(numbers, high) if high is not None else len(numbers)
+            return set(row_ids[start:end])
+        raise QueryError(f"Opérateur de filtre inconnu: {operator}")
+
+    def _sorted_ids(self, sort, selected):
+        if not sort:
+            return sorted(selected) if selected is not None else range(self.size)
+        for field, _ in sort:
+            self._check_field(field)
+        if len(sort) == 1:
+            field, descending = sort[0]
+            if selected is not None and len(selected) * 8 < self.size:
+                # Petite sélection : la trier coûte moins que parcourir l'ordre complet
+                return sorted(selected, key=self._keys(field).__getitem__, reverse=descending)
+            order = self._order(field)
+            if descending:
+                order = order[::-1]
+            return order if selected is None else [i for i in order if i in selected]
+
+        # Tri multi-colonnes stable : de la clé la moins prioritaire à la plus prioritaire
+        row_ids = list(range(self.size)) if selected is None else list(selected)
+        for field, descending in reversed(sort):
+            keys = self._keys(field)
+            row_ids.sort(key=keys.__getitem__, reverse=descending)
+        return row_ids
+
+    def query(self, filters=(), sort=(), offset=0, limit=100):
+        limit = max(0, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, offset)
+        filters = tuple(filters)
+        sort = tuple(sort)
+        with self._lock:
+            selected = None
+            for field, operator, value in filters:
+                matches = self._memoize(('filter', field, operator, value),
+                                        lambda: self._select(field, operator, value))
+                selected = matches if selected is None else selected & matches
+            row_ids = self._memoize(('sort', filters, sort), lambda: self._sorted_ids(sort, selected))
+
+        page = row_ids[offset:offset + limit]
+        return {
+            'fields': self.fields,
+            'total': self.size,
+            'filtered': len(row_ids),
+            'offset': offset,
+            'limit': limit,
+            'rows': [{field: self.columns[field][i] for field in self.fields} for i in page],
+        }
+
+
+def parse_filters(specs):
+    # 'champ:opérateur:valeur', ex. 'comm:contains:ssh', 'pid:range:100..200'
+    filters = []
+    for spec in specs:
+        field, _, rest = spec.partition(':')
+        operator, _, value = rest.partition(':')
+        if not field or operator not in FILTER_OPERATORS:
+            raise QueryError(f"Filtre invalide: {spec}")
+        filters.append((field, operator, value))
+    return filters
+
+
+def parse_sort(spec):
+    # 'pid,-comm' : tri par pid croissant puis comm décroissant
+    return [
+        (name.lstrip('-'), name.startswith('-'))
+        for name in (spec or '').split(',') if name.lstrip('-')
+    ]
+
+
+_tables = VersionedCache('Résultat indexé', INDEX_CACHE_SIZE, ResultTable)
+
+
+def get_table(key, fields, load_columns):
+    return _tables.get(key, fields, load_columns)
@@ -0,0 +1,98 @@
+import json
+import logging
+import os
+import time
+
+import jobs
+
+logger = logging.getLogger(__name__)
+
+# Lignes accumulées avant d'être analysées et écrites, ou délai max entre deux écritures
+SPOOL_FLUSH_ROWS = 500
+SPOOL_FLUSH_SECONDS = 0.5
+FOLLOW_POLL_SECONDS = 0.25
+FOLLOW_READ_SIZE = 4 * 1024 * 1024
+HEARTBEAT_SECONDS = 2
+# Flux suivis en même temps : chacun occupe un thread du serveur jusqu'à la fin de son job.
+# Au-delà, la requête est refusée (503) et le client réessaie après STREAM_RETRY_SECONDS
+MAX_STREAMS = int(os.environ.get('VOLINUX_MAX_JOB_STREAMS', 4))
+STREAM_RETRY_SECONDS = 5
+
+
+def spool_path(job_id):
+    return os.path.join(jobs.JOBS_FOLDER, f"{os.path.basename(job_id)}.rows.jsonl")
+
+
+class RowSpool:
+    # Lignes d'un job en cours : analysées par paquets et ajoutées à un fichier JSONL que
+    # le serveur web suit. Le fichier est supprimé à la fin, le résultat étant alors enregistré.
+    def __init__(self, path, parse):
+        self.path = path
+        self.parse = parse
+        self.pending = []
+        self.count = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = open(path, 'w')
+        self.flushed_at = time.monotonic()
+
+    def __call__(self, row):
+        self.pending.append(row)
+        if len(self.pending) >= SPOOL_FLUSH_ROWS or time.monotonic() - self.flushed_at >= SPOOL_FLUSH_SECONDS:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.file.write(''.join(json.dumps(row, default=str) + '\n' for row in self.parse(self.pending)))
+            self.file.flush()
+            self.count += len(self.pending)
+            self.pending = []
+        self.flushed_at = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+        self.file.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+        logger.debug(f"{self.count} lignes diffusées depuis {self.path}")
+
+
+def follow(path, finished, skip=0):
+    # Rend les nouvelles lignes JSON (texte) du fichier au fil de leur écriture, et une liste
+    # vide toutes les HEARTBEAT_SECONDS sans nouvelle ligne, jusqu'à ce que finished() soit vrai
+    f = None
+    partial = ''
+    beat = time.monotonic()
+    try:
+        while True:
+            done = finished()
+            if f is None:
+                try:
+                    f = open(path, 'r')
+                except OSError:
+                    pass
+            chunk = f.read(FOLLOW_READ_SIZE) if f is not None else ''
+            lines = (partial + chunk).split('\n')
+            # Dernière ligne incomplète : gardée pour la lecture suivante
+            partial = lines.pop()
+            if skip and lines:
+                skipped = min(skip, len(lines))
+                lines, skip = lines[skipped:], skip - skipped
+            exhausted = len(chunk) < FOLLOW_READ_SIZE
+            if lines:
+                beat = time.monotonic()
+                yield lines
+            elif time.monotonic() - beat >= HEARTBEAT_SECONDS:
+                beat = time.monotonic()
+                yield []
+            if exhausted:
+                if done:
+                    return
+                time.sleep(FOLLOW_POLL_SECONDS)
+    finally:
+        if f is not None:
+            f.close()
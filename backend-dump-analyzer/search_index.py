@@ -0,0 +1,217 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+# Index plein texte de tous les résultats enregistrés (SQLite FTS5, trigrammes)
+SEARCH_DB = os.environ.get('VOLINUX_SEARCH_DB', 'search.db')
+MAX_SEARCH_RESULTS = 500
+# Les trigrammes ne trouvent pas de terme plus court
+MIN_TERM_LENGTH = 3
+INSERT_BATCH_ROWS = 5000
+
+# Une ligne de résultat par entrée FTS : texte indexé (valeurs de la ligne), ligne d'origine
+# en JSON. Les lignes d'un résultat ont des rowid contigus, notés dans indexed_results :
+# un résultat réenregistré est retiré d'un seul DELETE sur l'intervalle. content_hash
+# (SHA-256 des lignes en JSON) évite de réindexer un résultat réenregistré à l'identique.
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS result_rows USING fts5(
+    text, dump_id UNINDEXED, plugin UNINDEXED, position UNINDEXED, row UNINDEXED,
+    tokenize='trigram'
+);
+CREATE TABLE IF NOT EXISTS indexed_results (
+    dump_id TEXT NOT NULL,
+    plugin TEXT NOT NULL,
+    version INTEGER,
+    first_rowid INTEGER,
+    last_rowid INTEGER,
+    rows INTEGER NOT NULL,
+    indexed_at REAL NOT NULL,
+    content_hash TEXT,
+    PRIMARY KEY (dump_id, plugin)
+);
+"""
+
+_schema_ready = set()
+
+
+class SearchError(Exception):
+    pass
+
+
+def _connect():
+    # Une connexion par appel : utilisé depuis le serveur, les jobs et les processus de lot
+    db = sqlite3.connect(SEARCH_DB, timeout=60, isolation_level=None)
+    if SEARCH_DB not in _schema_ready:
+        # WAL : les recherches continuent pendant une indexation
+        db.execute('PRAGMA journal_mode=WAL')
+        db.executescript(SCHEMA)
+        # Index créé avant content_hash : colonne ajoutée, ces résultats seront réindexés une fois
+        if 'content_hash' not in [column[1] for column in db.execute('PRAGMA table_info(indexed_results)')]:
+            db.execute('ALTER TABLE indexed_results ADD COLUMN content_hash TEXT')
+        _schema_ready.add(SEARCH_DB)
+    return db
+
+
+def _row_text(row):
+    return '\n'.join(str(value) for value in row.values() if value is not None and value != '')
+
+
+def _content_hash(encoded_rows):
+    sha256 = hashlib.sha256()
+    for row_json in encoded_rows:
+        sha256.update(row_json.encode())
+        sha256.update(b'\n')
+    return sha256.hexdigest()
+
+
+def _unchanged(dump_id, plugin_name, content_hash, version):
+    # Mêmes lignes déjà indexées : seule la version est notée, sans verrou d'écriture long
+    db = _connect()
+    try:
+        updated = db.execute(
+            'UPDATE indexed_results SET version = ? WHERE dump_id = ? AND plugin = ? AND content_hash = ?',
+            (version, dump_id, plugin_name, content_hash)
+        ).rowcount
+        if not updated:
+            return None
+        return db.execute(
+            'SELECT rows FROM indexed_results WHERE dump_id = ? AND plugin = ?', (dump_id, plugin_name)
+        ).fetchone()[0]
+    finally:
+        db.close()
+
+
+def index_result(dump_id, plugin_name, rows, version=None):
+    # Remplace les lignes indexées du résultat (dump, plugin) par rows (itérable de dict).
+    # Une liste identique à celle déjà indexée n'est pas réindexée ; un itérateur (réindexation
+    # explicite) l'est toujours
+    start = time.perf_counter()
+    if isinstance(rows, list):
+        encoded = [json.dumps(row, default=str) for row in rows]
+        unchanged = _unchanged(dump_id, plugin_name, _content_hash(encoded), version)
+        if unchanged is not None:
+            logger.debug(f"{plugin_name} de {dump_id} déjà indexé à l'identique")
+            return unchanged
+        pairs = zip(rows, encoded)
+    else:
+        pairs = ((row, json.dumps(row, default=str)) for row in rows)
+
+    sha256 = hashlib.sha256()
+    db = _connect()
+    try:
+        # Verrou d'écriture pris avant de lire les intervalles : rowid contigus et sans conflit
+        db.execute('BEGIN IMMEDIATE')
+        previous = db.execute(
+            'SELECT first_rowid, last_rowid FROM indexed_results WHERE dump_id = ? AND plugin = ?',
+            (dump_id, plugin_name)
+        ).fetchone()
+        if previous and previous[0] is not None:
+            db.execute('DELETE FROM result_rows WHERE rowid BETWEEN ? AND ?', previous)
+        first = (db.execute('SELECT max(last_rowid) FROM indexed_results').fetchone()[0] or 0) + 1
+        count = 0
+        batch = []
+        for position, (row, row_json) in enumerate(pairs):
+            sha256.update(row_json.encode())
+            sha256.update(b'\n')
+            batch.append((first + position, _row_text(row), dump_id, plugin_name, position, row_json))
+            if len(batch) >= INSERT_BATCH_ROWS:
+                db.executemany('INSERT INTO result_rows(rowid, text, dump_id, plugin, position, row) VALUES (?, ?, ?, ?, ?, ?)', batch)
+                count += len(batch)
+                batch = []
+        db.executemany('INSERT INTO result_rows(rowid, text, dump_id, plugin, position, row) VALUES (?, ?, ?, ?, ?, ?)', batch)
+        count += len(batch)
+        db.execute(
+            'INSERT OR REPLACE INTO indexed_results'
+            '(dump_id, plugin, version, first_rowid, last_rowid, rows, indexed_at, content_hash)'
+            ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (dump_id, plugin_name, version, first if count else None, first + count - 1 if count else None,
+             count, time.time(), sha256.hexdigest())
+        )
+        db.execute('COMMIT')
+    except BaseException:
+        if db.in_transaction:
+            db.execute('ROLLBACK')
+        raise
+    finally:
+        db.close()
+    logger.debug(f"{count} lignes de {plugin_name} indexées pour {dump_id} en {time.perf_counter() - start:.2f}s")
+    return count
+
+
+def indexed_versions():
+    # (dump, plugin) -> version du résultat indexé, pour réindexer seulement ce qui a changé
+    db = _connect()
+    try:
+        return {
+            (dump_id, plugin): version
+            for dump_id, plugin, version in db.execute('SELECT dump_id, plugin, version FROM indexed_results')
+        }
+    finally:
+        db.close()
+
+
+def parse_query(query):
+    # "texte exact" cherché tel quel ; sinon chaque terme (sous-chaîne) doit apparaître dans la ligne
+    query = (query or '').strip()
+    if len(query) > 1 and query.startswith('"') and query.endswith('"'):
+        terms = [query[1:-1]]
+    else:
+        terms = query.split()
+    if not terms or any(len(term) < MIN_TERM_LENGTH for term in terms):
+        raise SearchError(f"Chaque terme doit compter au moins {MIN_TERM_LENGTH} caractères")
+    return terms
+
+
+def search(query, dump_id=None, plugin_name=None, offset=0, limit=100):
+    terms = parse_query(query)
+    expression = ' AND '.join('"' + term.replace('"', '""') + '"' for term in terms)
+    sql = 'SELECT dump_id, plugin, position, row FROM result_rows WHERE result_rows MATCH ?'
+    params = [expression]
+    if dump_id:
+        sql += ' AND dump_id = ?'
+        params.append(dump_id)
+    if plugin_name:
+        sql += ' AND plugin = ?'
+        params.append(plugin_name)
+    # Une ligne de plus que demandé : indique s'il reste des résultats
+    sql += ' ORDER BY rowid LIMIT ? OFFSET ?'
+    params += [limit + 1, offset]
+
+    start = time.perf_counter()
+    db = _connect()
+    try:
+        found = db.execute(sql, params).fetchall()
+    except sqlite3.OperationalError as e:
+        raise SearchError(f"Recherche invalide: {str(e)}")
+    finally:
+        db.close()
+
+    lowered = [term.lower() for term in terms]
+    matches = []
+    for match_dump_id, match_plugin, position, row_json in found[:limit]:
+        row = json.loads(row_json)
+        matches.append({
+            'dump_id': match_dump_id,
+            'plugin': match_plugin,
+            'position': position,
+            'row': row,
+            # Champs où un terme apparaît, pour les mettre en évidence
+            'fields': [
+                field for field, value in row.items()
+                if value is not None and any(term in str(value).lower() for term in lowered)
+            ],
+        })
+    return {
+        'query': query,
+        'terms': terms,
+        'offset': offset,
+        'limit': limit,
+        'more': len(found) > limit,
+        'matches': matches,
+        'elapsed': time.perf_counter() - start,
+    }
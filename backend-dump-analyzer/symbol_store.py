@@ -0,0 +1,171 @@
+import base64
+import bz2
+import filecmp
+import gzip
+import hashlib
+import json
+import logging
+import lzma
+import os
+import pathlib
+import shutil
+import tempfile
+import threading
+import urllib.parse
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+SYMBOLS_DIR = os.path.abspath(os.environ.get('VOLINUX_SYMBOLS_DIR', 'symbols'))
+# Index au format 'remote ISF' de Volatility3, avec des URL file:// vers le magasin local
+INDEX_FILE = os.path.join(SYMBOLS_DIR, 'banners.json')
+ISF_OPENERS = {
+    '.json': open,
+    '.json.xz': lzma.open,
+    '.json.gz': gzip.open,
+    '.json.bz2': bz2.open,
+}
+
+# Bannière normalisée -> chemin de l'ISF, rechargé seulement si l'index change sur disque
+_index = None
+_index_mtime = None
+_lock = threading.Lock()
+
+
+class SymbolStoreError(Exception):
+    pass
+
+
+def normalize_banner(banner):
+    if isinstance(banner, bytes):
+        banner = banner.decode('utf-8', errors='replace')
+    return banner.strip('\x00').strip()
+
+
+def _isf_suffix(path):
+    for suffix in ISF_OPENERS:
+        if path.endswith(suffix):
+            return suffix
+    return None
+
+
+def _read_index_file():
+    try:
+        with open(INDEX_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'version': 1, 'linux': {}}
+
+
+def _current_mtime():
+    try:
+        return os.stat(INDEX_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+
+def load_index():
+    global _index, _index_mtime
+    with _lock:
+        _index_mtime = _current_mtime()
+        index = {}
+        for identifier, urls in _read_index_file().get('linux', {}).items():
+            if urls:
+                banner = normalize_banner(base64.b64decode(identifier))
+                index[banner] = urllib.request.url2pathname(urllib.parse.urlparse(urls[0]).path)
+        _index = index
+        logger.info(f"Magasin de symboles chargé: {len(index)} bannières ({SYMBOLS_DIR})")
+        return index
+
+
+def _get_index():
+    if _index is None or _current_mtime() != _index_mtime:
+        return load_index()
+    return _index
+
+
+def lookup(banner):
+    return _get_index().get(normalize_banner(banner))
+
+
+def isf_index_url():
+    if not _get_index():
+        return None
+    return pathlib.Path(INDEX_FILE).as_uri()
+
+
+def read_banner(path):
+    # La bannière noyau d'un ISF Linux est la donnée constante du symbole linux_banner
+    suffix = _isf_suffix(path)
+    if suffix is None:
+        raise SymbolStoreError(f"Extension ISF inconnue: {path} (attendu : {', '.join(ISF_OPENERS)})")
+    with ISF_OPENERS[suffix](path, 'rt') as f:
+        isf = json.load(f)
+    constant_data = isf.get('symbols', {}).get('linux_banner', {}).get('constant_data')
+    return constant_data
+
+
+def _iter_isf_files(source):
+    if os.path.isfile(source):
+        yield source
+        return
+    for root, _, files in os.walk(source):
+        for name in sorted(files):
+            if _isf_suffix(name) and name != 'banners.json':
+                yield os.path.join(root, name)
+
+
+def _store_isf(path, linux_dir, identifier):
+    # Un fichier du même nom n'est réutilisé que s'il est identique : deux paquets peuvent
+    # nommer pareil des ISF de noyaux différents. Sinon le nom porte le hachage de la bannière
+    name = os.path.basename(path)
+    target = os.path.join(linux_dir, name)
+    if os.path.exists(target) and filecmp.cmp(path, target, shallow=False):
+        return target
+    if os.path.exists(target):
+        suffix = _isf_suffix(name)
+        banner_hash = hashlib.sha256(identifier.encode()).hexdigest()[:16]
+        target = os.path.join(linux_dir, f"{name[:-len(suffix)]}-{banner_hash}{suffix}")
+        if os.path.exists(target) and filecmp.cmp(path, target, shallow=False):
+            return target
+    # Copie puis renommage : un plugin en cours ne lit jamais un ISF à moitié écrit
+    fd, temp_path = tempfile.mkstemp(dir=linux_dir, suffix='.tmp')
+    os.close(fd)
+    shutil.copyfile(path, temp_path)
+    os.replace(temp_path, target)
+    return target
+
+
+def import_pack(source):
+    # Un fichier donné directement doit être un ISF ; dans un dossier, les autres sont ignorés
+    if os.path.isfile(source) and _isf_suffix(source) is None:
+        raise SymbolStoreError(f"Extension ISF inconnue: {source} (attendu : {', '.join(ISF_OPENERS)})")
+    if not os.path.exists(source):
+        raise SymbolStoreError(f"Source introuvable: {source}")
+    linux_dir = os.path.join(SYMBOLS_DIR, 'linux')
+    os.makedirs(linux_dir, exist_ok=True)
+    index = _read_index_file()
+    index.setdefault('linux', {})
+
+    imported = 0
+    for path in _iter_isf_files(source):
+        try:
+            identifier = read_banner(path)
+        except (OSError, ValueError, EOFError, lzma.LZMAError) as e:
+            logger.warning(f"ISF illisible ignoré: {path} ({str(e)})")
+            continue
+        if not identifier:
+            logger.debug(f"ISF sans bannière linux ignoré: {path}")
+            continue
+
+        target = _store_isf(path, linux_dir, identifier)
+        index['linux'][identifier] = [pathlib.Path(target).as_uri()]
+        imported += 1
+
+    fd, temp_path = tempfile.mkstemp(dir=SYMBOLS_DIR, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(index, f)
+    os.replace(temp_path, INDEX_FILE)
+    load_index()
+    logger.info(f"{imported} ISF importés depuis {source}")
+    return imported
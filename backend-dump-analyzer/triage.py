@@ -0,0 +1,30 @@
+import logging
+import multiprocessing
+import os
+import time
+
+import volatility_engine
+
+logger = logging.getLogger(__name__)
+
+TRIAGE_WORKERS = int(os.environ.get('VOLINUX_TRIAGE_WORKERS', os.cpu_count() or 1))
+
+# fork et non forkserver : les fils héritent de la session Volatility déjà construite.
+# Appelé seulement depuis un processus du pool de jobs, qui n'a pas d'autre thread
+_mp_context = multiprocessing.get_context('fork')
+
+
+def run(dump_path, plugin_names, task, workers=None, layout=None):
+    # Exécute task(plugin) pour chaque plugin en parallèle et rend les résultats
+    # au fur et à mesure qu'ils arrivent (ordre de fin, pas ordre de la demande)
+    start = time.perf_counter()
+    error = volatility_engine.prepare_session(dump_path, layout=layout)
+    if error:
+        logger.warning(f"Session non partagée pour le triage de {dump_path}: {error}")
+
+    workers = max(min(workers or TRIAGE_WORKERS, len(plugin_names)), 1)
+    logger.info(f"Triage de {dump_path}: {len(plugin_names)} plugins sur {workers} processus")
+    with _mp_context.Pool(workers) as pool:
+        for result in pool.imap_unordered(task, plugin_names):
+            yield result
+    logger.info(f"Triage de {dump_path} terminé en {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import uuid
+
+from werkzeug import formparser
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_FOLDER = os.environ.get('VOLINUX_UPLOAD_FOLDER', 'uploads')
+BLOCK_SIZE = 8 * 1024 * 1024
+
+# Racines autorisées pour les dumps déjà présents sur le serveur (disque local, NFS)
+DUMP_ROOTS = [
+    os.path.realpath(root)
+    for root in os.environ.get('VOLINUX_DUMP_ROOTS', '').split(os.pathsep) if root
+]
+
+# Empreinte SHA-256 en cours par upload : (octets hachés, objet hashlib)
+_hashers = {}
+_locks = {}
+_lock = threading.Lock()
+
+
+class UploadError(Exception):
+    pass
+
+
+class OffsetMismatchError(UploadError):
+    def __init__(self, expected):
+        super().__init__(f"Offset invalide, reprise attendue à l'octet {expected}")
+        self.expected = expected
+
+
+def _meta_path(upload_id):
+    return os.path.join(UPLOAD_FOLDER, f"{os.path.basename(upload_id)}.json")
+
+
+def dump_path(upload_id):
+    return os.path.join(UPLOAD_FOLDER, f"{os.path.basename(upload_id)}.dump")
+
+
+def _save_meta(meta):
+    fd, temp_path = tempfile.mkstemp(dir=UPLOAD_FOLDER, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(meta, f)
+    os.replace(temp_path, _meta_path(meta['id']))
+
+
+def _upload_lock(upload_id):
+    with _lock:
+        return _locks.setdefault(upload_id, threading.Lock())
+
+
+def _forget(upload_id):
+    # Upload terminé, supprimé ou inconnu : son verrou et son empreinte en cours ne servent plus
+    with _lock:
+        _locks.pop(upload_id, None)
+    _hashers.pop(upload_id, None)
+
+
+def get_upload(upload_id):
+    try:
+        with open(_meta_path(upload_id), 'r') as f:
+            meta = json.load(f)
+        # La taille sur disque fait foi : c'est l'offset de reprise
+        meta['offset'] = os.path.getsize(dump_path(upload_id))
+    except (OSError, ValueError):
+        # Métadonnées sans fichier de données (supprimé à la main) : upload perdu
+        return None
+    return meta
+
+
+def create_upload(filename, size):
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    meta = {
+        'id': uuid.uuid4().hex,
+        'filename': filename,
+        'size': size,
+        'status': 'uploading',
+        'sha256': None,
+    }
+    open(dump_path(meta['id']), 'wb').close()
+    _save_meta(meta)
+    meta['offset'] = 0
+    logger.debug(f"Upload créé: {meta['id']} ({filename}, {size} octets)")
+    return meta
+
+
+def _hasher(upload_id, path, offset):
+    known = _hashers.get(upload_id)
+    if known and known[0] == offset:
+        return known[1]
+
+    # Reprise après redémarrage : le préfixe déjà reçu est relu une seule fois
+    logger.debug(f"Reconstruction du SHA-256 de {upload_id} sur {offset} octets")
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        remaining = offset
+        while remaining:
+            block = f.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            sha256.update(block)
+            remaining -= len(block)
+    return sha256
+
+
+def write_chunk(upload_id, offset, stream):
+    with _upload_lock(upload_id):
+        meta = get_upload(upload_id)
+        if meta is None:
+            _forget(upload_id)
+            raise UploadError("Upload introuvable")
+        if meta['status'] != 'uploading':
+            _forget(upload_id)
+            raise UploadError("Upload déjà terminé")
+        if offset != meta['offset']:
+            raise OffsetMismatchError(meta['offset'])
+
+        path = dump_path(upload_id)
+        sha256 = _hasher(upload_id, path, offset)
+        written = offset
+        try:
+            # Écriture directe à l'emplacement final, par gros blocs, hachée au passage
+            with open(path, 'r+b') as f:
+                f.seek(offset)
+                for block in iter(lambda: stream.read(BLOCK_SIZE), b''):
+                    if written + len(block) > meta['size']:
+                        raise UploadError("Données au-delà de la taille annoncée")
+                    f.write(block)
+                    sha256.update(block)
+                    written += len(block)
+        finally:
+            # Une connexion coupée garde ce qui a été écrit : le client reprend à cet offset
+            _hashers[upload_id] = (written, sha256)
+            with open(path, 'r+b') as f:
+                f.truncate(written)
+
+        meta['offset'] = written
+        if written == meta['size']:
+            meta['status'] = 'complete'
+            meta['sha256'] = sha256.hexdigest()
+            _forget(upload_id)
+            _save_meta({k: v for k, v in meta.items() if k != 'offset'})
+            logger.info(f"Upload {upload_id} terminé, SHA-256 {meta['sha256']}")
+        return meta
+
+
+def _discard(upload_id):
+    _forget(upload_id)
+    for path in (dump_path(upload_id), _meta_path(upload_id)):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+class _UploadWriter:
+    # Cible du parseur multipart : la partie fichier est écrite directement dans le fichier
+    # d'upload et hachée au passage, sans fichier temporaire intermédiaire de Werkzeug
+    def __init__(self, meta):
+        self.meta = meta
+        self.file = open(dump_path(meta['id']), 'wb')
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.file.write(data)
+        self.sha256.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=0):
+        # Appelé par le parseur à la fin de la partie : rien n'est relu depuis cet objet
+        self.file.flush()
+        return 0
+
+    def close(self):
+        self.file.close()
+
+
+def save_multipart(environ, field='file'):
+    # Upload en une fois (multipart) : (upload, erreur). Une seule écriture sur disque,
+    # hachée pendant la lecture de la requête ; les autres parties fichier sont écartées
+    writers = []
+
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        writer = _UploadWriter(create_upload(filename, None))
+        writers.append(writer)
+        return writer
+
+    try:
+        _, _, files = formparser.parse_form_data(environ, stream_factory=stream_factory)
+    except BaseException:
+        for writer in writers:
+            writer.close()
+            _discard(writer.meta['id'])
+        raise
+    storage = files.get(field)
+    upload = None
+    for writer in writers:
+        writer.close()
+        if storage is not None and storage.stream is writer and storage.filename:
+            upload = writer.meta
+            upload.update({
+                'size': writer.size, 'offset': writer.size, 'status': 'complete', 'sha256': writer.sha256.hexdigest()
+            })
+            _save_meta({k: v for k, v in upload.items() if k != 'offset'})
+        else:
+            _discard(writer.meta['id'])
+    if storage is None:
+        return None, "Aucun fichier n'a été envoyé"
+    if upload is None:
+        return None, 'Aucun fichier sélectionné'
+    return upload, None
+
+
+def resolve_local_dump(path):
+    # Le chemin réel (liens symboliques résolus) doit rester sous une racine autorisée
+    if not DUMP_ROOTS:
+        raise UploadError("Aucune racine de dumps locale n'est configurée")
+    real_path = os.path.realpath(path)
+    if not any(os.path.commonpath([root, real_path]) == root for root in DUMP_ROOTS):
+        raise UploadError("Chemin hors des racines autorisées")
+    if not os.path.isfile(real_path):
+        raise UploadError("Fichier introuvable")
+    return real_path
@@ -0,0 +1,397 @@
+import io
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+
+import compressed_dumps
+import symbol_store
+
+logger = logging.getLogger(__name__)
+# Le chargement des plugins Volatility journalise chaque import optionnel manquant
+logging.getLogger('volatility3').setLevel(logging.WARNING)
+
+VOLATILITY_PATH = os.environ.get('VOLINUX_VOLATILITY_PATH', '/opt/volatility3/vol.py')
+# Index distant utilisé seulement si le magasin de symboles local est vide ('' pour le désactiver)
+REMOTE_ISF_URL = os.environ.get(
+    'VOLINUX_REMOTE_ISF_URL',
+    'https://github.com/Abyss-W4tcher/volatility3-symbols/raw/master/banners/banners.json'
+)
+OUTPUT_FOLDER = os.environ.get('VOLINUX_OUTPUT_FOLDER', 'outputs')
+
+# 'inprocess' pilote le framework Volatility3 directement, 'subprocess' lance vol.py
+ENGINE_MODE = os.environ.get('VOLINUX_ENGINE', 'inprocess')
+
+# Sessions Volatility par dump : contexte (couches + tables de symboles) réutilisé entre les plugins.
+# Une session pèse des centaines de Mo : seules les MAX_SESSIONS plus récentes sont gardées (LRU)
+MAX_SESSIONS = int(os.environ.get('VOLINUX_MAX_SESSIONS', 4))
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+_framework = None
+_framework_lock = threading.Lock()
+
+# Temps d'exécution cumulés par mode, pour comparer in-process et subprocess
+_stats = {
+    'inprocess': {'runs': 0, 'total_seconds': 0.0, 'last_seconds': None},
+    'subprocess': {'runs': 0, 'total_seconds': 0.0, 'last_seconds': None},
+}
+_stats_lock = threading.Lock()
+
+
+def _record_timing(mode, command, elapsed):
+    with _stats_lock:
+        stats = _stats[mode]
+        stats['runs'] += 1
+        stats['total_seconds'] += elapsed
+        stats['last_seconds'] = elapsed
+    logger.info(f"Plugin {command} exécuté en {elapsed:.2f}s (mode {mode})")
+
+
+def get_stats():
+    with _stats_lock:
+        result = {}
+        for mode, stats in _stats.items():
+            result[mode] = dict(stats)
+            result[mode]['average_seconds'] = (
+                stats['total_seconds'] / stats['runs'] if stats['runs'] else None
+            )
+        result['sessions'] = len(_sessions)
+        return result
+
+
+def _isf_url():
+    return symbol_store.isf_index_url() or REMOTE_ISF_URL or None
+
+
+def _load_framework():
+    # Chargement unique des plugins et automagics Volatility3 pour tout le processus
+    global _framework
+    with _framework_lock:
+        if _framework is None:
+            import volatility3.plugins
+            import volatility3.symbols
+            from volatility3 import framework
+
+            import dump_layers
+
+            framework.require_interface_version(2, 0, 0)
+            dump_layers.install()
+            volatility3.symbols.__path__ = [symbol_store.SYMBOLS_DIR] + list(volatility3.symbols.__path__)
+            failures = framework.import_files(volatility3.plugins, True)
+            if failures:
+                logger.debug(f"Plugins Volatility non chargés: {', '.join(sorted(failures))}")
+            _framework = framework.list_plugins()
+        return _framework
+
+
+def preload():
+    # Charge le framework avant de créer des processus par fork : chaque fils en hérite
+    # au lieu de réimporter tous les plugins
+    if ENGINE_MODE != 'inprocess':
+        return
+    try:
+        _load_framework()
+    except ImportError as e:
+        logger.warning(f"Volatility3 non importable ({e}), framework non préchargé")
+
+
+def _resolve_plugin(plugin_list, command):
+    # vol.py accepte un préfixe unique ('linux.bash' -> 'linux.bash.Bash')
+    if command in plugin_list:
+        return plugin_list[command]
+    matches = [name for name in plugin_list if name.startswith(command + '.')]
+    if len(matches) == 1:
+        return plugin_list[matches[0]]
+    return None
+
+
+def _file_handler_class():
+    from volatility3.framework import interfaces
+
+    class OutputFileHandler(io.BytesIO, interfaces.plugins.FileHandlerInterface):
+        def __init__(self, filename):
+            io.BytesIO.__init__(self)
+            interfaces.plugins.FileHandlerInterface.__init__(self, filename)
+
+        def close(self):
+            if self.closed:
+                return
+            os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+            output_path = os.path.join(OUTPUT_FOLDER, self.preferred_filename)
+            with open(output_path, 'wb') as f:
+                f.write(self.getvalue())
+            super().close()
+
+    return OutputFileHandler
+
+
+def _new_context(dump_path):
+    from volatility3.framework import contexts
+    from volatility3.framework.configuration import requirements
+
+    context = contexts.Context()
+    context.config['automagic.LayerStacker.single_location'] = (
+        requirements.URIRequirement.location_from_file(dump_path)
+    )
+    return context
+
+
+def _get_session(dump_path, layout=None):
+    # layout : format, plages physiques et pile de couches enregistrés avec le dump
+    layout = layout or {}
+    with _sessions_lock:
+        session = _sessions.get(dump_path)
+        if session is None:
+            from volatility3.framework import automagic
+
+            context = _new_context(dump_path)
+            session = {
+                'context': context,
+                'automagics': automagic.available(context),
+                'kernel_module': None,
+                'segments': None,
+                'stack': None,
+                'lock': threading.Lock(),
+            }
+            _sessions[dump_path] = session
+            while len(_sessions) > max(MAX_SESSIONS, 1):
+                # Un plugin en cours garde sa référence à la session évincée jusqu'à sa fin
+                evicted, _ = _sessions.popitem(last=False)
+                logger.info(f"Session Volatility de {evicted} libérée (limite de {MAX_SESSIONS} sessions)")
+        else:
+            _sessions.move_to_end(dump_path)
+        if session['segments'] is None:
+            session['segments'] = layout.get('segments')
+        if session['kernel_module'] is None and not session['stack'] and layout.get('stack'):
+            session['stack'] = layout['stack']
+        return session
+
+
+def stack_config(dump_path):
+    # Pile de couches du module noyau construit pour ce dump, à enregistrer avec lui
+    session = _sessions.get(dump_path)
+    return session['stack'] if session else None
+
+
+def close_session(dump_path):
+    with _sessions_lock:
+        _sessions.pop(dump_path, None)
+
+
+def _construct(dump_path, command, session):
+    # Construit le plugin dans la session du dump : (session, plugin construit, erreur)
+    import dump_layers
+    from volatility3.framework import automagic, constants, exceptions, interfaces, plugins
+    from volatility3.framework.automagic import stacker
+    from volatility3.framework.configuration import requirements
+
+    plugin = _resolve_plugin(_load_framework(), command)
+    # Les ISF importés depuis le dernier run sont pris en compte sans redémarrage
+    constants.REMOTE_ISF_URL = _isf_url()
+    if plugin is None:
+        return None, None, f"Plugin Volatility introuvable: {command}"
+
+    context = session['context']
+    plugin_config_path = interfaces.configuration.path_join('plugins', plugin.__name__)
+    module_requirements = [
+        req for req in plugin.get_requirements()
+        if isinstance(req, requirements.ModuleRequirement)
+    ]
+
+    # Le module noyau déjà construit (couches + symboles) est réutilisé tel quel ; pour une
+    # session neuve, la pile enregistrée avec le dump remplace la détection du LayerStacker
+    restored = session['kernel_module'] is None and bool(session['stack'])
+    if session['kernel_module']:
+        for req in module_requirements:
+            context.config[interfaces.configuration.path_join(plugin_config_path, req.name)] = session['kernel_module']
+    elif restored:
+        for req in module_requirements:
+            context.config.splice(
+                interfaces.configuration.path_join(plugin_config_path, req.name),
+                interfaces.configuration.HierarchicalDict(session['stack'])
+            )
+
+    context.config['automagic.LayerStacker.stackers'] = stacker.choose_os_stackers(plugin)
+    automagics = automagic.choose_automagic(session['automagics'], plugin)
+    try:
+        constructed = plugins.construct_plugin(
+            context, automagics, plugin, 'plugins', None, _file_handler_class()
+        )
+    except exceptions.UnsatisfiedException as e:
+        if restored and module_requirements:
+            # Pile enregistrée inutilisable (symboles déplacés...) : détection complète
+            logger.warning(f"Pile de couches enregistrée rejetée pour {dump_path}, nouvelle détection")
+            session['context'] = _new_context(dump_path)
+            session['automagics'] = automagic.available(session['context'])
+            session['stack'] = None
+            return _construct(dump_path, command, session)
+        return session, None, f"Exigences Volatility non satisfaites: {', '.join(e.unsatisfied)}"
+
+    if session['kernel_module'] is None:
+        for req in module_requirements:
+            module_name = context.config.get(
+                interfaces.configuration.path_join(plugin_config_path, req.name), None
+            )
+            if isinstance(module_name, str) and module_name in context.modules:
+                session['kernel_module'] = module_name
+                if not restored:
+                    session['stack'] = dump_layers.prebuilt_stack(
+                        context.modules[module_name].build_configuration(), session['segments']
+                    )
+                logger.debug(
+                    f"Module noyau mis en cache pour {dump_path}: {module_name} "
+                    f"({'pile enregistrée' if restored else 'pile détectée'})"
+                )
+                break
+    return session, constructed, None
+
+
+def _row_visitor(grid, on_row=None):
+    # Visiteur TreeGrid : une ligne (colonne Volatility -> valeur JSON) par nœud, enfants à la suite ;
+    # on_row reçoit chaque ligne dès qu'elle est produite
+    from volatility3.cli import text_renderer
+    from volatility3.framework import interfaces
+
+    type_renderers = text_renderer.JsonRenderer._type_renderers
+    columns = [
+        (column.name, type_renderers.get(column.type, type_renderers['default']))
+        for column in grid.columns
+    ]
+
+    def visitor(node, rows):
+        row = {}
+        for (name, renderer), value in zip(columns, node.values):
+            row[name] = None if isinstance(value, interfaces.renderers.BaseAbsentValue) else renderer(value)
+        rows.append(row)
+        if on_row is not None:
+            on_row(row)
+        return rows
+
+    return visitor
+
+
+def _run_inprocess(dump_path, command, on_row=None, access=None, layout=None):
+    import dump_layers
+
+    session = _get_session(dump_path, layout)
+    with session['lock']:
+        session, constructed, error = _construct(dump_path, command, session)
+        if error:
+            return None, error
+        if access:
+            dump_layers.set_access(session['context'], access)
+
+        # Lignes typées lues directement dans le TreeGrid, sans passer par le rendu texte
+        grid = constructed.run()
+        rows = []
+        grid.populate(_row_visitor(grid, on_row), rows)
+        return rows, None
+
+
+def prepare_session(dump_path, command='linux.pslist.PsList', layout=None):
+    # Construit couches et tables de symboles sans lancer le plugin, pour les partager
+    # ensuite avec des processus fils (fork) : chaque fils part d'une session prête
+    if ENGINE_MODE != 'inprocess':
+        return None
+    start = time.perf_counter()
+    try:
+        session = _get_session(dump_path, layout)
+        with session['lock']:
+            _, _, error = _construct(dump_path, command, session)
+    except ImportError as e:
+        logger.warning(f"Volatility3 non importable ({e}), pas de session partagée")
+        return None
+    except Exception as e:
+        logger.error(f"Erreur lors de la préparation de la session de {dump_path}: {str(e)}")
+        return f"Erreur lors de l'exécution de Volatility3: {str(e)}"
+    logger.info(f"Session préparée pour {dump_path} en {time.perf_counter() - start:.2f}s")
+    return error
+
+
+def _reset_after_fork():
+    # Dans un fils issu de fork : verrous neufs (un thread du parent pouvait les tenir)
+    # et fichiers des couches rouverts, pour ne pas partager la position de lecture
+    global _sessions_lock, _framework_lock, _stats_lock
+    _sessions_lock = threading.Lock()
+    _framework_lock = threading.Lock()
+    _stats_lock = threading.Lock()
+    for session in _sessions.values():
+        session['lock'] = threading.Lock()
+        for layer_name in list(session['context'].layers):
+            layer = session['context'].layers[layer_name]
+            if hasattr(layer, '_file_'):
+                layer._file_ = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _flatten_jsonl(node, rows, on_row=None):
+    children = node.pop('__children', [])
+    rows.append(node)
+    if on_row is not None:
+        on_row(node)
+    for child in children:
+        _flatten_jsonl(child, rows, on_row)
+
+
+def _run_subprocess(dump_path, command, on_row=None):
+    cmd = ['python3', VOLATILITY_PATH, '-q', '-r', 'jsonl', '--symbol-dirs', symbol_store.SYMBOLS_DIR]
+    if _isf_url():
+        cmd += ['--remote-isf-url', _isf_url()]
+    cmd += ['-f', dump_path, command]
+
+    logger.debug(f"Exécution de la commande: {' '.join(cmd)}")
+    rows = []
+    # Rendu JSONL : une ligne JSON par nœud racine, lue au fil de l'eau
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True) as process:
+        stderr = []
+        reader = threading.Thread(target=lambda: stderr.append(process.stderr.read()), daemon=True)
+        reader.start()
+        messages = []
+        for line in process.stdout:
+            # Les messages d'erreur de vol.py arrivent aussi sur stdout, hors JSON
+            if line.startswith('{'):
+                _flatten_jsonl(json.loads(line), rows, on_row)
+            elif line.strip():
+                messages.append(line)
+        process.wait()
+        reader.join()
+
+    logger.debug(f"Code de retour: {process.returncode}")
+    logger.debug(f"Erreur standard: {stderr[0]}")
+
+    if process.returncode != 0:
+        return None, f"Erreur lors de l'exécution de Volatility3: {stderr[0]}{''.join(messages)}"
+    return rows, None
+
+
+def run_plugin(dump_path, command, mode=None, on_row=None, access=None, layout=None):
+    # Renvoie (lignes, erreur) : une liste de dict colonne Volatility -> valeur.
+    # on_row(ligne) est appelé pendant l'exécution, à chaque ligne produite ; access
+    # ('sequential' ou 'random') oriente la lecture anticipée de la couche projetée ;
+    # layout (métadonnées du dump) évite de refaire l'empilement des couches
+    mode = mode or ENGINE_MODE
+    if mode not in _stats:
+        return None, f"Mode d'exécution inconnu: {mode}"
+
+    start = time.perf_counter()
+    if mode == 'inprocess':
+        try:
+            output, error = _run_inprocess(dump_path, command, on_row, access, layout)
+        except ImportError as e:
+            logger.warning(f"Volatility3 non importable ({e}), repli sur vol.py")
+            return run_plugin(dump_path, command, mode='subprocess', on_row=on_row)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'exécution in-process de {command}: {str(e)}")
+            return None, f"Erreur lors de l'exécution de Volatility3: {str(e)}"
+    elif compressed_dumps.open_reader(dump_path) is not None:
+        # vol.py ne lit pas le format à blocs : seul le moteur in-process le décompresse
+        return None, "Dump compressé : exécution possible seulement avec le moteur in-process"
+    else:
+        output, error = _run_subprocess(dump_path, command, on_row)
+    _record_timing(mode, command, time.perf_counter() - start)
+    return output, error
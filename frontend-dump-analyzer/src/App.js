@@ -1,4 +1,4 @@
-import React, { useState } from "react";
+import React, { useEffect, useState } from "react";
 import axios from "axios";
 import "./App.css";
 
@@ -10,6 +10,16 @@ function App() {
   const [isUploading, setIsUploading] = useState(false);
   const [isExecutingPlugin, setIsExecutingPlugin] = useState(false);
   const [selectedPlugin, setSelectedPlugin] = useState("");
+  const [currentJob, setCurrentJob] = useState(null);
+  const [liveRows, setLiveRows] = useState([]);
+  const [liveCount, setLiveCount] = useState(0);
+  const [triageResults, setTriageResults] = useState(null);
+  const [plugins, setPlugins] = useState([]);
+  const [dumps, setDumps] = useState([]);
+  const [compareDumpId, setCompareDumpId] = useState("");
+  const [searchQuery, setSearchQuery] = useState("");
+  const [dossierPid, setDossierPid] = useState("");
+  const [searchResults, setSearchResults] = useState(null);
   const [language, setLanguage] = useState("en");
 
   const translations = {
@@ -27,7 +37,28 @@ function App() {
       startAnalysis: "Start Analysis",
       analysisInProgress: "Analysis in progress...",
       uploadError: "An error occurred during upload",
-      pluginError: "An error occurred during plugin execution"
+      pluginError: "An error occurred during plugin execution",
+      cancelAnalysis: "Cancel",
+      analysisCancelled: "Analysis cancelled",
+      analysisTimeout: "Analysis stopped: time limit reached",
+      startTriage: "Run triage (all key plugins)",
+      triageInProgress: "Triage in progress...",
+      triageResults: "Triage results",
+      triagePending: "running...",
+      triageRows: "rows",
+      rowsReceived: "rows received",
+      viewPartialResults: "First rows",
+      compareTitle: "Compare with another dump",
+      selectDump: "Select a dump",
+      compare: "Compare results",
+      dossierTitle: "Process dossier",
+      dossierPlaceholder: "PID",
+      openDossier: "Open dossier",
+      searchTitle: "Search all results",
+      searchPlaceholder: "IP, hash, path, command line...",
+      search: "Search",
+      noMatches: "No matching rows",
+      moreMatches: "More rows match: refine the search"
     },
     fr: {
       title: "Analyse de Dump Linux",
@@ -43,27 +74,46 @@ function App() {
       startAnalysis: "Démarrer l'analyse",
       analysisInProgress: "Analyse en cours...",
       uploadError: "Une erreur est survenue lors de l'upload",
-      pluginError: "Une erreur est survenue lors de l'exécution du plugin"
+      pluginError: "Une erreur est survenue lors de l'exécution du plugin",
+      cancelAnalysis: "Annuler",
+      analysisCancelled: "Analyse annulée",
+      analysisTimeout: "Analyse interrompue : délai dépassé",
+      startTriage: "Lancer le triage (plugins principaux)",
+      triageInProgress: "Triage en cours...",
+      triageResults: "Résultats du triage",
+      triagePending: "en cours...",
+      triageRows: "lignes",
+      rowsReceived: "lignes reçues",
+      viewPartialResults: "Premières lignes",
+      compareTitle: "Comparer avec un autre dump",
+      selectDump: "Sélectionnez un dump",
+      compare: "Comparer les résultats",
+      dossierTitle: "Dossier d'un processus",
+      dossierPlaceholder: "PID",
+      openDossier: "Ouvrir le dossier",
+      searchTitle: "Rechercher dans tous les résultats",
+      searchPlaceholder: "IP, empreinte, chemin, ligne de commande...",
+      search: "Rechercher",
+      noMatches: "Aucune ligne trouvée",
+      moreMatches: "D'autres lignes correspondent : précisez la recherche"
     }
   };
 
   const t = translations[language];
 
-  const plugins = [
-    { name: "Bash History", command: "linux.bash" },
-    { name: "Environment Variables", command: "linux.envars" },
-    { name: "IP Addresses", command: "linux.ip.Addr" },
-    { name: "Networks Infos", command: "linux.ip.Link" },
-    { name: "Boottime Infos", command: "linux.boottime.Boottime" },
-    { name: "List File in Memory", command: "linux.pagecache.Files" },
-    { name: "Process List", command: "linux.pslist.PsList" },
-    { name: "Process List (Aux)", command: "linux.psaux.PsAux" },
-    { name: "Process List (Syscall)", command: "linux.check_syscall.Check_syscall" },
-    { name: "List of ELF files", command: "linux.elfs.Elfs" },
-    { name: "List of Libraries", command: "linux.library_list.LibraryList" },
-    { name: "Hidden Modules", command: "linux.hidden_modules.Hidden_modules" },
-    { name: "Recover Filesystem", command: "linux.pagecache.RecoverFs" }
-  ];
+  // Liste des plugins déclarée une seule fois, dans le registre du backend
+  useEffect(() => {
+    axios.get("http://localhost:8000/plugins").then(({ data }) => setPlugins(data));
+  }, []);
+
+  // Autres dumps enregistrés, pour comparer leurs résultats à ceux du dump courant
+  useEffect(() => {
+    if (uploadStatus) {
+      axios.get("http://localhost:8000/dumps").then(({ data }) =>
+        setDumps(data.filter((dump) => dump.id !== uploadStatus.dump_id))
+      );
+    }
+  }, [uploadStatus]);
 
   const handleDrag = (e) => {
     e.preventDefault();
@@ -95,20 +145,43 @@ function App() {
     }
   };
 
+  const CHUNK_SIZE = 64 * 1024 * 1024;
+  const MAX_RETRIES = 5;
+
   const handleUpload = async (fileToUpload) => {
     setError("");
     setUploadStatus(null);
     setIsUploading(true);
 
-    const formData = new FormData();
-    formData.append("file", fileToUpload);
-
     try {
-      const response = await axios.post("http://localhost:8000/upload_dump/", formData, {
-        headers: {
-          "Content-Type": "multipart/form-data",
-        },
+      // Upload découpé : chaque morceau est envoyé brut à son offset, reprise possible après coupure
+      const { data: upload } = await axios.post("http://localhost:8000/uploads", {
+        filename: fileToUpload.name,
+        size: fileToUpload.size,
       });
+      let offset = 0;
+      let retries = 0;
+      let response = null;
+      while (offset < fileToUpload.size) {
+        try {
+          response = await axios.put(
+            `http://localhost:8000/uploads/${upload.id}?offset=${offset}`,
+            fileToUpload.slice(offset, offset + CHUNK_SIZE),
+            { headers: { "Content-Type": "application/octet-stream" } }
+          );
+          offset = response.data.offset ?? fileToUpload.size;
+          retries = 0;
+        } catch (err) {
+          if (err.response && err.response.status !== 409) {
+            throw err;
+          }
+          if (++retries > MAX_RETRIES) {
+            throw err;
+          }
+          const { data: status } = await axios.get(`http://localhost:8000/uploads/${upload.id}`);
+          offset = status.offset;
+        }
+      }
       setUploadStatus(response.data);
     } catch (err) {
       setError(err.response?.data?.error || t.uploadError);
@@ -117,22 +190,164 @@ function App() {
     }
   };
 
+  // Lignes gardées pour l'aperçu pendant l'exécution ; le compteur, lui, suit toutes les lignes
+  const LIVE_PREVIEW_ROWS = 50;
+
+  const showLiveRows = (data) => {
+    setLiveRows((previous) => previous.concat(data.rows).slice(0, LIVE_PREVIEW_ROWS));
+    setLiveCount(data.received);
+  };
+
+  const FINISHED_STATUSES = ["done", "failed", "cancelled", "timeout"];
+
+  const pollJob = async (job) => {
+    for (;;) {
+      const { data } = await axios.get(`http://localhost:8000/jobs/${job.id}`);
+      setCurrentJob((previous) => previous && { ...previous, status: data.status });
+      if (FINISHED_STATUSES.includes(data.status)) {
+        return data;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 2000));
+    }
+  };
+
+  const followJob = (job, onRows = showLiveRows, query = `?rows=${LIVE_PREVIEW_ROWS}`) =>
+    new Promise((resolve, reject) => {
+      // Server-Sent Events : lignes au fil de l'exécution, puis l'état final du job
+      const source = new EventSource(`http://localhost:8000/jobs/${job.id}/stream${query}`);
+      source.addEventListener("rows", (event) => onRows(JSON.parse(event.data)));
+      source.addEventListener("progress", (event) => {
+        const data = JSON.parse(event.data);
+        setLiveCount(data.received);
+        setCurrentJob((previous) => previous && { ...previous, status: data.status });
+      });
+      source.addEventListener("end", (event) => {
+        source.close();
+        resolve(JSON.parse(event.data));
+      });
+      source.onerror = () => {
+        // EventSource se reconnecte seul, sauf si le serveur a refusé le flux (503 quand trop
+        // de flux sont ouverts) : l'état du job est alors suivi par GET /jobs/<id>
+        if (source.readyState === EventSource.CLOSED) {
+          pollJob(job).then(resolve, reject);
+        }
+      };
+    });
+
   const handlePluginExecution = async (pluginCommand) => {
     setError("");
     setIsExecutingPlugin(true);
+    setLiveRows([]);
+    setLiveCount(0);
 
     try {
-      const response = await axios.get(`http://localhost:8000/execute_plugin/${pluginCommand}`);
-      if (response.data.success) {
-        window.open("http://localhost:8000/results", "_blank");
+      // Le plugin tourne dans le pool de jobs du backend, ses lignes arrivent pendant l'exécution
+      let { data: job } = await axios.post("http://localhost:8000/jobs", {
+        dump_id: uploadStatus.dump_id,
+        plugin: pluginCommand,
+      });
+      setCurrentJob(job);
+      job = await followJob(job);
+      if (job.status === "done") {
+        openResults(pluginCommand);
+      } else if (job.status === "cancelled") {
+        setError(t.analysisCancelled);
+      } else if (job.status === "timeout") {
+        setError(t.analysisTimeout);
+      } else {
+        setError(job.error || t.pluginError);
       }
     } catch (err) {
-      setError(err.response?.data?.error || t.pluginError);
+      setError(err.response?.data?.error || err.message || t.pluginError);
     } finally {
+      setCurrentJob(null);
+      setLiveRows([]);
       setIsExecutingPlugin(false);
     }
   };
 
+  const triagePlugins = plugins.filter((plugin) => plugin.triage).map((plugin) => plugin.command);
+
+  const openResults = (pluginCommand, dumpId = uploadStatus.dump_id) => {
+    window.open(
+      `http://localhost:8000/results?dump_id=${dumpId}&plugin=${encodeURIComponent(pluginCommand)}&lang=${language}`,
+      "_blank"
+    );
+  };
+
+  const handleSearch = async (e) => {
+    e.preventDefault();
+    setError("");
+    try {
+      // Index plein texte du backend : tous les plugins de tous les dumps enregistrés
+      const { data } = await axios.get("http://localhost:8000/api/search", {
+        params: { q: searchQuery, limit: 100 },
+      });
+      setSearchResults(data);
+    } catch (err) {
+      setSearchResults(null);
+      setError(err.response?.data?.error || err.message);
+    }
+  };
+
+  const openDiff = () => {
+    // Le dump choisi sert de référence (capture de base) ; le dump courant lui est comparé
+    window.open(
+      `http://localhost:8000/diff?base=${compareDumpId}&target=${uploadStatus.dump_id}&plugin=${encodeURIComponent(selectedPlugin)}&lang=${language}`,
+      "_blank"
+    );
+  };
+
+  const openDossier = (e) => {
+    // La page du dossier propose d'exécuter, comme jobs, les plugins sans résultat
+    e.preventDefault();
+    window.open(
+      `http://localhost:8000/dossier?dump_id=${uploadStatus.dump_id}&pid=${dossierPid}&lang=${language}`,
+      "_blank"
+    );
+  };
+
+  const handleTriage = async () => {
+    setError("");
+    setIsExecutingPlugin(true);
+    setTriageResults(Object.fromEntries(triagePlugins.map((command) => [command, null])));
+    const showResults = (results) =>
+      setTriageResults((previous) => ({
+        ...previous,
+        ...Object.fromEntries(results.map((result) => [result.plugin, result])),
+      }));
+
+    try {
+      // Le triage est un job du backend : une ligne par plugin terminé, dans l'ordre de fin
+      let { data: job } = await axios.post("http://localhost:8000/triage", {
+        dump_id: uploadStatus.dump_id,
+        plugins: triagePlugins,
+      });
+      setCurrentJob(job);
+      job = await followJob(job, (data) => showResults(data.rows), "");
+      if (job.status === "done") {
+        showResults(job.result.results);
+      } else if (job.status === "cancelled") {
+        setError(t.analysisCancelled);
+      } else if (job.status === "timeout") {
+        setError(t.analysisTimeout);
+      } else {
+        setError(job.error || t.pluginError);
+      }
+    } catch (err) {
+      setError(err.response?.data?.error || err.message || t.pluginError);
+    } finally {
+      setCurrentJob(null);
+      setIsExecutingPlugin(false);
+    }
+  };
+
+  const handleCancelExecution = async () => {
+    if (currentJob) {
+      await axios.delete(`http://localhost:8000/jobs/${currentJob.id}`);
+    }
+  };
+
   return (
     <div className="min-h-screen bg-gradient-to-br from-slate-900 via-slate-800 to-slate-900 text-white flex flex-col items-center justify-center px-4 py-10">
       <div className="w-full max-w-2xl bg-slate-800/50 backdrop-blur-sm rounded-2xl shadow-2xl p-8 space-y-8 border border-slate-700/50">
@@ -231,6 +446,48 @@ function App() {
           </label>
         </div>
 
+        <form onSubmit={handleSearch} className="space-y-3">
+          <h3 className="text-xl font-semibold text-cyan-400">{t.searchTitle}</h3>
+          <div className="flex gap-2">
+            <input
+              type="text"
+              value={searchQuery}
+              onChange={(e) => setSearchQuery(e.target.value)}
+              placeholder={t.searchPlaceholder}
+              className="flex-1 bg-slate-700 border border-slate-600 rounded-xl px-4 py-3 text-white focus:outline-none focus:ring-2 focus:ring-cyan-500"
+            />
+            <button
+              type="submit"
+              disabled={!searchQuery.trim()}
+              className="bg-slate-700 hover:bg-slate-600 text-white font-bold py-3 px-6 rounded-xl transition-colors duration-300 disabled:opacity-50 disabled:cursor-not-allowed"
+            >
+              {t.search}
+            </button>
+          </div>
+          {searchResults && (
+            <div className="bg-slate-800/50 rounded-xl p-4 border border-slate-700/50 max-h-96 overflow-auto text-sm">
+              {searchResults.matches.length === 0 && <p className="text-slate-400">{t.noMatches}</p>}
+              <ul className="space-y-2">
+                {searchResults.matches.map((match) => (
+                  <li key={`${match.dump_id}-${match.plugin}-${match.position}`}>
+                    <button
+                      type="button"
+                      onClick={() => openResults(match.plugin, match.dump_id)}
+                      className="text-cyan-300 hover:underline"
+                    >
+                      {match.filename} &middot; {match.plugin}
+                    </button>
+                    <p className="text-slate-400 break-all">
+                      {match.fields.map((field) => `${field}: ${match.row[field]}`).join(" | ")}
+                    </p>
+                  </li>
+                ))}
+              </ul>
+              {searchResults.more && <p className="text-slate-500 mt-2">{t.moreMatches}</p>}
+            </div>
+          )}
+        </form>
+
         {error && (
           <div className="mt-6 p-6 bg-rose-500/10 border border-rose-500/30 rounded-xl text-center animate-fade-in backdrop-blur-sm">
             <p className="text-rose-400">{error}</p>
@@ -277,6 +534,120 @@ function App() {
                 >
                   {isExecutingPlugin ? t.analysisInProgress : t.startAnalysis}
                 </button>
+                {currentJob && (
+                  <button
+                    onClick={handleCancelExecution}
+                    className="w-full bg-slate-700 hover:bg-slate-600 text-white font-bold py-3 px-6 rounded-xl transition-colors duration-300"
+                  >
+                    {t.cancelAnalysis}
+                  </button>
+                )}
+                {currentJob && currentJob.kind === "plugin" && (
+                  <div className="bg-slate-800/50 rounded-xl p-4 border border-slate-700/50">
+                    <h4 className="font-semibold mb-2 text-cyan-400">
+                      {liveCount} {t.rowsReceived}
+                    </h4>
+                    {liveRows.length > 0 && (
+                      <div className="max-h-64 overflow-auto text-xs">
+                        <p className="text-slate-400 mb-1">{t.viewPartialResults}</p>
+                        <table className="w-full text-left">
+                          <thead>
+                            <tr>
+                              {Object.keys(liveRows[0]).map((field) => (
+                                <th key={field} className="pr-2 text-slate-300">{field}</th>
+                              ))}
+                            </tr>
+                          </thead>
+                          <tbody>
+                            {liveRows.map((row, index) => (
+                              <tr key={index}>
+                                {Object.keys(liveRows[0]).map((field) => (
+                                  <td key={field} className="pr-2 text-slate-400 truncate max-w-xs">
+                                    {row[field] === null ? "N/A" : String(row[field])}
+                                  </td>
+                                ))}
+                              </tr>
+                            ))}
+                          </tbody>
+                        </table>
+                      </div>
+                    )}
+                  </div>
+                )}
+                <button
+                  onClick={handleTriage}
+                  disabled={isExecutingPlugin}
+                  className="w-full bg-slate-700 hover:bg-slate-600 text-white font-bold py-3 px-6 rounded-xl transition-colors duration-300 disabled:opacity-50 disabled:cursor-not-allowed"
+                >
+                  {isExecutingPlugin && triageResults ? t.triageInProgress : t.startTriage}
+                </button>
+                <form onSubmit={openDossier} className="bg-slate-800/50 rounded-xl p-4 border border-slate-700/50 space-y-3">
+                  <h4 className="font-semibold text-cyan-400">{t.dossierTitle}</h4>
+                  <input
+                    type="number"
+                    min="0"
+                    value={dossierPid}
+                    onChange={(e) => setDossierPid(e.target.value)}
+                    placeholder={t.dossierPlaceholder}
+                    className="w-full bg-slate-700 border border-slate-600 rounded-xl px-4 py-3 text-white focus:outline-none focus:ring-2 focus:ring-cyan-500"
+                  />
+                  <button
+                    type="submit"
+                    disabled={dossierPid === ""}
+                    className="w-full bg-slate-700 hover:bg-slate-600 text-white font-bold py-3 px-6 rounded-xl transition-colors duration-300 disabled:opacity-50 disabled:cursor-not-allowed"
+                  >
+                    {t.openDossier}
+                  </button>
+                </form>
+                {dumps.length > 0 && (
+                  <div className="bg-slate-800/50 rounded-xl p-4 border border-slate-700/50 space-y-3">
+                    <h4 className="font-semibold text-cyan-400">{t.compareTitle}</h4>
+                    <select
+                      value={compareDumpId}
+                      onChange={(e) => setCompareDumpId(e.target.value)}
+                      className="w-full bg-slate-700 border border-slate-600 rounded-xl px-4 py-3 text-white focus:outline-none focus:ring-2 focus:ring-cyan-500"
+                    >
+                      <option value="">{t.selectDump}</option>
+                      {dumps.map((dump) => (
+                        <option key={dump.id} value={dump.id}>
+                          {dump.filename} ({dump.kernel_version}, {new Date(dump.created_at * 1000).toLocaleString()})
+                        </option>
+                      ))}
+                    </select>
+                    <button
+                      onClick={openDiff}
+                      disabled={!compareDumpId || !selectedPlugin}
+                      className="w-full bg-slate-700 hover:bg-slate-600 text-white font-bold py-3 px-6 rounded-xl transition-colors duration-300 disabled:opacity-50 disabled:cursor-not-allowed"
+                    >
+                      {t.compare}
+                    </button>
+                  </div>
+                )}
+                {triageResults && (
+                  <div className="bg-slate-800/50 rounded-xl p-4 border border-slate-700/50">
+                    <h4 className="font-semibold mb-2 text-cyan-400">{t.triageResults}</h4>
+                    <ul className="space-y-1">
+                      {Object.entries(triageResults).map(([command, result]) => (
+                        <li key={command} className="flex justify-between text-sm">
+                          {result && result.success ? (
+                            <button onClick={() => openResults(command)} className="text-cyan-300 hover:underline">
+                              {command}
+                            </button>
+                          ) : (
+                            <span className="text-slate-300">{command}</span>
+                          )}
+                          <span className={result && !result.success ? "text-rose-400" : "text-slate-400"}>
+                            {!result
+                              ? t.triagePending
+                              : result.success
+                              ? `${result.rows} ${t.triageRows} (${result.elapsed.toFixed(1)}s)`
+                              : result.error}
+                          </span>
+                        </li>
+                      ))}
+                    </ul>
+                  </div>
+                )}
               </div>
             </div>
           </div>